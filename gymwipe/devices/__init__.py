@@ -1 +1 @@
-from gymwipe.devices.core import Device, Position
\ No newline at end of file
+from gymwipe.devices.core import Device, Position, SpatialIndex
\ No newline at end of file
@@ -2,8 +2,8 @@
 Core components for modelling physical devices
 """
 import logging
-from math import sqrt
-from typing import Any, List, Tuple, Union
+from math import floor, sqrt
+from typing import Any, Dict, List, Tuple, Union
 
 from simpy import Event
 
@@ -121,3 +121,112 @@ class Device:
     def position(self):
         """:class:`Position`: The device's physical position"""
         return self._position
+
+class SpatialIndex:
+    """
+    A uniform grid over the positions of a set of devices. It allows to query
+    the devices within a radius around a position in time proportional to the
+    number of devices located nearby. The index is kept up to date by
+    subscribing to the :attr:`~Position.nChange` notifiers of the devices'
+    positions.
+    """
+
+    POSITION_CHANGE_PRIORITY: int = 1
+    """
+    int: The priority of the index' position change callbacks. It is chosen to
+    be higher than the default priority, so that other position change
+    callbacks can rely on the index being up to date.
+    """
+
+    def __init__(self, cellSize: float):
+        """
+        Args:
+            cellSize: The edge length of the grid cells in metres. Queries are
+                most efficient for radii in the order of the cell size.
+        """
+        if cellSize <= 0:
+            raise ValueError("cellSize has to be positive, got {}.".format(cellSize))
+        self.cellSize = cellSize
+        # Dicts (with None values) are used as insertion-ordered sets to keep
+        # query results deterministic
+        self._cells: Dict[Tuple[int, int], Dict[Device, None]] = {}
+        self._deviceToCell: Dict[Device, Tuple[int, int]] = {}
+    
+    def __repr__(self):
+        return "SpatialIndex(cellSize: {}, devices: {:d})".format(self.cellSize, len(self))
+
+    def __len__(self):
+        return len(self._deviceToCell)
+    
+    def __contains__(self, device: Device):
+        return device in self._deviceToCell
+
+    def _getCell(self, x: float, y: float) -> Tuple[int, int]:
+        return floor(x / self.cellSize), floor(y / self.cellSize)
+
+    def addDevice(self, device: Device):
+        """
+        Adds `device` to the index. If it has already been added, no action is
+        taken.
+
+        Args:
+            device: The device to be added
+        """
+        if device in self._deviceToCell:
+            return
+        position = device.position
+        cell = self._getCell(position.x, position.y)
+        self._deviceToCell[device] = cell
+        self._cells.setdefault(cell, {})[device] = None
+        position.nChange.subscribeCallback(self._onPositionChange,
+                priority=self.POSITION_CHANGE_PRIORITY, additionalArgs=[device])
+
+    def removeDevice(self, device: Device):
+        """
+        Removes `device` from the index.
+
+        Args:
+            device: The device to be removed
+        """
+        cell = self._deviceToCell.pop(device)
+        self._removeFromCell(device, cell)
+        device.position.nChange.unsubscribeCallback(self._onPositionChange)
+
+    def _removeFromCell(self, device: Device, cell: Tuple[int, int]):
+        devices = self._cells[cell]
+        del devices[device]
+        if len(devices) == 0:
+            del self._cells[cell]
+
+    def _onPositionChange(self, position: Position, device: Device):
+        cell = self._getCell(position.x, position.y)
+        oldCell = self._deviceToCell[device]
+        if cell != oldCell:
+            self._removeFromCell(device, oldCell)
+            self._cells.setdefault(cell, {})[device] = None
+            self._deviceToCell[device] = cell
+
+    def getDevicesInRadius(self, position: Position, radius: float) -> List[Device]:
+        """
+        Returns a list of the indexed devices that are located within `radius`
+        metres around `position`.
+
+        Args:
+            position: The center of the circle to search devices in
+            radius: The radius of the circle in metres
+        """
+        x, y = position.x, position.y
+        minX, minY = self._getCell(x - radius, y - radius)
+        maxX, maxY = self._getCell(x + radius, y + radius)
+        if (maxX - minX + 1) * (maxY - minY + 1) > len(self._cells):
+            # Checking every non-empty cell is cheaper
+            candidateCells = [c for c in self._cells
+                                if minX <= c[0] <= maxX and minY <= c[1] <= maxY]
+        else:
+            candidateCells = [(cx, cy) for cx in range(minX, maxX + 1)
+                                for cy in range(minY, maxY + 1) if (cx, cy) in self._cells]
+        squaredRadius = radius**2
+        return [
+            device for cell in candidateCells for device in self._cells[cell]
+            if (device.position.x - x)**2 + (device.position.y - y)**2 <= squaredRadius
+        ]
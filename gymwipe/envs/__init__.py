@@ -1,6 +1,7 @@
 from gym.envs.registration import register
 
 from gymwipe.envs.counter_traffic import CounterTrafficEnv
+from gymwipe.envs.fork_server import ForkServerEnv
 from gymwipe.envs.inverted_pendulum import InvertedPendulumEnv
 
 register(
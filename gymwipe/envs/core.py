@@ -1,5 +1,8 @@
+import os
+import pickle
+import traceback
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Sequence, Tuple
 
 import gym
 import numpy as np
@@ -56,6 +59,81 @@ class BaseEnv(gym.Env):
         Renders the environment to stdout.
         """
 
+    def lookahead(self, actions: Sequence[Any]) -> List[Tuple[Any, float, bool, Dict]]:
+        """
+        Evaluates candidate actions from the current state, e.g. for planning
+        agents: For every action in `actions`, the process is forked (using
+        :func:`os.fork`) and the child process performs :meth:`step` with the
+        action. The child processes run in parallel and send their results
+        back to the parent via pipes. The state of the environment itself
+        remains unchanged. The children unset the simulation manager's
+        :attr:`~gymwipe.simtools.SimulationManager.traceRecorder`,
+        :attr:`~gymwipe.simtools.SimulationManager.profiler`, and
+        :attr:`~gymwipe.simtools.SimulationManager.kernelStatistics` before
+        stepping, so lookahead steps are not recorded.
+
+        Args:
+            actions: The candidate actions
+
+        Returns:
+            A list with the (observation, reward, done, info) tuple of every
+            candidate action
+
+        Raises:
+            RuntimeError: If performing an action failed in a child process
+
+        Note:
+            Results (including the info dicts) have to be picklable. This
+            method relies on :func:`os.fork` and is thus only available on
+            Unix-like operating systems.
+        """
+        children = []
+        for action in actions:
+            readFd, writeFd = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                # Child process
+                try:
+                    os.close(readFd)
+                    # The child must not write to the parent's trace file or
+                    # count its events in the parent's statistics
+                    simMan = getattr(self, "simMan", SimMan)
+                    simMan.traceRecorder = None
+                    simMan.profiler = None
+                    if simMan.kernelStatistics is not None:
+                        simMan.kernelStatistics.detach()
+                        simMan.kernelStatistics = None
+                    try:
+                        result = (True, self.step(action))
+                        data = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+                    except Exception:
+                        data = pickle.dumps((False, traceback.format_exc()), pickle.HIGHEST_PROTOCOL)
+                    with os.fdopen(writeFd, "wb") as pipe:
+                        pipe.write(data)
+                finally:
+                    # Skip any cleanup of the parent's state
+                    os._exit(0)
+            os.close(writeFd)
+            children.append((pid, readFd))
+
+        results = []
+        errors = []
+        for action, (pid, readFd) in zip(actions, children):
+            with os.fdopen(readFd, "rb") as pipe:
+                data = pipe.read()
+            os.waitpid(pid, 0)
+            if not data:
+                errors.append("The child process for action {} terminated unexpectedly".format(action))
+                continue
+            ok, result = pickle.loads(data)
+            if ok:
+                results.append(result)
+            else:
+                errors.append("Action {} failed:\n{}".format(action, result))
+        if errors:
+            raise RuntimeError("\n".join(errors))
+        return results
+
 class Interpreter(ABC):
     """
     An :class:`Interpreter` is an instance that observes the system's behavior
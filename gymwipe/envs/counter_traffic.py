@@ -1,7 +1,7 @@
 """
 A simple Gym environment using the `Simple` network devices for demonstration purposes 
 """
-from typing import Dict, List
+from typing import Dict, List, Tuple, Type
 
 import gym
 import numpy as np
@@ -10,11 +10,13 @@ from gym.utils import seeding
 
 from gymwipe.envs.core import BaseEnv, Interpreter
 from gymwipe.networking.attenuation_models import FsplAttenuation
+from gymwipe.networking.construction import Module
 from gymwipe.networking.devices import SimpleNetworkDevice, SimpleRrmDevice
-from gymwipe.networking.messages import (FakeTransmittable, Packet,
-                                         Transmittable)
+from gymwipe.networking.messages import (FakeTransmittable, Message,
+                                         Packet, Transmittable)
 from gymwipe.networking.physical import FrequencyBand
-from gymwipe.simtools import SimMan
+from gymwipe.networking.simple_stack import SimplePhy
+from gymwipe.simtools import SimMan, SimulationManager
 
 
 class CounterTrafficEnv(BaseEnv):
@@ -26,6 +28,10 @@ class CounterTrafficEnv(BaseEnv):
 
     Optimally, a learning agent will fit the length of the assignment intervals
     to the amount of data sent by the devices.
+
+    Every environment runs its simulation with its own
+    :class:`~gymwipe.simtools.SimulationManager` (:attr:`simMan`), so multiple
+    environments can be used in a single process.
     """
 
     COUNTER_INTERVAL = 0.001
@@ -42,13 +48,18 @@ class CounterTrafficEnv(BaseEnv):
         """
         
         def __init__(self, name: str, xPos: float, yPos: float, frequencyBand: FrequencyBand,
-                        packetMultiplicity: int):
-            super(CounterTrafficEnv.SenderDevice, self).__init__(name, xPos, yPos, frequencyBand)
+                        packetMultiplicity: int, phyClass: Type[Module] = SimplePhy):
+            super(CounterTrafficEnv.SenderDevice, self).__init__(name, xPos, yPos, frequencyBand, phyClass)
             self.packetMultiplicity = packetMultiplicity
             self.counter = 1
             SimMan.process(self.senderProcess())
 
             self.destinationMac: bytes = None # to be set after construction
+
+        def reset(self):
+            super(CounterTrafficEnv.SenderDevice, self).reset()
+            self.counter = 1
+            SimMan.process(self.senderProcess())
         
         def senderProcess(self):
             assert self.destinationMac is not None
@@ -111,51 +122,111 @@ class CounterTrafficEnv(BaseEnv):
             # string below
             return {"Latest received values": str(self.receivedValues)}
 
-    def __init__(self):
-        frequencyBand = FrequencyBand([FsplAttenuation])
-        super(CounterTrafficEnv, self).__init__(frequencyBand, deviceCount=2)
+    def __init__(self, phyClass: Type[Module] = SimplePhy):
+        """
+        Args:
+            phyClass: The physical layer class to be used by all devices, e.g.
+                :class:`~gymwipe.networking.simple_stack.LinkLevelPhy` for
+                faster simulations
+        """
+        self.simMan = SimulationManager()
+        """
+        SimulationManager: The :class:`~gymwipe.simtools.SimulationManager`
+        of the environment's simulation
+        """
+
+        with self.simMan:
+            self.simMan.init()
+
+            frequencyBand = FrequencyBand([FsplAttenuation])
+            super(CounterTrafficEnv, self).__init__(frequencyBand, deviceCount=2)
 
-        # The difference between the lastly received values from both devices
-        # summed up with the COUNTER_BOUND will be the observation.
-        self.observation_space = spaces.Discrete(2 * CounterTrafficEnv.COUNTER_BOUND)
+            # The difference between the lastly received values from both devices
+            # summed up with the COUNTER_BOUND will be the observation.
+            self.observation_space = spaces.Discrete(2 * CounterTrafficEnv.COUNTER_BOUND)
 
-        SimMan.init()
+            self.senders: List[self.SenderDevice] = [
+                CounterTrafficEnv.SenderDevice("Sender 1", 0, 2, self.frequencyBand, 1, phyClass),
+                CounterTrafficEnv.SenderDevice("Sender 2", 0, -2, self.frequencyBand, 3, phyClass)
+            ]
+            self.deviceIndexToMacDict: Dict[int, bytes] = {i: s.macAddr for i, s in enumerate(self.senders)}
+            self.senders[0].destinationMac = self.senders[1].macAddr
+            self.senders[1].destinationMac = self.senders[0].macAddr
 
-        self.senders: List[self.SenderDevice] = [
-            CounterTrafficEnv.SenderDevice("Sender 1", 0, 2, self.frequencyBand, 1),
-            CounterTrafficEnv.SenderDevice("Sender 2", 0, -2, self.frequencyBand, 3)
-        ]
-        self.deviceIndexToMacDict: Dict[int, bytes] = {i: s.macAddr for i, s in enumerate(self.senders)}
-        self.senders[0].destinationMac = self.senders[1].macAddr
-        self.senders[1].destinationMac = self.senders[0].macAddr
+            interpreter = self.CounterTrafficInterpreter(self)
+            self.rrm = SimpleRrmDevice("RRM", 0, 0, self.frequencyBand, self.deviceIndexToMacDict,
+                                        interpreter, phyClass)
+            self._seedPhys()
 
-        interpreter = self.CounterTrafficInterpreter(self)
-        self.rrm = SimpleRrmDevice("RRM", 0, 0, self.frequencyBand, self.deviceIndexToMacDict, interpreter)
+    def seed(self, seed=None):
+        """
+        Sets the seed for this environment's random number generator and
+        derives seeds for the devices' physical layers from it (if they draw
+        random numbers, like
+        :class:`~gymwipe.networking.simple_stack.LinkLevelPhy`). Returns the
+        seed in a single-item list.
+        """
+        seeds = super(CounterTrafficEnv, self).seed(seed)
+        if hasattr(self, "rrm"):
+            self._seedPhys()
+        return seeds
+
+    def _seedPhys(self):
+        # The seeds are kept for reset() to replay the phys' random numbers
+        self._phySeeds = []
+        for device in self.senders + [self.rrm]:
+            phy = device._phy
+            if hasattr(phy, "seed"):
+                seed = int(self.np_random.randint(2**31))
+                phy.seed(seed)
+                self._phySeeds.append((phy, seed))
 
     def reset(self):
         """
         Resets the state of the environment and returns an initial observation.
+        The simulation is rewound (see
+        :meth:`~gymwipe.simtools.SimulationManager.reset`) and the devices are
+        reset in place, so that the environment behaves exactly like a newly
+        constructed one, without constructing its devices again. Physical
+        layers that draw random numbers are re-seeded with the seeds derived
+        by the latest :meth:`seed` call, so every episode replays them.
         """
-        for sender in self.senders:
-            sender.counter = 0
-        
-        self.rrm.interpreter.reset()
-        
-        return self.rrm.interpreter.getObservation()
+        with self.simMan:
+            self.simMan.reset()
+            self.frequencyBand.reset()
+            for device in self.senders + [self.rrm]:
+                device.reset()
+            for phy, seed in self._phySeeds:
+                phy.seed(seed)
+            return self.rrm.interpreter.getObservation()
     
     def step(self, action):
         assert self.action_space.contains(action)
+        return self.finishStep(self.startStep(action))
+
+    def startStep(self, action) -> Message:
+        """
+        Makes the RRM assign the frequency band as specified by `action`
+        without running the simulation and returns the assignment
+        :class:`~gymwipe.networking.messages.Message` to be passed to
+        :meth:`finishStep`. :meth:`step` is equivalent to calling both methods
+        in a row; vectorized environments use them to step multiple
+        environments at once.
+        """
         deviceIndex = action["device"]
         duration = action["duration"]*self.ASSIGNMENT_DURATION_FACTOR
+        with self.simMan:
+            return self.rrm.assignFrequencyBand(deviceIndex, duration)
 
-        # Assign the frequency band
-        assignSignal = self.rrm.assignFrequencyBand(deviceIndex, duration)
-
-        # Run the simulation until the assignment ends
-        SimMan.runSimulation(assignSignal.eProcessed)
-
-        # Return (observation, reward, done, info)
-        return self.rrm.interpreter.getFeedback()
+    def finishStep(self, assignSignal: Message) -> Tuple[int, float, bool, Dict[str, str]]:
+        """
+        Runs the simulation until the frequency band assignment `assignSignal`
+        (as returned by :meth:`startStep`) is over and returns an
+        (observation, reward, done, info) tuple like :meth:`step`.
+        """
+        with self.simMan:
+            self.simMan.runSimulation(assignSignal.eProcessed)
+            return self.rrm.interpreter.getFeedback()
 
     def render(self, mode='human', close=False):
         values = self.rrm.interpreter.receivedValues
@@ -0,0 +1,313 @@
+"""
+Near-instant environment resets by forking a pristine template simulation.
+
+Constructing a simulation (the :class:`~gymwipe.simtools.SimulationManager`,
+devices, physical layers, MAC layers, etc.) is expensive, and resetting all of
+its state in place requires every component to implement a ``reset()`` method
+(like :meth:`CounterTrafficEnv.reset()
+<gymwipe.envs.counter_traffic.CounterTrafficEnv.reset>` does). The :class:`TemplateForkServer` constructs
+an environment once in a template process and, for every episode,
+:func:`os.fork` s a copy-on-write child process that starts with exactly the
+template's state. The :class:`ForkServerEnv` is a gym environment that uses
+such a child process for every episode.
+
+Note:
+    This module relies on :func:`os.fork` and Unix domain sockets, so it is
+    only available on Unix-like operating systems.
+"""
+import multiprocessing as mp
+import os
+import signal
+import tempfile
+import traceback
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Dict, Tuple, Type
+
+import gym
+
+from gymwipe.envs.core import BaseEnv
+from gymwipe.envs.counter_traffic import CounterTrafficEnv
+
+
+def _serveEpisode(env: BaseEnv, conn: Connection, seed: int):
+    """
+    Runs an episode of `env` in a forked child process, controlled via `conn`
+    """
+    try:
+        if seed is not None:
+            env.seed(seed)
+        conn.send((True, env.reset()))
+    except Exception:
+        conn.send((False, traceback.format_exc()))
+        return
+    while True:
+        try:
+            command, arg = conn.recv()
+        except EOFError:
+            return
+        if command == "step":
+            try:
+                result = (True, env.step(arg))
+            except Exception:
+                result = (False, traceback.format_exc())
+            conn.send(result)
+        elif command == "close":
+            return
+
+def _templateServer(envClass: Type[BaseEnv], envKwargs: Dict[str, Any], address: str, authkey: bytes,
+                    readyConn: Connection):
+    """
+    The main function of the template process
+    """
+    try:
+        env = envClass(**envKwargs)
+        listener = Listener(address, "AF_UNIX", authkey=authkey)
+    except Exception:
+        readyConn.send((False, traceback.format_exc()))
+        return
+    readyConn.send((True, (env.observation_space, env.action_space)))
+    readyConn.close()
+
+    # Let the kernel reap terminated episode processes
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    while True:
+        conn = listener.accept()
+        command, arg = conn.recv()
+        if command == "shutdown":
+            conn.close()
+            break
+        if os.fork() == 0:
+            # Episode process: Exit via os._exit() so that neither the
+            # listener's finalizer (which would remove the socket file) nor
+            # any other cleanup of the template runs.
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            try:
+                _serveEpisode(env, conn, arg)
+            finally:
+                os._exit(0)
+        conn.close()
+    listener.close()
+
+class TemplateForkServer:
+    """
+    Constructs an instance of a :class:`~gymwipe.envs.core.BaseEnv` subclass
+    in a template process and forks a fresh copy of it for every episode (see
+    the module description).
+    """
+
+    def __init__(self, envClass: Type[BaseEnv] = CounterTrafficEnv, envKwargs: Dict[str, Any] = None):
+        """
+        Args:
+            envClass: The environment class to be instantiated (with
+                `envKwargs`) in the template process
+            envKwargs: Keyword arguments for the `envClass` constructor
+
+        Raises:
+            RuntimeError: If the template environment cannot be constructed
+        """
+        self._directory = tempfile.mkdtemp(prefix="gymwipe-")
+        self.address = os.path.join(self._directory, "template.sock")
+        """str: The address (Unix domain socket path) of the template process"""
+
+        self._authkey = os.urandom(32)
+        context = mp.get_context("fork")
+        readyConn, childReadyConn = context.Pipe(duplex=False)
+        self._process = context.Process(target=_templateServer, name="TemplateForkServer",
+                                        args=(envClass, envKwargs or {}, self.address, self._authkey,
+                                              childReadyConn),
+                                        daemon=True)
+        self._process.start()
+        childReadyConn.close()
+        try:
+            ok, result = readyConn.recv()
+        except EOFError:
+            ok, result = False, "The template process terminated unexpectedly"
+        readyConn.close()
+        if not ok:
+            self._process.join()
+            os.rmdir(self._directory)
+            raise RuntimeError("Constructing the template environment failed:\n{}".format(result))
+
+        self.observationSpace, self.actionSpace = result
+        """The observation and action spaces of the template environment"""
+
+    @property
+    def running(self) -> bool:
+        """bool: Whether the template process is running"""
+        return self._process.is_alive()
+
+    def requestEpisode(self, seed: int = None) -> Connection:
+        """
+        Makes the template process fork an episode process and returns a
+        connection to it without waiting for the episode process. Its initial
+        observation can be received via :meth:`waitForEpisode`.
+
+        Args:
+            seed: If provided, the episode process's environment is seeded with
+                `seed` before it is reset
+
+        Raises:
+            RuntimeError: If the template process is not running
+        """
+        if not self.running:
+            raise RuntimeError("The template process is not running")
+        conn = Client(self.address, "AF_UNIX", authkey=self._authkey)
+        conn.send(("episode", seed))
+        return conn
+
+    def waitForEpisode(self, conn: Connection) -> Any:
+        """
+        Waits for the episode process of `conn` (as returned by
+        :meth:`requestEpisode`) to be reset and returns its initial
+        observation.
+
+        Raises:
+            RuntimeError: If resetting the episode's environment failed
+        """
+        ok, result = conn.recv()
+        if not ok:
+            conn.close()
+            raise RuntimeError("Resetting the environment failed:\n{}".format(result))
+        return result
+
+    def startEpisode(self, seed: int = None) -> Tuple[Connection, Any]:
+        """
+        Forks an episode process from the template and returns a connection to
+        it and the initial observation (see :meth:`requestEpisode` and
+        :meth:`waitForEpisode`).
+        """
+        conn = self.requestEpisode(seed)
+        return conn, self.waitForEpisode(conn)
+
+    def shutdown(self):
+        """
+        Stops the template process. Running episode processes are not
+        affected.
+        """
+        if self.running:
+            conn = Client(self.address, "AF_UNIX", authkey=self._authkey)
+            conn.send(("shutdown", None))
+            conn.close()
+            self._process.join()
+        if os.path.isdir(self._directory):
+            if os.path.exists(self.address):
+                os.unlink(self.address)
+            os.rmdir(self._directory)
+
+class ForkServerEnv(gym.Env):
+    """
+    A gym environment that runs every episode in a process forked from a
+    :class:`TemplateForkServer`. As a result, :meth:`reset` restores the exact
+    initial state of the environment (including the simulated time, queues,
+    and in-flight transmissions) at the cost of a :func:`os.fork` call
+    instead of constructing the environment.
+
+    Actions and feedback are exchanged with the episode process via a Unix
+    domain socket. The environment has to be reset before it can be stepped.
+
+    By default, the process for the next episode is forked as soon as an
+    episode starts, so that :meth:`reset` does not have to wait for the
+    fork.
+    """
+
+    def __init__(self, envClass: Type[BaseEnv] = CounterTrafficEnv, envKwargs: Dict[str, Any] = None,
+                    prefork: bool = True):
+        """
+        Args:
+            envClass: The environment class to be instantiated (with
+                `envKwargs`) in the template process
+            envKwargs: Keyword arguments for the `envClass` constructor
+            prefork: Whether to fork the process for the next episode in
+                advance
+        """
+        self.prefork = prefork
+        self.server = TemplateForkServer(envClass, envKwargs)
+        """TemplateForkServer: The fork server providing the episode processes"""
+
+        self.observation_space = self.server.observationSpace
+        self.action_space = self.server.actionSpace
+        self.episode = 0
+        """int: The number of episodes that have been started"""
+
+        self._conn: Connection = None
+        self._seed = None
+        self._seedEpisode = 0
+        # The connection to the preforked episode process and its seed
+        self._nextConn: Connection = None
+        self._nextSeed = None
+
+    def seed(self, seed: int = None):
+        """
+        Sets the seed for the environments of subsequent episodes: The
+        environment of the n-th episode after this call is seeded with `seed`
+        + n. Returns the seed in a single-item list.
+        """
+        self._seed = seed
+        self._seedEpisode = self.episode
+        return [seed]
+
+    @staticmethod
+    def _closeEpisode(conn: Connection):
+        try:
+            conn.send(("close", None))
+        except (BrokenPipeError, OSError):
+            pass
+        conn.close()
+
+    def _endEpisode(self):
+        if self._conn is not None:
+            self._closeEpisode(self._conn)
+            self._conn = None
+
+    def _episodeSeed(self, episode: int) -> int:
+        # The seed for the given episode
+        return None if self._seed is None else self._seed + episode - self._seedEpisode
+
+    def reset(self):
+        """
+        Ends the current episode (if any), starts a new episode process forked
+        from the template, and returns its initial observation.
+        """
+        self._endEpisode()
+        seed = self._episodeSeed(self.episode)
+        conn, self._nextConn = self._nextConn, None
+        if conn is not None and self._nextSeed != seed:
+            # The seed has changed since the episode process was forked
+            self._closeEpisode(conn)
+            conn = None
+        if conn is None:
+            conn = self.server.requestEpisode(seed)
+        observation = self.server.waitForEpisode(conn)
+        self._conn = conn
+        self.episode += 1
+        if self.prefork:
+            self._nextSeed = self._episodeSeed(self.episode)
+            self._nextConn = self.server.requestEpisode(self._nextSeed)
+        return observation
+
+    def step(self, action):
+        """
+        Performs `action` in the current episode's environment and returns its
+        (observation, reward, done, info) tuple.
+
+        Raises:
+            RuntimeError: If no episode has been started via :meth:`reset` or
+                the episode's environment failed
+        """
+        if self._conn is None:
+            raise RuntimeError("reset() has to be called before step()")
+        self._conn.send(("step", action))
+        ok, result = self._conn.recv()
+        if not ok:
+            raise RuntimeError("Stepping the environment failed:\n{}".format(result))
+        return result
+
+    def close(self):
+        """
+        Ends the current episode and stops the template process.
+        """
+        self._endEpisode()
+        if self._nextConn is not None:
+            self._closeEpisode(self._nextConn)
+            self._nextConn = None
+        self.server.shutdown()
@@ -0,0 +1,401 @@
+"""
+A vectorized environment that spreads its sub-environments across worker
+processes and exchanges actions and results via shared memory.
+
+Note:
+    This module relies on :mod:`multiprocessing.shared_memory` and therefore
+    requires Python 3.8 or newer. Unlike the other environment modules, it is
+    not imported by :mod:`gymwipe.envs`.
+"""
+import multiprocessing as mp
+import os
+import traceback
+from collections import namedtuple
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from time import perf_counter
+from typing import Any, Dict, List, Sequence, Tuple, Type, Union
+
+import numpy as np
+from gym.vector import VectorEnv
+
+from gymwipe.envs.counter_traffic import CounterTrafficEnv
+from gymwipe.networking.construction import Module
+from gymwipe.networking.simple_stack import SimplePhy
+
+
+WorkerPoolStatistics = namedtuple("WorkerPoolStatistics", ["steps", "meanStepLatency", "meanIpcTime",
+                                                           "workerUtilization"])
+"""
+Statistics of a :class:`SubprocessVectorEnv` since its creation (or the last
+:meth:`~SubprocessVectorEnv.resetStatistics` call): The number of `steps`, the
+mean wall-clock time of a step (`meanStepLatency`, in seconds), the mean time
+per step that was not spent stepping environments in the slowest worker
+(`meanIpcTime`, in seconds; this covers the communication with the workers),
+and a NumPy array with the fraction of the step time that each worker spent
+stepping its environments (`workerUtilization`).
+"""
+
+class _SharedBuffers:
+    """
+    NumPy arrays for the actions ((device, duration) rows), observations,
+    rewards, and done flags of `numEnvs`
+    :class:`~gymwipe.envs.counter_traffic.CounterTrafficEnv` instances that
+    are backed by shared memory blocks
+    """
+
+    # The dtype of every array
+    _DTYPES = {"actions": np.int64, "observations": np.int64, "rewards": np.float64, "dones": np.bool_}
+
+    def __init__(self, numEnvs: int, names: Dict[str, str] = None):
+        """
+        Creates the shared memory blocks, or attaches to the existing blocks
+        with the given `names` if `names` is provided.
+        """
+        shapes = {
+            "actions": (numEnvs, 2),
+            "observations": (numEnvs,),
+            "rewards": (numEnvs,),
+            "dones": (numEnvs,)
+        }
+        self._blocks: Dict[str, SharedMemory] = {}
+        for name, dtype in self._DTYPES.items():
+            dtype = np.dtype(dtype)
+            size = int(np.prod(shapes[name])) * dtype.itemsize
+            if names is None:
+                block = SharedMemory(create=True, size=size)
+            else:
+                block = SharedMemory(name=names[name])
+            self._blocks[name] = block
+            setattr(self, name, np.ndarray(shapes[name], dtype=dtype, buffer=block.buf))
+
+    @property
+    def names(self) -> Dict[str, str]:
+        """Dict[str, str]: The names of the shared memory blocks"""
+        return {name: block.name for name, block in self._blocks.items()}
+
+    def close(self, unlink: bool = False):
+        """
+        Closes the shared memory blocks and, if `unlink` is ``True``, destroys
+        them.
+        """
+        for name in self._DTYPES:
+            # Arrays have to be released before the memory can be closed
+            setattr(self, name, None)
+        for block in self._blocks.values():
+            block.close()
+            if unlink:
+                block.unlink()
+        self._blocks = {}
+
+def _subprocessWorker(conn: Connection, phyClass: Type[Module], envIndices: List[int], numEnvs: int,
+                        cpu: int):
+    """
+    The main function of a :class:`SubprocessVectorEnv` worker process
+    """
+    buffers = None
+    try:
+        if cpu is not None:
+            os.sched_setaffinity(0, {cpu})
+        envs = [CounterTrafficEnv(phyClass) for _ in envIndices]
+        conn.send((envs[0].observation_space, envs[0].action_space))
+        buffers = _SharedBuffers(numEnvs, conn.recv())
+
+        while True:
+            command, arg = conn.recv()
+            startTime = perf_counter()
+            if command == "step":
+                infos = []
+                for i, env in zip(envIndices, envs):
+                    device, duration = buffers.actions[i]
+                    observation, reward, done, info = env.step({"device": int(device), "duration": int(duration)})
+                    buffers.observations[i] = observation
+                    buffers.rewards[i] = reward
+                    buffers.dones[i] = done
+                    infos.append(info)
+                result = infos
+            elif command == "reset":
+                for i, env in zip(envIndices, envs):
+                    buffers.observations[i] = env.reset()
+                result = None
+            elif command == "seed":
+                result = [env.seed(None if arg is None else arg + i)[0] for i, env in zip(envIndices, envs)]
+            elif command == "close":
+                break
+            else:
+                raise ValueError("Unknown command {}".format(command))
+            conn.send((True, result, perf_counter() - startTime))
+    except (KeyboardInterrupt, EOFError):
+        pass
+    except Exception:
+        conn.send((False, traceback.format_exc(), 0.0))
+    finally:
+        if buffers is not None:
+            buffers.close()
+        conn.close()
+
+class SubprocessVectorEnv(VectorEnv):
+    """
+    A vectorized :class:`~gymwipe.envs.counter_traffic.CounterTrafficEnv`
+    that spreads `numEnvs` :class:`~gymwipe.envs.counter_traffic.CounterTrafficEnv`
+    instances across `numWorkers` worker processes on the local machine. Each
+    worker steps its share of the environments sequentially.
+
+    Actions, observations, rewards, and done flags are exchanged via
+    :mod:`multiprocessing.shared_memory` arrays, so they are not pickled for
+    every step. Only the commands and the info dicts are sent through pipes.
+    Like for the :class:`~gymwipe.envs.vector.CounterTrafficVectorEnv`,
+    :meth:`step` and :meth:`reset` return the shared arrays themselves
+    (:attr:`observations`, :attr:`rewards`, and :attr:`dones`), so copy them if
+    you need them after the next call.
+
+    Workers are started once and reused across resets. If supported by the
+    operating system, every worker is pinned to one of the CPUs available to
+    the current process. :attr:`statistics` reports step latency, IPC time,
+    and worker utilization to help finding a suitable number of workers per
+    host.
+
+    If a worker fails, the vector environment is closed and the worker's
+    error is raised as a :class:`RuntimeError`.
+
+    Note:
+        Sub-environments are not reset automatically when their episodes are
+        done.
+    """
+
+    def __init__(self, numEnvs: int, phyClass: Type[Module] = SimplePhy, numWorkers: int = None,
+                    pinWorkers: bool = True, startMethod: str = None):
+        """
+        Args:
+            numEnvs: The number of sub-environments
+            phyClass: The physical layer class to be used by all devices (see
+                :class:`~gymwipe.envs.counter_traffic.CounterTrafficEnv`)
+            numWorkers: The number of worker processes. Defaults to the number
+                of available CPUs, but not more than `numEnvs`.
+            pinWorkers: Whether to pin every worker to a single CPU (if
+                supported by the operating system)
+            startMethod: The :mod:`multiprocessing` start method to be used
+                for the workers, defaults to the platform's default
+
+        Raises:
+            ValueError: If `numEnvs` or `numWorkers` is not positive
+        """
+        if numEnvs < 1:
+            raise ValueError("numEnvs has to be positive, got {}".format(numEnvs))
+        canPin = hasattr(os, "sched_getaffinity") and hasattr(os, "sched_setaffinity")
+        cpus = sorted(os.sched_getaffinity(0)) if canPin else list(range(os.cpu_count() or 1))
+        if numWorkers is None:
+            numWorkers = min(numEnvs, len(cpus))
+        if not 1 <= numWorkers <= numEnvs:
+            raise ValueError("numWorkers has to be in [1, numEnvs], got {}".format(numWorkers))
+
+        self.workerCpus: List[int] = [cpus[w % len(cpus)] if pinWorkers and canPin else None
+                                      for w in range(numWorkers)]
+        """
+        List[int]: The CPU that every worker is pinned to (``None`` for workers
+        that are not pinned)
+        """
+
+        self._envIndices = [[int(i) for i in indices] for indices in np.array_split(np.arange(numEnvs), numWorkers)]
+        context = mp.get_context(startMethod)
+        # Workers attaching to the shared memory have to use the resource
+        # tracker of this process, as a worker's own tracker would destroy the
+        # shared memory when the worker exits
+        resource_tracker.ensure_running()
+        self._connections: List[Connection] = []
+        self._processes = []
+        self._buffers = None
+        for w in range(numWorkers):
+            parentConn, childConn = context.Pipe()
+            process = context.Process(target=_subprocessWorker, name="SubprocessVectorEnv worker {}".format(w),
+                                      args=(childConn, phyClass, self._envIndices[w], numEnvs,
+                                            self.workerCpus[w]),
+                                      daemon=True)
+            process.start()
+            childConn.close()
+            self._connections.append(parentConn)
+            self._processes.append(process)
+
+        try:
+            observationSpace, actionSpace = self._receiveAll()[0]
+            self._buffers = _SharedBuffers(numEnvs)
+            for conn in self._connections:
+                conn.send(self._buffers.names)
+        except Exception:
+            self._terminate()
+            raise
+
+        super(SubprocessVectorEnv, self).__init__(numEnvs, observationSpace, actionSpace)
+
+        self.observations: np.ndarray = self._buffers.observations
+        """numpy.ndarray: The latest observation of every sub-environment (shared memory)"""
+
+        self.rewards: np.ndarray = self._buffers.rewards
+        """numpy.ndarray: The latest reward of every sub-environment (shared memory)"""
+
+        self.dones: np.ndarray = self._buffers.dones
+        """numpy.ndarray: The latest done flag of every sub-environment (shared memory)"""
+
+        self.infos: List[Dict] = [{} for _ in range(numEnvs)]
+        """List[Dict]: The latest info dict of every sub-environment"""
+
+        self._stepStartTime = None
+        self.resetStatistics()
+
+    @property
+    def numWorkers(self) -> int:
+        """int: The number of worker processes"""
+        return len(self._processes)
+
+    def _receiveAll(self) -> List[Any]:
+        # Receives a message from every worker and returns the messages. If a
+        # worker failed, the messages of the remaining workers are received
+        # anyway, the workers are stopped, and the errors are raised.
+        results = []
+        errors = []
+        for w, conn in enumerate(self._connections):
+            try:
+                message = conn.recv()
+            except EOFError:
+                errors.append("Worker {} terminated unexpectedly".format(w))
+                continue
+            if isinstance(message, tuple) and len(message) == 3 and message[0] is False:
+                errors.append("Worker {} failed:\n{}".format(w, message[1]))
+            else:
+                results.append(message)
+        if len(errors) > 0:
+            self._terminate()
+            self.closed = True
+            raise RuntimeError("\n".join(errors))
+        return results
+
+    def _checkOpen(self):
+        if self.closed:
+            raise RuntimeError("The environment has been closed")
+
+    def _command(self, command: str, arg: Any = None) -> List[Tuple[bool, Any, float]]:
+        self._checkOpen()
+        for conn in self._connections:
+            conn.send((command, arg))
+        return self._receiveAll()
+
+    def seed(self, seed: int = None) -> List[int]:
+        """
+        Seeds the sub-environments with `seed`, `seed` + 1, etc. (or with
+        ``None`` if `seed` is ``None``) and returns a list of the seeds.
+        """
+        seeds = []
+        for _, workerSeeds, _ in self._command("seed", seed):
+            seeds += workerSeeds
+        return seeds
+
+    def reset_wait(self, **kwargs) -> np.ndarray:
+        """
+        Resets all sub-environments and returns :attr:`observations`.
+        """
+        self._command("reset")
+        self.rewards[:] = 0
+        self.dones[:] = False
+        return self.observations
+
+    def step_async(self, actions: Union[Sequence[Dict[str, int]], Dict[str, Sequence[int]]]):
+        """
+        Writes the `actions` to shared memory and makes the workers step their
+        environments.
+
+        Args:
+            actions: Either a sequence of one action dict per sub-environment,
+                or a single dict mapping ``"device"`` and ``"duration"`` to
+                sequences (like NumPy arrays) with one value per
+                sub-environment
+
+        Raises:
+            ValueError: If the number of actions does not match the number of
+                environments or an action is invalid
+        """
+        self._checkOpen()
+        startTime = perf_counter()
+        if isinstance(actions, dict):
+            devices, durations = np.asarray(actions["device"]), np.asarray(actions["duration"])
+        else:
+            devices = np.array([action["device"] for action in actions])
+            durations = np.array([action["duration"] for action in actions])
+        if devices.shape != (self.num_envs,) or durations.shape != (self.num_envs,):
+            raise ValueError("Expected {} actions, got {}".format(self.num_envs, len(devices)))
+        deviceSpace = self.single_action_space["device"]
+        durationSpace = self.single_action_space["duration"]
+        if (np.any(devices < 0) or np.any(devices >= deviceSpace.n)
+                or np.any(durations < 0) or np.any(durations >= durationSpace.n)):
+            raise ValueError("Invalid actions {}".format(actions))
+        self._buffers.actions[:, 0] = devices
+        self._buffers.actions[:, 1] = durations
+        self._stepStartTime = startTime
+        for conn in self._connections:
+            conn.send(("step", None))
+
+    def step_wait(self, **kwargs) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[Dict[str, Any]]]:
+        """
+        Waits for the workers to step their environments and returns the
+        :attr:`observations`, :attr:`rewards`, :attr:`dones`, and
+        :attr:`infos`.
+        """
+        if self._stepStartTime is None:
+            raise RuntimeError("step_async() has to be called before step_wait()")
+        maxBusyTime = 0.0
+        for w, (_, infos, busyTime) in enumerate(self._receiveAll()):
+            for i, info in zip(self._envIndices[w], infos):
+                self.infos[i] = info
+            self._workerBusyTime[w] += busyTime
+            maxBusyTime = max(maxBusyTime, busyTime)
+        latency = perf_counter() - self._stepStartTime
+        self._stepStartTime = None
+        self._steps += 1
+        self._stepTime += latency
+        self._ipcTime += max(latency - maxBusyTime, 0.0)
+        return self.observations, self.rewards, self.dones, self.infos
+
+    @property
+    def statistics(self) -> WorkerPoolStatistics:
+        """
+        WorkerPoolStatistics: Step latency, IPC time, and worker utilization
+        statistics (see :class:`WorkerPoolStatistics`)
+        """
+        steps = self._steps
+        if steps == 0:
+            return WorkerPoolStatistics(0, 0.0, 0.0, np.zeros(self.numWorkers))
+        return WorkerPoolStatistics(steps, self._stepTime / steps, self._ipcTime / steps,
+                                    self._workerBusyTime / self._stepTime)
+
+    def resetStatistics(self):
+        """
+        Resets the :attr:`statistics`.
+        """
+        self._steps = 0
+        self._stepTime = 0.0
+        self._ipcTime = 0.0
+        self._workerBusyTime = np.zeros(self.numWorkers)
+
+    def _terminate(self):
+        # Stops all workers and releases the shared memory
+        for conn in self._connections:
+            try:
+                conn.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._connections:
+            conn.close()
+        if self._buffers is not None:
+            self.observations = self.rewards = self.dones = None
+            self._buffers.close(unlink=True)
+            self._buffers = None
+
+    def close_extras(self, **kwargs):
+        """
+        Stops the worker processes and releases the shared memory.
+        """
+        self._terminate()
@@ -0,0 +1,141 @@
+"""
+Vectorized environments that step multiple independent simulations at once
+in the current process (see :mod:`gymwipe.envs.subprocess_vector` for
+environments that are spread across worker processes)
+
+Note:
+    This module relies on :mod:`gym.vector` and therefore requires gym 0.15 or
+    newer. Unlike the other environment modules, it is not imported by
+    :mod:`gymwipe.envs`.
+"""
+from typing import Any, Dict, List, Sequence, Tuple, Type, Union
+
+import numpy as np
+from gym.vector import VectorEnv
+
+from gymwipe.envs.counter_traffic import CounterTrafficEnv
+from gymwipe.networking.construction import Module
+from gymwipe.networking.simple_stack import SimplePhy
+
+
+class CounterTrafficVectorEnv(VectorEnv):
+    """
+    A vectorized :class:`~gymwipe.envs.counter_traffic.CounterTrafficEnv`:
+    Holds `numEnvs` independent :class:`~gymwipe.envs.counter_traffic.CounterTrafficEnv`
+    simulations in the current process and steps all of them with a batch of
+    actions.
+
+    Observations, rewards, and done flags are written to NumPy arrays that are
+    allocated once on construction (:attr:`observations`, :attr:`rewards`, and
+    :attr:`dones`). :meth:`step` and :meth:`reset` return these arrays
+    themselves, so copy them if you need them after the next call.
+
+    Note:
+        Like the :class:`~gymwipe.envs.counter_traffic.CounterTrafficEnv`, the
+        vector environment does not reset sub-environments automatically when
+        their episodes are done.
+    """
+
+    def __init__(self, numEnvs: int, phyClass: Type[Module] = SimplePhy):
+        """
+        Args:
+            numEnvs: The number of sub-environments
+            phyClass: The physical layer class to be used by all devices (see
+                :class:`~gymwipe.envs.counter_traffic.CounterTrafficEnv`)
+        """
+        if numEnvs < 1:
+            raise ValueError("numEnvs has to be positive, got {}".format(numEnvs))
+
+        self.envs: List[CounterTrafficEnv] = [CounterTrafficEnv(phyClass) for _ in range(numEnvs)]
+        """
+        List[CounterTrafficEnv]: The sub-environments
+        """
+
+        env = self.envs[0]
+        super(CounterTrafficVectorEnv, self).__init__(numEnvs, env.observation_space, env.action_space)
+
+        self.observations = np.zeros(numEnvs, dtype=np.int64)
+        """numpy.ndarray: The latest observation of every sub-environment"""
+
+        self.rewards = np.zeros(numEnvs, dtype=np.float64)
+        """numpy.ndarray: The latest reward of every sub-environment"""
+
+        self.dones = np.zeros(numEnvs, dtype=np.bool_)
+        """numpy.ndarray: The latest done flag of every sub-environment"""
+
+        self.infos: List[Dict] = [{} for _ in range(numEnvs)]
+        """List[Dict]: The latest info dict of every sub-environment"""
+
+        self._assignSignals = [None] * numEnvs
+
+    def seed(self, seed: int = None) -> List[int]:
+        """
+        Seeds the sub-environments with `seed`, `seed` + 1, etc. (or with
+        ``None`` if `seed` is ``None``) and returns a list of the seeds.
+        """
+        seeds = []
+        for i, env in enumerate(self.envs):
+            seeds += env.seed(None if seed is None else seed + i)
+        return seeds
+
+    def reset_wait(self, **kwargs) -> np.ndarray:
+        """
+        Resets all sub-environments and returns :attr:`observations`.
+        """
+        for i, env in enumerate(self.envs):
+            self.observations[i] = env.reset()
+        self.rewards[:] = 0
+        self.dones[:] = False
+        return self.observations
+
+    def _iterActions(self, actions: Union[Sequence[Dict[str, int]], Dict[str, Sequence[int]]]):
+        # Yields (device, duration) tuples from a sequence of action dicts or
+        # a dict of action arrays
+        if isinstance(actions, dict):
+            devices, durations = actions["device"], actions["duration"]
+        else:
+            devices = [action["device"] for action in actions]
+            durations = [action["duration"] for action in actions]
+        if len(devices) != self.num_envs or len(durations) != self.num_envs:
+            raise ValueError("Expected {} actions, got {}".format(self.num_envs, len(devices)))
+        for device, duration in zip(devices, durations):
+            action = {"device": int(device), "duration": int(duration)}
+            if not self.single_action_space.contains(action):
+                raise ValueError("Invalid action {}".format(action))
+            yield action
+
+    def step_async(self, actions: Union[Sequence[Dict[str, int]], Dict[str, Sequence[int]]]):
+        """
+        Makes the RRM of every sub-environment assign the frequency band as
+        specified by the corresponding action, without running the
+        simulations.
+
+        Args:
+            actions: Either a sequence of one action dict per sub-environment,
+                or a single dict mapping ``"device"`` and ``"duration"`` to
+                sequences (like NumPy arrays) with one value per
+                sub-environment
+        """
+        for i, (env, action) in enumerate(zip(self.envs, list(self._iterActions(actions)))):
+            self._assignSignals[i] = env.startStep(action)
+
+    def step_wait(self, **kwargs) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[Dict[str, Any]]]:
+        """
+        Runs every sub-environment's simulation until its frequency band
+        assignment has been processed and returns the :attr:`observations`,
+        :attr:`rewards`, :attr:`dones`, and :attr:`infos`.
+        """
+        for i, env in enumerate(self.envs):
+            assignSignal = self._assignSignals[i]
+            if assignSignal is None:
+                raise RuntimeError("step_async() has to be called before step_wait()")
+            observation, reward, done, info = env.finishStep(assignSignal)
+            self.observations[i] = observation
+            self.rewards[i] = reward
+            self.dones[i] = done
+            self.infos[i] = info
+            self._assignSignals[i] = None
+        return self.observations, self.rewards, self.dones, self.infos
+
+    def close_extras(self, **kwargs):
+        pass
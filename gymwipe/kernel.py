@@ -0,0 +1,188 @@
+"""
+A lightweight SimPy-compatible event kernel.
+
+The :class:`LightEnvironment` is a drop-in replacement for SimPy's
+:class:`~simpy.core.Environment` that can be selected via
+:meth:`SimulationManager.init() <gymwipe.simtools.SimulationManager.init>`. It
+reuses SimPy's event classes (so :class:`~simpy.events.Event`,
+:class:`~simpy.events.Timeout`, :class:`~simpy.events.Process`, and conditions
+like ``a | b`` keep working unchanged), but replaces the scheduler:
+
+    * Events scheduled for the current simulated time (like succeeded events,
+      process initializations, and zero-delay timeouts) are kept in two FIFO
+      queues (one per priority) instead of the heap. In a slotted network
+      simulation, most events are of that kind. Neither a heap operation nor
+      a heap entry tuple is required for them.
+    * :meth:`~LightEnvironment.run` processes events in a single loop instead
+      of calling :meth:`~simpy.core.Environment.step` for every event.
+
+Events are processed in exactly the same order as by SimPy: Ordered by time,
+then by priority, then by scheduling order. Events in the FIFO queues have
+been scheduled after all heap entries for the current time, so heap entries
+take precedence over queued events of the same priority.
+"""
+from collections import deque
+from heapq import heappop, heappush
+from typing import Any, Optional, Union
+
+from simpy.core import (NORMAL, URGENT, EmptySchedule, Environment, Infinity,
+                        StopSimulation)
+from simpy.events import Event
+
+
+class LightEnvironment(Environment):
+    """
+    A SimPy :class:`~simpy.core.Environment` with a scheduler that is
+    specialized on events for the current simulated time (see the module
+    description).
+    """
+
+    def __init__(self, initial_time: Union[int, float] = 0):
+        super(LightEnvironment, self).__init__(initial_time)
+        self._urgent = deque()
+        self._normal = deque()
+
+    def queueSize(self) -> int:
+        """
+        Returns the number of scheduled events
+        """
+        return len(self._queue) + len(self._urgent) + len(self._normal)
+
+    def nextEvent(self) -> Optional[Event]:
+        """
+        Returns the event that will be processed next, or ``None`` if no event
+        is scheduled
+        """
+        heap = self._queue
+        if self._urgent or self._normal:
+            if heap and heap[0][0] == self._now and heap[0][1] <= (URGENT if self._urgent else NORMAL):
+                return heap[0][3]
+            return self._urgent[0] if self._urgent else self._normal[0]
+        if heap:
+            return heap[0][3]
+        return None
+
+    def peek(self) -> Union[int, float]:
+        """
+        Returns the time of the next scheduled event, or
+        :data:`~simpy.core.Infinity` if there is no further event
+        """
+        if self._urgent or self._normal:
+            return self._now
+        if self._queue:
+            return self._queue[0][0]
+        return Infinity
+
+    def schedule(self, event: Event, priority: int = NORMAL, delay: Union[int, float] = 0):
+        """
+        Schedules `event` with the given `priority` and `delay`.
+        """
+        at = self._now + delay
+        if at == self._now:
+            if priority == NORMAL:
+                self._normal.append(event)
+                return
+            if priority == URGENT:
+                self._urgent.append(event)
+                return
+        heappush(self._queue, (at, priority, next(self._eid), event))
+
+    def _popEvent(self) -> Event:
+        """
+        Removes the next event from the schedule (updating the simulated time)
+        and returns it
+
+        Raises:
+            EmptySchedule: If no event is scheduled
+        """
+        heap = self._queue
+        urgent = self._urgent
+        if urgent or self._normal:
+            if heap and heap[0][0] == self._now and heap[0][1] <= (URGENT if urgent else NORMAL):
+                return heappop(heap)[3]
+            return urgent.popleft() if urgent else self._normal.popleft()
+        if heap:
+            self._now, _, _, event = heappop(heap)
+            return event
+        raise EmptySchedule()
+
+    def _processCallbacks(self, event: Event):
+        # Process callbacks like simpy.core.Environment.step() does
+        callbacks, event.callbacks = event.callbacks, None
+        try:
+            for callback in callbacks:
+                callback(event)
+        except StopSimulation:
+            # Reassociate any remaining callbacks with the event and reschedule
+            # the event to be processed when the simulation resumes.
+            event.callbacks = callbacks[callbacks.index(callback) + 1:]
+            self.schedule(event, -1)
+            raise
+
+        if not event._ok and not hasattr(event, "_defused"):
+            # The event has failed and has not been defused: Crash the
+            # environment.
+            exc = type(event._value)(*event._value.args)
+            exc.__cause__ = event._value
+            raise exc
+
+    def step(self):
+        """
+        Processes the next event.
+
+        Raises:
+            EmptySchedule: If no further events are available
+        """
+        self._processCallbacks(self._popEvent())
+
+    def run(self, until: Optional[Union[int, float, Event]] = None) -> Optional[Any]:
+        """
+        Processes events until the given criterion `until` is met, like
+        :meth:`simpy.core.Environment.run` does.
+        """
+        if until is not None:
+            if not isinstance(until, Event):
+                at = until if isinstance(until, int) else float(until)
+                if at <= self.now:
+                    raise ValueError("until ({}) must be greater than the current simulation time".format(at))
+                # Schedule the event before all regular timeouts
+                until = Event(self)
+                until._ok = True
+                until._value = None
+                self.schedule(until, URGENT, at - self.now)
+            elif until.callbacks is None:
+                # The until event has already been processed
+                return until.value
+            until.callbacks.append(StopSimulation.callback)
+
+        try:
+            if "step" in self.__dict__ or "schedule" in self.__dict__:
+                # step or schedule have been replaced (e.g. by kernel
+                # statistics), so use the regular step-by-step loop
+                while True:
+                    self.step()
+            else:
+                popEvent = self._popEvent
+                processCallbacks = self._processCallbacks
+                while True:
+                    event = popEvent()
+                    callbacks = event.callbacks
+                    if len(callbacks) == 1 and event._ok:
+                        # Fast path for the most common case
+                        event.callbacks = None
+                        try:
+                            callbacks[0](event)
+                        except StopSimulation:
+                            event.callbacks = []
+                            self.schedule(event, -1)
+                            raise
+                    else:
+                        processCallbacks(event)
+        except StopSimulation as exc:
+            return exc.args[0]
+        except EmptySchedule:
+            if until is not None:
+                assert not until.triggered
+                raise RuntimeError("No scheduled events left but \"until\" event was not "
+                                   "triggered: {}".format(until)) from None
+        return None
@@ -10,6 +10,8 @@ implementations. Currently contains:
 import logging
 from math import log10, sqrt
 
+import numpy as np
+
 from gymwipe.devices import Device
 from gymwipe.networking.physical import PositionalAttenuationModel, FrequencyBandSpec
 from gymwipe.simtools import SimTimePrepender
@@ -37,3 +39,15 @@ class FsplAttenuation(PositionalAttenuationModel):
     
     def _positionChanged(self, device: Device):
         self._update()
+
+    @classmethod
+    def calculateAttenuations(cls, frequencyBandSpec: FrequencyBandSpec, position: np.ndarray,
+                                positions: np.ndarray) -> np.ndarray:
+        distances = np.hypot(positions[:, 0] - position[0], positions[:, 1] - position[1])
+        attenuations = np.zeros(len(distances))
+        # Like FsplAttenuation instances, leave the attenuation of equivalent
+        # positions at 0
+        nonZero = distances > 0
+        attenuations[nonZero] = 20*np.log10(distances[nonZero]) \
+                                + 20*log10(frequencyBandSpec.frequency) - 147.55
+        return attenuations
@@ -0,0 +1,275 @@
+"""
+Tools for calibrating packet error rate tables (see
+:class:`~gymwipe.networking.physical.PacketErrorRateTable`) by running the
+bit-level :class:`~gymwipe.networking.simple_stack.SimplePhy` and
+:class:`~gymwipe.networking.physical.BpskMcs` pipeline. Calibrated tables can
+be used by abstracted physical layers like
+:class:`~gymwipe.networking.simple_stack.LinkLevelPhy`.
+
+A calibration is run via :func:`calibrate`, which stores its results in an
+npz file. Simulation results of grid points that are already
+contained in that file are reused, so that changing a few grid points only
+requires those points to be simulated. :func:`loadPacketErrorRateTables`
+loads such a file and returns one table per code rate.
+
+The module can also be run as a script:
+
+.. code-block:: bash
+
+    python -m gymwipe.networking.calibration per.npz --sinrs 40 70 0.5 --sizes 64 512 4096
+"""
+import argparse
+import logging
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+from scipy.optimize import curve_fit
+
+from gymwipe.devices import Device
+from gymwipe.networking.attenuation_models import FsplAttenuation
+from gymwipe.networking.construction import Port
+from gymwipe.networking.messages import (FakeTransmittable, Message, Packet,
+                                         StackMessageTypes)
+from gymwipe.networking.physical import (BpskMcs, FrequencyBand,
+                                         PacketErrorRateTable, milliwattsToDbm)
+from gymwipe.networking.simple_stack import SimplePhy
+from gymwipe.simtools import SimMan, SimulationManager
+
+logger = logging.getLogger(__name__)
+
+GridPoint = Tuple[float, int, Fraction]
+"""A tuple of an SINR value in dB, a block size in bits, and a code rate"""
+
+SENDER_DISTANCE = 1.0
+"""float: The distance in metres between the sender and the receiver device"""
+
+def simulateReceptions(sinr: float, blockSize: int, codeRate: Fraction, runs: int,
+                        shadowingStd: float = 0.0, seed: int = None) -> int:
+    """
+    Simulates `runs` transmissions of a packet via :class:`~gymwipe.networking.simple_stack.SimplePhy`
+    layers and returns the number of packets that have been received
+    successfully. The packet's header and payload both have a size of
+    `blockSize` bits, so that the reception of a packet succeeds if and only if
+    a block of `blockSize` bits is received successfully.
+
+    Args:
+        sinr: The SINR at the receiver in dB
+        blockSize: The block size in bits (a multiple of 8)
+        codeRate: The code rate of the :class:`~gymwipe.networking.physical.BpskMcs`
+            to be used
+        runs: The number of transmissions to be simulated
+        shadowingStd: The standard deviation (in dB) of a normally distributed
+            offset that is added to the SINR of each transmission
+        seed: The seed for the shadowing offsets
+
+    The transmissions are simulated by a private
+    :class:`~gymwipe.simtools.SimulationManager`, so that a simulation of the
+    caller is not affected.
+    """
+    rng = random.Random(seed)
+    successes = 0
+    with SimulationManager():
+        for _ in range(runs):
+            SimMan.init()
+            frequencyBand = FrequencyBand([FsplAttenuation])
+            sender = Device("Sender", 0, 0)
+            receiver = Device("Receiver", SENDER_DISTANCE, 0)
+            senderPhy = SimplePhy("Phy", sender, frequencyBand)
+            receiverPhy = SimplePhy("Phy", receiver, frequencyBand)
+
+            receivedPackets = []
+            def onPacketReceived(packet):
+                receivedPackets.append(packet)
+            receiverPort = Port("Receiver Stack")
+            receiverPort.input.nReceives.subscribeCallback(onPacketReceived)
+            receiverPhy.gates["macOut"].connectTo(receiverPort.input)
+
+            # Choose the transmission power so that the SINR is met
+            noisePower = milliwattsToDbm(receiverPhy._thermalNoisePower)
+            attenuation = frequencyBand.getAttenuation(sender, receiver)
+            offset = rng.gauss(0, shadowingStd) if shadowingStd > 0 else 0.0
+            power = noisePower + sinr + offset + attenuation
+
+            mcs = BpskMcs(frequencyBand.spec, codeRate)
+            packet = Packet(FakeTransmittable(blockSize // 8), FakeTransmittable(blockSize // 8))
+            cmd = Message(StackMessageTypes.SEND, {"packet": packet, "power": power, "mcs": mcs})
+            senderPhy.gates["macIn"].send(cmd)
+            SimMan.runSimulation(cmd.eProcessed)
+            successes += len(receivedPackets)
+    return successes
+
+def _simulateGridPoint(args: Tuple) -> int:
+    # Process pool helper
+    return simulateReceptions(*args)
+
+def _logistic(sinr: np.ndarray, midpoint: float, width: float) -> np.ndarray:
+    return 1 / (1 + np.exp((sinr - midpoint) / width))
+
+def fitPacketErrorRateCurve(sinrs: np.ndarray, packetErrorRates: np.ndarray) -> np.ndarray:
+    """
+    Fits a packet error rate curve to the packet error rates measured at the
+    given SINR values and returns the fitted packet error rates. The curve is a
+    logistic function of the SINR (in dB). If the measured values only consist
+    of zeros and ones (as it is the case without shadowing), the measured
+    values are returned in a non-increasing form.
+
+    Args:
+        sinrs: The ascending SINR values in dB
+        packetErrorRates: The measured packet error rates for `sinrs`
+    """
+    # Packet error rates do not increase with the SINR
+    monotonic = np.minimum.accumulate(np.asarray(packetErrorRates, dtype=float))
+    if np.all((monotonic == 0) | (monotonic == 1)) or len(sinrs) < 3:
+        return monotonic
+    midpointGuess = sinrs[np.argmin(np.abs(monotonic - 0.5))]
+    try:
+        (midpoint, width), _ = curve_fit(_logistic, sinrs, monotonic, p0=(midpointGuess, 1.0))
+    except RuntimeError:
+        logger.warning("Fitting a packet error rate curve failed, using the measured values.")
+        return monotonic
+    return _logistic(sinrs, midpoint, width)
+
+def _codeRatesToArray(codeRates: Iterable[Fraction]) -> np.ndarray:
+    return np.array([[c.numerator, c.denominator] for c in codeRates], dtype=np.int64).reshape(-1, 2)
+
+def _arrayToCodeRates(array: np.ndarray) -> List[Fraction]:
+    return [Fraction(int(n), int(d)) for n, d in array]
+
+def _loadRawResults(path: str, runs: int, shadowingStd: float) -> Dict[GridPoint, int]:
+    """
+    Returns a dict mapping grid points to the number of successful receptions
+    that are stored in the calibration file at `path`, provided the file was
+    created with the same number of runs and the same shadowing.
+    """
+    if not os.path.exists(path):
+        return {}
+    with np.load(path) as data:
+        if int(data["runs"]) != runs or float(data["shadowingStd"]) != shadowingStd:
+            logger.info("Calibration settings changed, ignoring existing results in %s", path)
+            return {}
+        points = zip(data["rawSinrs"].tolist(), data["rawBlockSizes"].tolist(),
+                        _arrayToCodeRates(data["rawCodeRates"]))
+        return dict(zip(points, data["rawSuccesses"].tolist()))
+
+def calibrate(path: str, sinrs: Iterable[float], blockSizes: Iterable[int],
+                codeRates: Iterable[Fraction] = (Fraction(3,4),), runs: int = 1,
+                shadowingStd: float = 0.0, processes: int = None, seed: int = 0):
+    """
+    Runs the calibration for all combinations of the given SINR values, block
+    sizes, and code rates and saves the results to an npz file at `path`. If
+    the file exists and has been created with the same `runs` and
+    `shadowingStd` values, the results of the grid points it contains are
+    reused and only the remaining grid points are simulated.
+
+    The file contains the simulation results of all grid points that have been
+    simulated (``raw*`` arrays) and the fitted packet error rates for the
+    requested grid (``sinrs``, ``blockSizes``, ``codeRates``, and
+    ``packetErrorRates`` arrays, the latter being of shape (code rates, SINR
+    values, block sizes)).
+
+    Args:
+        path: The path of the npz file
+        sinrs: The SINR values in dB
+        blockSizes: The block sizes in bits (multiples of 8)
+        codeRates: The code rates
+        runs: The number of simulated transmissions per grid point
+        shadowingStd: The standard deviation of the SINR offsets in dB (see
+            :func:`simulateReceptions`)
+        processes: The number of worker processes to be used. Defaults to the
+            number of CPUs, ``1`` runs the calibration in the current process.
+        seed: The base seed for the shadowing offsets
+
+    Raises:
+        ValueError: If a block size is not a positive multiple of 8
+    """
+    sinrs = sorted(float(s) for s in sinrs)
+    blockSizes = sorted(int(b) for b in blockSizes)
+    codeRates = [Fraction(c) for c in codeRates]
+    for blockSize in blockSizes:
+        if blockSize <= 0 or blockSize % 8 != 0:
+            raise ValueError("Block sizes have to be positive multiples of 8 bits, got {}.".format(blockSize))
+
+    results = _loadRawResults(path, runs, shadowingStd)
+    grid = [(s, b, c) for c in codeRates for s in sinrs for b in blockSizes]
+    missing = [point for point in grid if point not in results]
+    logger.info("Calibrating %d of %d grid points (%d runs each)", len(missing), len(grid), runs)
+
+    tasks = [(s, b, c, runs, shadowingStd, hash((seed, s, b, c))) for s, b, c in missing]
+    if processes == 1:
+        successes = [_simulateGridPoint(task) for task in tasks]
+    elif len(tasks) > 0:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            successes = list(executor.map(_simulateGridPoint, tasks, chunksize=max(1, len(tasks) // 64)))
+    else:
+        successes = []
+    results.update(zip(missing, successes))
+
+    packetErrorRates = np.empty((len(codeRates), len(sinrs), len(blockSizes)))
+    for i, c in enumerate(codeRates):
+        for k, b in enumerate(blockSizes):
+            measured = np.array([1 - results[s, b, c] / runs for s in sinrs])
+            packetErrorRates[i, :, k] = fitPacketErrorRateCurve(np.array(sinrs), measured)
+
+    rawPoints = list(results.keys())
+    # Passing a file object prevents NumPy from appending an .npz extension
+    with open(path, "wb") as file:
+        np.savez(file,
+            sinrs=np.array(sinrs),
+            blockSizes=np.array(blockSizes, dtype=float),
+            codeRates=_codeRatesToArray(codeRates),
+            packetErrorRates=packetErrorRates,
+            runs=np.array(runs),
+            shadowingStd=np.array(shadowingStd),
+            rawSinrs=np.array([p[0] for p in rawPoints], dtype=float),
+            rawBlockSizes=np.array([p[1] for p in rawPoints], dtype=np.int64),
+            rawCodeRates=_codeRatesToArray(p[2] for p in rawPoints),
+            rawSuccesses=np.array([results[p] for p in rawPoints], dtype=np.int64)
+        )
+
+def loadPacketErrorRateTables(path: str, register: bool = False) -> Dict[Fraction, PacketErrorRateTable]:
+    """
+    Loads the calibration results stored at `path` (see :func:`calibrate`)
+    and returns a dict mapping code rates to
+    :class:`~gymwipe.networking.physical.PacketErrorRateTable` objects.
+
+    Args:
+        path: The path of the npz file
+        register: If ``True``, the tables are registered for
+            :class:`~gymwipe.networking.physical.BpskMcs` objects via
+            :meth:`~gymwipe.networking.physical.Mcs.registerPacketErrorRateTable`.
+    """
+    with np.load(path) as data:
+        codeRates = _arrayToCodeRates(data["codeRates"])
+        sinrs, blockSizes, packetErrorRates = data["sinrs"], data["blockSizes"], data["packetErrorRates"]
+    tables = {}
+    for i, codeRate in enumerate(codeRates):
+        table = PacketErrorRateTable(sinrs, blockSizes, packetErrorRates[i])
+        tables[codeRate] = table
+        if register:
+            BpskMcs.registerPacketErrorRateTable(codeRate, table)
+    return tables
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calibrate packet error rate tables via SimplePhy runs")
+    parser.add_argument("path", help="The npz file to write (and to reuse results from)")
+    parser.add_argument("--sinrs", type=float, nargs=3, required=True, metavar=("START", "STOP", "STEP"),
+                        help="The range of SINR values in dB (including STOP)")
+    parser.add_argument("--sizes", type=int, nargs="+", required=True, help="Block sizes in bits")
+    parser.add_argument("--code-rates", nargs="+", default=["3/4"], help="Code rates, e.g. 1/2 3/4")
+    parser.add_argument("--runs", type=int, default=1, help="Simulated transmissions per grid point")
+    parser.add_argument("--shadowing", type=float, default=0.0, help="SINR offset standard deviation in dB")
+    parser.add_argument("--processes", type=int, default=None, help="Number of worker processes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    logging.getLogger("gymwipe.networking").setLevel(logging.WARNING)
+    logging.getLogger("gymwipe.simtools").setLevel(logging.WARNING)
+    logger.setLevel(logging.INFO)
+    start, stop, step = args.sinrs
+    sinrs = np.round(np.arange(start, stop + step / 2, step), 10)
+    calibrate(args.path, sinrs, args.sizes, [Fraction(c) for c in args.code_rates],
+                args.runs, args.shadowing, args.processes)
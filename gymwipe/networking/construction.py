@@ -375,6 +375,19 @@ class Module:
     
     def __repr__(self):
         return "{}{}('{}')".format(ownerPrefix(self._owner), self.__class__.__name__, self.name)
+
+    def reset(self):
+        """
+        Resets the module to its initial state after a
+        :meth:`~gymwipe.simtools.SimulationManager.reset` without recreating
+        it. The :class:`Module` implementation resets the notifiers of its
+        gates (see :meth:`~gymwipe.simtools.Notifier.reset`), so that gate
+        listeners do not wait for processes that have been discarded.
+        Subclasses with further state extend it.
+        """
+        for gate in self.gates.values():
+            gate.nReceives.reset()
+            gate.nConnectsTo.reset()
     
     def _addPort(self, name: str):
         """
@@ -449,3 +462,11 @@ class CompoundModule(Module):
         if name in self.submodules:
             raise ValueError("A submodule named '{}' already exists.".format(name))
         self.submodules[name] = module
+
+    def reset(self):
+        """
+        Resets the module and all of its submodules (see :meth:`Module.reset`).
+        """
+        super(CompoundModule, self).reset()
+        for module in self.submodules.values():
+            module.reset()
@@ -1,12 +1,13 @@
 """
 :class:`~gymwipe.devices.core.Device` implementations for network devices
 """
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Tuple, Type
 
 from gymwipe.devices import Device
 from gymwipe.networking.messages import (Packet, Message, SimpleNetworkHeader,
                                          StackMessageTypes, Transmittable)
 from gymwipe.networking.physical import FrequencyBand
+from gymwipe.networking.construction import Module
 from gymwipe.networking.simple_stack import SimpleMac, SimplePhy, SimpleRrmMac
 from gymwipe.simtools import Notifier, SimMan
 
@@ -37,6 +38,15 @@ class NetworkDevice(Device):
             is used for transmissions
         """
 
+    def reset(self):
+        """
+        Resets the device's network stack to its initial state after the
+        simulation (:meth:`~gymwipe.simtools.SimulationManager.reset`) and the
+        :attr:`frequencyBand` (:meth:`~gymwipe.networking.physical.FrequencyBand.reset`)
+        have been reset. Processes of the device are restarted. The
+        :class:`NetworkDevice` implementation does nothing.
+        """
+
 class SimpleNetworkDevice(NetworkDevice):
     """
     A :class:`NetworkDevice` implementation running a network stack that
@@ -46,7 +56,13 @@ class SimpleNetworkDevice(NetworkDevice):
     setting :attr:`receiving` either to ``True`` or to ``False``.
     """
 
-    def __init__(self, name: str, xPos: float, yPos: float, frequencyBand: FrequencyBand):
+    def __init__(self, name: str, xPos: float, yPos: float, frequencyBand: FrequencyBand,
+                    phyClass: Type[Module] = SimplePhy):
+        """
+            phyClass: The physical layer class to be used, :class:`~gymwipe.networking.simple_stack.SimplePhy`
+                by default. Pass :class:`~gymwipe.networking.simple_stack.LinkLevelPhy`
+                for faster, less detailed simulations.
+        """
         super(SimpleNetworkDevice, self).__init__(name, xPos, yPos, frequencyBand)
         self._receiving = False
         self._receiverProcess = None # a SimPy receiver process
@@ -55,13 +71,13 @@ class SimpleNetworkDevice(NetworkDevice):
         """bytes: The address that is used by the MAC layer to identify this device"""
 
         # Initialize PHY and MAC
-        self._phy = SimplePhy("phy", self, self.frequencyBand)
+        self._phy = phyClass("phy", self, self.frequencyBand)
         self._mac = SimpleMac("mac", self, self.frequencyBand.spec, self.macAddr)
         # Connect them with each other
         self._mac.ports["phy"].biConnectWith(self._phy.ports["mac"])
     
-    # inherit __init__ docstring
-    __init__.__doc__ = NetworkDevice.__init__.__doc__
+    # merge __init__ docstrings
+    __init__.__doc__ = NetworkDevice.__init__.__doc__ + __init__.__doc__
     
     RECEIVE_TIMEOUT = 100
     """
@@ -71,6 +87,17 @@ class SimpleNetworkDevice(NetworkDevice):
     @property
     def receiving(self) -> bool:
         return self._receiving
+
+    def reset(self):
+        """
+        Resets the PHY and MAC layer and restarts the receiver process if
+        :attr:`receiving` is ``True``.
+        """
+        self._phy.reset()
+        self._mac.reset()
+        self._receiverProcess = None
+        if self._receiving:
+            self._receiverProcess = SimMan.process(self._receiver())
     
     @receiving.setter
     def receiving(self, receiving: bool):
@@ -120,7 +147,8 @@ class SimpleRrmDevice(NetworkDevice):
     """
 
     def __init__(self, name: str, xPos: float, yPos: float, frequencyBand: FrequencyBand,
-                    deviceIndexToMacDict: Dict[int, bytes], interpreter):
+                    deviceIndexToMacDict: Dict[int, bytes], interpreter,
+                    phyClass: Type[Module] = SimplePhy):
         # No type definition for 'interpreter' to avoid circular dependencies
         """
             deviceIndexToMacDict: A dictionary mapping integer indexes to device
@@ -130,6 +158,8 @@ class SimpleRrmDevice(NetworkDevice):
             interpreter(:class:`~gymwipe.envs.core.Interpreter`): The
                 :class:`~gymwipe.envs.core.Interpreter` instance to be used for
                 observation and reward calculations
+            phyClass: The physical layer class to be used, :class:`~gymwipe.networking.simple_stack.SimplePhy`
+                by default
         """
         super(SimpleRrmDevice, self).__init__(name, xPos, yPos, frequencyBand)
 
@@ -154,7 +184,7 @@ class SimpleRrmDevice(NetworkDevice):
         """
 
         # Initialize PHY and MAC
-        self._phy = SimplePhy("phy", self, self.frequencyBand)
+        self._phy = phyClass("phy", self, self.frequencyBand)
         self._mac = SimpleRrmMac("mac", self, self.frequencyBand.spec)
         # Connect them with each other
         self._mac.ports["phy"].biConnectWith(self._phy.ports["mac"])
@@ -175,6 +205,14 @@ class SimpleRrmDevice(NetworkDevice):
         """bytes: The RRM's MAC address"""
         return self._mac.addr
 
+    def reset(self):
+        """
+        Resets the PHY and MAC layer and the :attr:`interpreter`.
+        """
+        self._phy.reset()
+        self._mac.reset()
+        self.interpreter.reset()
+
     def assignFrequencyBand(self, deviceIndex: bytes, duration: int) -> Tuple[Any, float]:
         """
         Makes the RRM assign the frequency band to a certain device for a certain time.
@@ -22,8 +22,6 @@ The following classes are used for inter-module communication:
 from enum import Enum
 from typing import Any, Dict
 
-from simpy.events import Event
-
 from gymwipe.simtools import SimMan
 
 
@@ -201,7 +199,7 @@ class Message:
     def __init__(self, type: Enum, args: Dict[str, Any] = None):
         self.type = type
         self.args = args
-        self.eProcessed = Event(SimMan.env)
+        self.eProcessed = SimMan.event()
 
     def setProcessed(self, returnValue: Any = None):
         """
@@ -4,19 +4,22 @@ Physical-layer-related components
 import functools
 import logging
 from abc import ABC, abstractmethod
+from bisect import bisect_right
 from collections import deque
 from fractions import Fraction
 from math import e, exp, log10, pi, sqrt
-from typing import Any, Deque, Dict, FrozenSet, List, Tuple, Type, TypeVar
+from typing import (Any, Callable, Deque, Dict, FrozenSet, List, Tuple, Type,
+                    TypeVar)
 
+import numpy as np
 from scipy.special import binom
 from simpy import Event
 
 import gymwipe.devices as devices
-from gymwipe.devices import Device
+from gymwipe.devices import Device, SpatialIndex
 from gymwipe.networking.messages import Packet
 from gymwipe.simtools import Notifier, SimMan, SimTimePrepender
-from gymwipe.utility import strAndRepr
+from gymwipe.utility import ownerPrefix, strAndRepr
 
 logger = SimTimePrepender(logging.getLogger(__name__))
 
@@ -97,13 +100,202 @@ def dbmToMilliwatts(milliwatts: float):
     """
     return 10 ** (milliwatts / 10)
 
+class BitErrorRateTable:
+    """
+    A dense lookup table that maps Signal-to-Interference-plus-Noise Ratio
+    (SINR) values in dB to bit error rates. The table samples a bit error rate
+    function at equidistant SINR values in [`minSinr`, `maxSinr`] and linearly
+    interpolates between the samples. SINR values outside of that range are
+    clamped to it.
+    """
+
+    def __init__(self, berFunction: Callable[[float], float], minSinr: float,
+                    maxSinr: float, resolution: float):
+        """
+        Args:
+            berFunction: A function that returns the bit error rate for a given
+                SINR value in dB
+            minSinr: The smallest SINR value (in dB) of the table
+            maxSinr: The largest SINR value (in dB) of the table
+            resolution: The distance between two neighboring SINR samples in dB
+
+        Raises:
+            ValueError: If `resolution` is not positive or `maxSinr` is not
+                greater than `minSinr`
+        """
+        if resolution <= 0:
+            raise ValueError("The resolution of a BitErrorRateTable has to be positive.")
+        if maxSinr <= minSinr:
+            raise ValueError("maxSinr has to be greater than minSinr.")
+
+        self.minSinr = minSinr
+        """float: The smallest SINR value (in dB) of the table"""
+
+        self.resolution = resolution
+        """float: The distance between two neighboring SINR samples in dB"""
+
+        sampleCount = int(round((maxSinr - minSinr) / resolution)) + 1
+        self.sinrs = minSinr + resolution * np.arange(sampleCount)
+        """numpy.ndarray: The SINR samples (in dB) of the table"""
+
+        self.maxSinr = float(self.sinrs[-1])
+        """float: The largest SINR value (in dB) of the table"""
+
+        self.bitErrorRates = np.array([berFunction(sinr) for sinr in self.sinrs])
+        """numpy.ndarray: The bit error rates for the :attr:`sinrs` samples"""
+
+        # Python lists are faster than NumPy arrays for scalar item access
+        self._bitErrorRateList: List[float] = self.bitErrorRates.tolist()
+        self._maxIndex = sampleCount - 1
+
+    def lookup(self, sinr: float) -> float:
+        """
+        Returns the (interpolated) bit error rate for the given SINR value.
+
+        Args:
+            sinr: The SINR value in dB
+        """
+        position = (sinr - self.minSinr) / self.resolution
+        if position <= 0:
+            return self._bitErrorRateList[0]
+        if position >= self._maxIndex:
+            return self._bitErrorRateList[self._maxIndex]
+        index = int(position)
+        lower = self._bitErrorRateList[index]
+        return lower + (position - index) * (self._bitErrorRateList[index+1] - lower)
+
+    def lookupArray(self, sinrs: np.ndarray) -> np.ndarray:
+        """
+        Vectorized version of :meth:`lookup`: Returns an array containing the
+        (interpolated) bit error rates for all of the provided SINR values.
+
+        Args:
+            sinrs: An array of SINR values in dB
+        """
+        return np.interp(sinrs, self.sinrs, self.bitErrorRates)
+
+    def __str__(self):
+        return "BitErrorRateTable([{}, {}] dB, resolution {} dB)".format(
+            self.minSinr, self.maxSinr, self.resolution)
+
+class PacketErrorRateTable:
+    """
+    A lookup table that maps Signal-to-Interference-plus-Noise Ratio (SINR)
+    values in dB and block sizes in bits (the :attr:`~gymwipe.networking.messages.Transmittable.bitSize`
+    of a packet's header or payload) to packet error rates, i.e. to the
+    probability of a block not being received successfully. Packet error rates
+    are linearly interpolated in both dimensions, values outside of the
+    sampled ranges are clamped to them.
+    """
+
+    def __init__(self, sinrs: np.ndarray, blockSizes: np.ndarray, packetErrorRates: np.ndarray):
+        """
+        Args:
+            sinrs: An ascending array of SINR samples in dB
+            blockSizes: An ascending array of block size samples in bits
+            packetErrorRates: A two-dimensional array containing the packet
+                error rate for each combination of SINR (first axis) and block
+                size (second axis)
+
+        Raises:
+            ValueError: If the shape of `packetErrorRates` does not match the
+                sample arrays
+        """
+        self.sinrs = np.asarray(sinrs, dtype=float)
+        """numpy.ndarray: The SINR samples (in dB) of the table"""
+
+        self.blockSizes = np.asarray(blockSizes, dtype=float)
+        """numpy.ndarray: The block size samples (in bits) of the table"""
+
+        self.packetErrorRates = np.asarray(packetErrorRates, dtype=float)
+        """
+        numpy.ndarray: The packet error rates for each combination of
+        :attr:`sinrs` and :attr:`blockSizes` samples
+        """
+
+        if self.packetErrorRates.shape != (len(self.sinrs), len(self.blockSizes)):
+            raise ValueError("The shape of packetErrorRates ({}) does not match the number "
+                                "of SINR and block size samples ({}, {}).".format(
+                                self.packetErrorRates.shape, len(self.sinrs), len(self.blockSizes)))
+
+        # Python lists are faster than NumPy arrays for scalar item access
+        self._sinrList: List[float] = self.sinrs.tolist()
+        self._blockSizeList: List[float] = self.blockSizes.tolist()
+        self._packetErrorRateList: List[List[float]] = self.packetErrorRates.tolist()
+
+    @staticmethod
+    def _locate(samples: List[float], value: float) -> Tuple[int, float]:
+        # Returns the index of the sample below `value` and the relative
+        # position of `value` between that sample and the next one
+        if value <= samples[0] or len(samples) == 1:
+            return 0, 0.0
+        if value >= samples[-1]:
+            return len(samples) - 2, 1.0
+        index = bisect_right(samples, value) - 1
+        return index, (value - samples[index]) / (samples[index+1] - samples[index])
+
+    def lookup(self, sinr: float, blockSize: float) -> float:
+        """
+        Returns the (interpolated) packet error rate for the given SINR value
+        and block size.
+
+        Args:
+            sinr: The SINR value in dB
+            blockSize: The block size in bits
+        """
+        i, sinrWeight = self._locate(self._sinrList, sinr)
+        j, sizeWeight = self._locate(self._blockSizeList, blockSize)
+        iNext = min(i + 1, len(self._sinrList) - 1)
+        jNext = min(j + 1, len(self._blockSizeList) - 1)
+        row, nextRow = self._packetErrorRateList[i], self._packetErrorRateList[iNext]
+        lower = row[j] + sizeWeight * (row[jNext] - row[j])
+        upper = nextRow[j] + sizeWeight * (nextRow[jNext] - nextRow[j])
+        return lower + sinrWeight * (upper - lower)
+
+    def lookupArray(self, sinrs: np.ndarray, blockSizes: np.ndarray) -> np.ndarray:
+        """
+        Vectorized version of :meth:`lookup`: Returns an array containing the
+        (interpolated) packet error rates for the provided SINR values and
+        block sizes (which are broadcast against each other).
+
+        Args:
+            sinrs: An array of SINR values in dB
+            blockSizes: An array of block sizes in bits
+        """
+        sinrs, blockSizes = np.broadcast_arrays(np.asarray(sinrs, dtype=float),
+                                                np.asarray(blockSizes, dtype=float))
+
+        def locate(samples: np.ndarray, values: np.ndarray):
+            if len(samples) == 1:
+                return np.zeros(values.shape, dtype=int), np.zeros(values.shape)
+            values = np.clip(values, samples[0], samples[-1])
+            indexes = np.clip(np.searchsorted(samples, values, side="right") - 1, 0, len(samples) - 2)
+            weights = (values - samples[indexes]) / (samples[indexes+1] - samples[indexes])
+            return indexes, weights
+
+        i, sinrWeights = locate(self.sinrs, sinrs)
+        j, sizeWeights = locate(self.blockSizes, blockSizes)
+        pers = self.packetErrorRates
+        iNext = np.minimum(i + 1, len(self.sinrs) - 1)
+        jNext = np.minimum(j + 1, len(self.blockSizes) - 1)
+        lower = pers[i, j] + sizeWeights * (pers[i, jNext] - pers[i, j])
+        upper = pers[iNext, j] + sizeWeights * (pers[iNext, jNext] - pers[iNext, j])
+        return lower + sinrWeights * (upper - lower)
+
+    def __str__(self):
+        return "PacketErrorRateTable({} SINR x {} block size samples)".format(
+            len(self.sinrs), len(self.blockSizes))
+
 class Mcs(ABC):
     """
     The :class:`Mcs` class represents a Modulation and Coding Scheme. As the MCS
     (beside frequency band characteristics) determines the relation between
     Signal-to-Noise Ratio (SNR) and the resulting Bit Error Rate (BER), it
-    offers a :meth:`getBitErrorRateBySnr` method that is used by receiving PHY
-    layer instances.
+    offers a :meth:`calculateBitErrorRate` method. Receiving PHY layer
+    instances use :meth:`getBitErrorRate` which can optionally read the bit
+    error rate from a precomputed :class:`BitErrorRateTable` (see
+    :attr:`useBitErrorRateTable` and :meth:`buildBitErrorRateTable`) instead of
+    evaluating :meth:`calculateBitErrorRate` each time.
     :class:`Mcs` objects also provide a :attr:`bitRate` and a
     :attr:`dataRate` attribute, which specify the physical bit rate and the
     effective data rate of transmissions with the corresponding :class:`Mcs`.
@@ -114,6 +306,50 @@ class Mcs(ABC):
 
     _codeRateToMaxCorrectableBer = {}
 
+    BER_TABLE_MIN_SINR: float = 0.0
+    """
+    float: The smallest SINR value (in dB) of bit error rate tables built
+    without explicit parameters
+    """
+
+    BER_TABLE_MAX_SINR: float = 80.0
+    """
+    float: The largest SINR value (in dB) of bit error rate tables built
+    without explicit parameters
+    """
+
+    BER_TABLE_RESOLUTION: float = 0.01
+    """
+    float: The SINR resolution (in dB) of bit error rate tables built without
+    explicit parameters
+    """
+
+    useBitErrorRateTable: bool = False
+    """
+    bool: Whether :meth:`getBitErrorRate` reads bit error rates from a
+    :class:`BitErrorRateTable`. Defaults to ``False``, so that
+    :meth:`calculateBitErrorRate` is invoked directly. Table lookups are
+    faster, but interpolate between the sampled SINR values and hence slightly
+    change simulation results.
+    """
+
+    _bitErrorRateTables: Dict[Tuple, BitErrorRateTable] = {}
+
+    PER_TABLE_BLOCK_SIZES: Tuple[int, ...] = tuple(2**i for i in range(3, 15))
+    """
+    Tuple[int, ...]: The block sizes (in bits) of packet error rate tables
+    built without explicit parameters
+    """
+
+    PER_TABLE_RESOLUTION: float = 0.1
+    """
+    float: The SINR resolution (in dB) of packet error rate tables built
+    without explicit parameters
+    """
+
+    _packetErrorRateTables: Dict[Tuple, PacketErrorRateTable] = {}
+    _registeredPacketErrorRateTables: Dict[Tuple, PacketErrorRateTable] = {}
+
     def __init__(self, frequencyBandSpec: "FrequencyBandSpec", codeRate: Fraction):
 
         self.frequencyBandSpec = frequencyBandSpec
@@ -128,6 +364,22 @@ class Mcs(ABC):
         forward error correction
         """
 
+        self.bitErrorRateTable: BitErrorRateTable = None
+        """
+        :class:`BitErrorRateTable`: The bit error rate table used by
+        :meth:`getBitErrorRate` (created on first use if not built via
+        :meth:`buildBitErrorRateTable`)
+        """
+
+        self.packetErrorRateTable: PacketErrorRateTable = None
+        """
+        :class:`PacketErrorRateTable`: The packet error rate table used by
+        :meth:`getPacketErrorRate` (if neither built via
+        :meth:`buildPacketErrorRateTable` nor set explicitly, a table registered
+        via :meth:`registerPacketErrorRateTable` is used or one is built on
+        first use)
+        """
+
     @abstractmethod
     def calculateBitErrorRate(self, signalPower: float, noisePower: float, bitRate: float) -> float:
         """
@@ -157,6 +409,146 @@ class Mcs(ABC):
         (considers coding overhead)
         """
 
+    def buildBitErrorRateTable(self, minSinr: float = None, maxSinr: float = None,
+                                resolution: float = None) -> BitErrorRateTable:
+        """
+        Builds a :class:`BitErrorRateTable` for this MCS by sampling
+        :meth:`calculateBitErrorRate` and sets it as the
+        :attr:`bitErrorRateTable`. Tables are cached per MCS class, code rate,
+        bit rate, and table parameters, so that MCS objects with equal
+        properties share a table.
+
+        Args:
+            minSinr: The smallest SINR value (in dB) of the table, defaults to
+                :attr:`BER_TABLE_MIN_SINR`
+            maxSinr: The largest SINR value (in dB) of the table, defaults to
+                :attr:`BER_TABLE_MAX_SINR`
+            resolution: The distance between two SINR samples in dB, defaults
+                to :attr:`BER_TABLE_RESOLUTION`
+        """
+        if minSinr is None:
+            minSinr = self.BER_TABLE_MIN_SINR
+        if maxSinr is None:
+            maxSinr = self.BER_TABLE_MAX_SINR
+        if resolution is None:
+            resolution = self.BER_TABLE_RESOLUTION
+
+        key = (type(self), self.codeRate, self.bitRate, minSinr, maxSinr, resolution)
+        table = Mcs._bitErrorRateTables.get(key)
+        if table is None:
+            table = BitErrorRateTable(lambda sinr: self.calculateBitErrorRate(sinr, 0.0),
+                                        minSinr, maxSinr, resolution)
+            Mcs._bitErrorRateTables[key] = table
+        self.bitErrorRateTable = table
+        return table
+
+    def getBitErrorRate(self, signalPower: float, noisePower: float) -> float:
+        """
+        Returns the bit error rate for the given signal and noise power. If
+        :attr:`useBitErrorRateTable` is ``True``, the result is read from the
+        :attr:`bitErrorRateTable`.
+
+        Args:
+            signalPower: The signal power :math:`S` in dBm
+            noisePower: The noise power :math:`N_0` in dBm
+        """
+        if not self.useBitErrorRateTable:
+            return self.calculateBitErrorRate(signalPower, noisePower)
+        if self.bitErrorRateTable is None:
+            self.buildBitErrorRateTable()
+        return self.bitErrorRateTable.lookup(signalPower - noisePower)
+
+    def getBitErrorRates(self, signalPowers: np.ndarray, noisePowers: np.ndarray) -> np.ndarray:
+        """
+        Vectorized version of :meth:`getBitErrorRate`, always using the
+        :attr:`bitErrorRateTable`.
+
+        Args:
+            signalPowers: An array of signal powers in dBm
+            noisePowers: An array of noise powers in dBm (or a scalar)
+        """
+        if self.bitErrorRateTable is None:
+            self.buildBitErrorRateTable()
+        return self.bitErrorRateTable.lookupArray(np.subtract(signalPowers, noisePowers))
+
+    def buildPacketErrorRateTable(self, blockSizes: Tuple[int, ...] = None,
+                                    resolution: float = None) -> PacketErrorRateTable:
+        """
+        Derives a :class:`PacketErrorRateTable` from the bit error rates of this
+        MCS and sets it as the :attr:`packetErrorRateTable`. At a constant SINR,
+        a block counts as received if the resulting bit error rate can be
+        corrected according to :meth:`maxCorrectableBer` (like the decider of
+        :class:`~gymwipe.networking.simple_stack.SimplePhy` does), so the
+        resulting packet error rates are either 0 or 1. Tables are cached like
+        bit error rate tables.
+
+        Args:
+            blockSizes: The block sizes (in bits) of the table, defaults to
+                :attr:`PER_TABLE_BLOCK_SIZES`
+            resolution: The distance between two SINR samples in dB, defaults
+                to :attr:`PER_TABLE_RESOLUTION`
+        """
+        if blockSizes is None:
+            blockSizes = self.PER_TABLE_BLOCK_SIZES
+        if resolution is None:
+            resolution = self.PER_TABLE_RESOLUTION
+        blockSizes = tuple(blockSizes)
+
+        key = (type(self), self.codeRate, self.bitRate, blockSizes, resolution)
+        table = Mcs._packetErrorRateTables.get(key)
+        if table is None:
+            if self.bitErrorRateTable is None:
+                self.buildBitErrorRateTable()
+            berTable = self.bitErrorRateTable
+            sampleCount = int(round((berTable.maxSinr - berTable.minSinr) / resolution)) + 1
+            sinrs = berTable.minSinr + resolution * np.arange(sampleCount)
+            sizes = np.array(blockSizes, dtype=float)
+            # Expected bit errors during the transmission of each block and
+            # the number of bits the decider relates them to (see Transmission)
+            bitErrors = np.round(np.outer(berTable.lookupArray(sinrs), sizes * self.bitRate / self.dataRate))
+            transmittedBits = sizes * float(2 - self.codeRate)
+            packetErrorRates = (bitErrors / transmittedBits > self.maxCorrectableBer()).astype(float)
+            table = PacketErrorRateTable(sinrs, sizes, packetErrorRates)
+            Mcs._packetErrorRateTables[key] = table
+        self.packetErrorRateTable = table
+        return table
+
+    def getPacketErrorRate(self, sinr: float, blockSize: float) -> float:
+        """
+        Returns the probability of a block of `blockSize` bits not being
+        received successfully at the given SINR, as read from the
+        :attr:`packetErrorRateTable`.
+
+        Args:
+            sinr: The SINR in dB
+            blockSize: The block size in bits
+        """
+        if self.packetErrorRateTable is None:
+            registeredTable = Mcs._registeredPacketErrorRateTables.get((type(self), self.codeRate))
+            if registeredTable is not None:
+                self.packetErrorRateTable = registeredTable
+            else:
+                self.buildPacketErrorRateTable()
+        return self.packetErrorRateTable.lookup(sinr, blockSize)
+
+    @classmethod
+    def registerPacketErrorRateTable(cls, codeRate: Fraction, table: PacketErrorRateTable):
+        """
+        Registers a packet error rate table (e.g. a calibrated one, see
+        :mod:`~gymwipe.networking.calibration`) for all instances of the MCS
+        class with the given code rate that do not yet have a
+        :attr:`packetErrorRateTable`. Passing ``None`` as the table removes a
+        registration.
+
+        Args:
+            codeRate: The code rate to register the table for
+            table: The :class:`PacketErrorRateTable` to be used
+        """
+        if table is None:
+            Mcs._registeredPacketErrorRateTables.pop((cls, codeRate), None)
+        else:
+            Mcs._registeredPacketErrorRateTables[cls, codeRate] = table
+
     def maxCorrectableBer(self) -> float:
         """
         Returns the maximum bit error rate that can be handled when using the
@@ -250,7 +642,21 @@ class Transmission:
         self.duration = self.headerDuration + self.payloadDuration
         """float: The time in seconds taken by the transmission"""
         
-        self.stopTime = startTime + self.duration
+        # Integer ticks if SimMan uses an integer-tick clock, seconds otherwise
+        self.startTick = SimMan.secondsToTicks(startTime)
+        """
+        The simulated time at which the transmission started in ticks of the
+        :attr:`~gymwipe.simtools.SimMan`'s clock (equal to :attr:`startTime`
+        if no integer-tick clock is used)
+        """
+
+        self.stopTick = self.startTick + SimMan.secondsToTicks(self.duration)
+        """
+        The moment in simulated time right after the transmission has completed,
+        in ticks (equal to :attr:`stopTime` if no integer-tick clock is used)
+        """
+
+        self.stopTime = SimMan.ticksToSeconds(self.stopTick)
         """
         float: The moment in simulated time right after the transmission has
         completed
@@ -263,14 +669,7 @@ class Transmission:
         """Transmitted bits for the packet's payload (including coding overhead)"""
 
         # SimPy events
-        headerStopTime = self.startTime + self.headerDuration
-        self.eHeaderCompletes: Event = SimMan.timeoutUntil(headerStopTime, self)
-        """
-        :class:`~simpy.events.Event`: A SimPy event that succeeds at the moment
-        in simulated time right after the packet's header has been transmitted.
-        The transmission object is provided as the value to the
-        :meth:`~simpy.events.Event.succeed` call.
-        """
+        self._eHeaderCompletes = None
 
         self.eCompletes: Event = SimMan.timeoutUntil(self.stopTime, self)
         """
@@ -281,13 +680,28 @@ class Transmission:
     def __repr__(self):
         return "Transmission(sender: {}, power: {} dBm, duration: {} s)".format(self.sender, self.power, self.duration)
 
+    @property
+    def eHeaderCompletes(self) -> Event:
+        """
+        :class:`~simpy.events.Event`: A SimPy event that succeeds at the moment
+        in simulated time right after the packet's header has been transmitted.
+        The transmission object is provided as the value to the
+        :meth:`~simpy.events.Event.succeed` call.
+
+        The event is only created (and scheduled) on first access, since many
+        transmissions are never received by anyone waiting for their header.
+        """
+        if self._eHeaderCompletes is None:
+            self._eHeaderCompletes = SimMan.timeoutUntil(self.startTime + self.headerDuration, self)
+        return self._eHeaderCompletes
+
     @property
     def completed(self):
         """
         Returns ``True`` if the transmission has completed (i.e. the current
         simulation time >= stopTime)
         """
-        return SimMan.now >= self.stopTime
+        return SimMan.nowTicks >= self.stopTick
 
 
 class FrequencyBandSpec:
@@ -350,6 +764,35 @@ class AttenuationModel():
     
     def __repr__(self):
         return "{}({}, {})".format(self.__class__.__name__, *self.devices)
+
+    @classmethod
+    def calculateAttenuations(cls, frequencyBandSpec: FrequencyBandSpec, position: np.ndarray,
+                                positions: np.ndarray) -> np.ndarray:
+        """
+        Calculates the attenuation values (measured in dB) between a device
+        located at `position` and devices located at `positions` in a single
+        vectorized step. This is used by :class:`AttenuationStore`
+        implementations, which do not instantiate :class:`AttenuationModel`
+        objects. Subclasses that can be used with an :class:`AttenuationStore`
+        have to override this method.
+
+        Args:
+            frequencyBandSpec: The frequency band specification of the
+                corresponding :class:`FrequencyBand`
+            position: An array of shape ``(2,)`` holding the x and y coordinate
+                of a device
+            positions: An array of shape ``(n, 2)`` holding the x and y
+                coordinates of `n` devices
+
+        Returns:
+            An array of shape ``(n,)`` containing the attenuation values
+
+        Raises:
+            NotImplementedError: If the :class:`AttenuationModel` subclass does
+                not support vectorized attenuation calculations
+        """
+        raise NotImplementedError("{} does not support vectorized attenuation "
+                                    "calculations.".format(cls.__name__))
     
     def _setAttenuation(self, newAttenuation: float):
         """
@@ -527,15 +970,576 @@ class AttenuationModelFactory():
             self._instances[devicePair] = instance
             return instance
 
+class AttenuationStore(ABC):
+    """
+    An :class:`AttenuationStore` holds the attenuation values between all pairs
+    of devices that have been added to it, indexed by integer device ids. In
+    contrast to :class:`AttenuationModelFactory`, it does not create
+    :class:`AttenuationModel` objects. Instead, it calculates attenuation values
+    using the vectorized
+    :meth:`~AttenuationModel.calculateAttenuations` class methods of the
+    provided :class:`AttenuationModel` subclasses. Whenever a device changes
+    its position, only the attenuation values regarding that device are
+    recalculated.
+    """
+
+    def __init__(self, frequencyBandSpec: FrequencyBandSpec, modelClasses: List[AttenuationModelClass]):
+        """
+        Args:
+            frequencyBandSpec: The frequency band specification of the
+                corresponding :class:`FrequencyBand`
+            modelClasses: A non-empty list of :class:`AttenuationModel`
+                subclasses that implement
+                :meth:`~AttenuationModel.calculateAttenuations`. The attenuation
+                values of multiple models are summed up.
+        """
+        self._frequencyBandSpec = frequencyBandSpec
+        self._modelClasses = modelClasses
+        self._devices: List[Device] = []
+        self._deviceToIndex: Dict[Device, int] = {}
+        self._positions = np.zeros((8, 2))
+    
+    def __repr__(self):
+        return "{}(devices: {:d})".format(self.__class__.__name__, len(self._devices))
+
+    @property
+    def deviceCount(self) -> int:
+        """int: The number of devices that have been added to the store"""
+        return len(self._devices)
+
+    def addDevice(self, device: Device) -> int:
+        """
+        Adds `device` to the store (if it has not been added before) and returns
+        its index.
+
+        Args:
+            device: The device to be added
+        """
+        if device in self._deviceToIndex:
+            return self._deviceToIndex[device]
+        index = len(self._devices)
+        if index == len(self._positions):
+            self._positions = np.concatenate((self._positions, np.zeros_like(self._positions)))
+        self._devices.append(device)
+        self._deviceToIndex[device] = index
+        self._positions[index] = (device.position.x, device.position.y)
+        self._onDeviceAdded(index)
+        device.position.nChange.subscribeCallback(self._onPositionChange, additionalArgs=[index])
+        return index
+    
+    def getIndex(self, device: Device) -> int:
+        """
+        Returns the index of `device`. It is added to the store if it has not
+        been added before.
+
+        Args:
+            device: The device to return the index for
+        """
+        index = self._deviceToIndex.get(device)
+        if index is None:
+            index = self.addDevice(device)
+        return index
+    
+    def getAttenuation(self, deviceA: Device, deviceB: Device) -> float:
+        """
+        Returns the attenuation in dB between `deviceA` and `deviceB`.
+        """
+        indexB = self.getIndex(deviceB)
+        return float(self.getAttenuationsByIndex(self.getIndex(deviceA), np.array([indexB]))[0])
+
+    @abstractmethod
+    def getAttenuationsByIndex(self, index: int, indexes: np.ndarray) -> np.ndarray:
+        """
+        Returns an array of the attenuation values in dB between the device
+        with index `index` and the devices with the indexes in `indexes`.
+
+        Args:
+            index: A device index
+            indexes: An integer array of device indexes
+        """
+
+    def _calculateAttenuations(self, index: int, indexes: np.ndarray) -> np.ndarray:
+        """
+        Calculates the attenuation values between the device with index `index`
+        and the devices with the indexes in `indexes` using the store's model
+        classes
+        """
+        position = self._positions[index]
+        positions = self._positions[indexes]
+        attenuations = self._modelClasses[0].calculateAttenuations(self._frequencyBandSpec, position, positions)
+        for modelClass in self._modelClasses[1:]:
+            attenuations = attenuations + modelClass.calculateAttenuations(self._frequencyBandSpec, position, positions)
+        return attenuations
+
+    @abstractmethod
+    def _onDeviceAdded(self, index: int):
+        """
+        Is invoked when a device has been added to the store
+
+        Args:
+            index: The index of the device
+        """
+
+    @abstractmethod
+    def _onDeviceMoved(self, index: int):
+        """
+        Is invoked when a device has changed its position. At that time,
+        :attr:`_positions` has already been updated.
+
+        Args:
+            index: The index of the device
+        """
+
+    def _onPositionChange(self, position: devices.Position, index: int):
+        self._positions[index] = (position.x, position.y)
+        self._onDeviceMoved(index)
+
+class DenseAttenuationStore(AttenuationStore):
+    """
+    An :class:`AttenuationStore` implementation that stores the attenuation
+    values of all device pairs in an :math:`N \\times N` NumPy matrix, with
+    :math:`N` being the number of devices. Attenuation lookups are array reads
+    and when a device changes its position, its row and column are
+    recalculated in a single vectorized step.
+    """
+
+    def __init__(self, frequencyBandSpec: FrequencyBandSpec, modelClasses: List[AttenuationModelClass]):
+        super(DenseAttenuationStore, self).__init__(frequencyBandSpec, modelClasses)
+        self._matrix = np.zeros((8, 8))
+
+    # inherit __init__ docstring
+    __init__.__doc__ = AttenuationStore.__init__.__doc__
+    
+    def getAttenuationsByIndex(self, index: int, indexes: np.ndarray) -> np.ndarray:
+        return self._matrix[index, indexes]
+
+    def _updateRowAndColumn(self, index: int):
+        n = len(self._devices)
+        attenuations = self._calculateAttenuations(index, np.arange(n))
+        attenuations[index] = 0
+        self._matrix[index, :n] = attenuations
+        self._matrix[:n, index] = attenuations
+
+    def _onDeviceAdded(self, index: int):
+        size = len(self._matrix)
+        if index >= size:
+            matrix = np.zeros((2*size, 2*size))
+            matrix[:size, :size] = self._matrix
+            self._matrix = matrix
+        self._updateRowAndColumn(index)
+    
+    def _onDeviceMoved(self, index: int):
+        self._updateRowAndColumn(index)
+
+class SparseAttenuationStore(AttenuationStore):
+    """
+    An :class:`AttenuationStore` implementation for large deployments that only
+    stores the attenuation values of device pairs within a configurable cutoff
+    distance. Pairs of devices that are further apart are considered to be
+    fully attenuated (with an attenuation of ``inf`` dB). Thus, memory
+    consumption grows with :math:`O(N \\cdot k)` instead of :math:`O(N^2)`, with
+    :math:`k` being the average number of neighbors per device.
+
+    Neighbors are determined using a :class:`~gymwipe.devices.core.SpatialIndex`
+    with the cutoff distance as its cell size. When a device changes its
+    position, only its own neighbor list and the lists of its former and new
+    neighbors are updated.
+    """
+
+    def __init__(self, frequencyBandSpec: FrequencyBandSpec, modelClasses: List[AttenuationModelClass],
+                    cutoff: float):
+        """
+        Args:
+            frequencyBandSpec: The frequency band specification of the
+                corresponding :class:`FrequencyBand`
+            modelClasses: A non-empty list of :class:`AttenuationModel`
+                subclasses that implement
+                :meth:`~AttenuationModel.calculateAttenuations`. The attenuation
+                values of multiple models are summed up.
+            cutoff: The maximum distance in metres for which attenuation values
+                are stored
+        """
+        super(SparseAttenuationStore, self).__init__(frequencyBandSpec, modelClasses)
+        self.cutoff = cutoff
+        self._spatialIndex = SpatialIndex(cutoff)
+        # Per device: A dict mapping neighbor indexes to attenuation values
+        self._neighbors: List[Dict[int, float]] = []
+    
+    def getNeighbors(self, index: int) -> Dict[int, float]:
+        """
+        Returns a dict that maps the indexes of the neighbors of the device with
+        index `index` (i.e. the devices within the cutoff distance) to the
+        corresponding attenuation values. The dict must not be modified.
+
+        Args:
+            index: A device index
+        """
+        return self._neighbors[index]
+
+    def getAttenuationsByIndex(self, index: int, indexes: np.ndarray) -> np.ndarray:
+        neighbors = self._neighbors[index]
+        if len(indexes) <= len(neighbors):
+            return np.fromiter((neighbors.get(i, np.inf) for i in indexes), float, len(indexes))
+        # Fill a lookup array for all devices, which is cheaper for many indexes
+        lookup = np.full(len(self._devices), np.inf)
+        if len(neighbors) > 0:
+            lookup[np.fromiter(neighbors.keys(), int, len(neighbors))] = list(neighbors.values())
+        return lookup[indexes]
+
+    def _updateNeighbors(self, index: int):
+        device = self._devices[index]
+        deviceToIndex = self._deviceToIndex
+        neighborIndexes = np.array([
+            deviceToIndex[d] for d in self._spatialIndex.getDevicesInRadius(device.position, self.cutoff)
+            if d is not device
+        ], dtype=int)
+        attenuations = self._calculateAttenuations(index, neighborIndexes)
+        oldNeighbors = self._neighbors[index]
+        newNeighbors = dict(zip(neighborIndexes.tolist(), attenuations.tolist()))
+
+        # Remove the device from the neighbor lists of former neighbors
+        for neighborIndex in oldNeighbors:
+            if neighborIndex not in newNeighbors:
+                del self._neighbors[neighborIndex][index]
+        # Update the neighbor lists of current neighbors
+        for neighborIndex, attenuation in newNeighbors.items():
+            self._neighbors[neighborIndex][index] = attenuation
+        self._neighbors[index] = newNeighbors
+
+    def _onDeviceAdded(self, index: int):
+        self._neighbors.append({})
+        self._spatialIndex.addDevice(self._devices[index])
+        self._updateNeighbors(index)
+    
+    def _onDeviceMoved(self, index: int):
+        self._updateNeighbors(index)
+
+class InterferenceEngine:
+    """
+    An :class:`InterferenceEngine` keeps track of the power that every
+    registered receiver receives from every active transmission of a
+    :class:`FrequencyBand`. Received power values are stored in a NumPy array
+    with one row per receiver and one column per active transmission. When a
+    transmission starts or ends, or when a device changes its position, the
+    affected values are updated in a single batch.
+
+    Receivers (typically physical layer implementations) do not have to
+    subscribe to :attr:`FrequencyBand.nNewTransmission` in order to track
+    received power levels on their own. Instead, they register at the engine
+    using :meth:`addReceiver` and read their received power levels via
+    :meth:`getReceivedPower` and :meth:`getTotalReceivedPower`. Receivers that
+    need to react to every change of their received power level (e.g. while
+    receiving a transmission) can set a listener via :meth:`setListener`.
+
+    Note:
+        The proper way to obtain an :class:`InterferenceEngine` is to create a
+        :class:`FrequencyBand` with `useInterferenceEngine` set to ``True``.
+    """
+
+    POSITION_CHANGE_PRIORITY = -2
+    """
+    int: The priority of the engine's position change callbacks. It is chosen
+    to be lower than the priorities used by :class:`AttenuationModel`
+    implementations, so that received power values are updated only after the
+    attenuation values have been updated.
+    """
+
+    def __init__(self, frequencyBand: "FrequencyBand"):
+        """
+        Args:
+            frequencyBand: The :class:`FrequencyBand` whose transmissions are
+                tracked by the engine
+        """
+        self._frequencyBand = frequencyBand
+
+        # Receivers
+        self._receiverDevices: List[Device] = []
+        self._deviceToReceiverIndexes: Dict[Device, List[int]] = {}
+        self._listeners: Dict[int, Callable[[float], None]] = {}
+
+        # Active transmissions (one column slot per transmission)
+        self._slotTransmissions: List[Transmission] = []
+        self._transmissionToSlot: Dict[Transmission, int] = {}
+        self._freeSlots: List[int] = []
+
+        # Received power values in mW (receivers x transmission slots)
+        self._receivedPowers = np.zeros((8, 8))
+        # Sums of the received power values in mW (one per receiver)
+        self._totalPowers = np.zeros(8)
+        # Attenuation store indexes of the receivers' devices (one per receiver)
+        self._receiverStoreIndexes = np.zeros(8, dtype=int)
+        # Attenuation store indexes of the senders and transmission powers in
+        # dBm (one per transmission slot)
+        self._slotSenderStoreIndexes = np.zeros(8, dtype=int)
+        self._slotTransmissionPowers = np.zeros(8)
+
+        # Devices whose position changes are observed
+        self._observedDevices = set()
+
+        # Received power values have to be updated before any other callback
+        # is invoked
+        frequencyBand.nNewTransmission.subscribeCallback(self._onNewTransmission, priority=1)
+
+    def __repr__(self):
+        return "{}InterferenceEngine()".format(ownerPrefix(self._frequencyBand))
+
+    @property
+    def receiverCount(self) -> int:
+        """int: The number of receivers that have been registered"""
+        return len(self._receiverDevices)
+
+    def addReceiver(self, device: Device) -> int:
+        """
+        Registers a receiver operated by `device` and returns the receiver's
+        index, which has to be provided to the engine's other methods.
+
+        Args:
+            device: The device that operates the receiver
+        """
+        index = len(self._receiverDevices)
+        self._ensureCapacity(index + 1, len(self._slotTransmissions))
+        self._receiverDevices.append(device)
+        self._deviceToReceiverIndexes.setdefault(device, []).append(index)
+        if self._frequencyBand.attenuationStore is not None:
+            self._receiverStoreIndexes[index] = self._frequencyBand.attenuationStore.getIndex(device)
+        self._observe(device)
+
+        # Calculate the power received from currently active transmissions
+        rows = np.array([index])
+        for t, slot in self._transmissionToSlot.items():
+            power = self._calculateReceivedPowers(t, rows)[0]
+            self._receivedPowers[index, slot] = power
+            self._totalPowers[index] += power
+        return index
+
+    def setListener(self, receiverIndex: int, listener: Callable[[float], None]):
+        """
+        Makes the engine invoke `listener` whenever the total power received by
+        the specified receiver changes, providing the change in mW.
+
+        Args:
+            receiverIndex: The receiver's index as returned by :meth:`addReceiver`
+            listener: The callable to be invoked
+        """
+        self._listeners[receiverIndex] = listener
+
+    def removeListener(self, receiverIndex: int):
+        """
+        Removes the listener that has been set for the specified receiver.
+
+        Args:
+            receiverIndex: The receiver's index as returned by :meth:`addReceiver`
+        """
+        self._listeners.pop(receiverIndex, None)
+
+    def reset(self):
+        """
+        Discards all active transmissions and listeners after a
+        :meth:`~gymwipe.simtools.SimulationManager.reset`. Registered receivers
+        keep their indexes.
+        """
+        self._listeners.clear()
+        self._slotTransmissions = []
+        self._transmissionToSlot.clear()
+        self._freeSlots = []
+        self._receivedPowers[:] = 0
+        self._totalPowers[:] = 0
+
+    def getReceivedPower(self, receiverIndex: int, t: Transmission) -> float:
+        """
+        Returns the power in mW that the specified receiver receives from the
+        active transmission `t`.
+
+        Args:
+            receiverIndex: The receiver's index as returned by :meth:`addReceiver`
+            t: An active transmission
+        """
+        return float(self._receivedPowers[receiverIndex, self._transmissionToSlot[t]])
+
+    def getTotalReceivedPower(self, receiverIndex: int) -> float:
+        """
+        Returns the sum of the power values in mW that the specified receiver
+        receives from all active transmissions (excluding thermal noise).
+
+        Args:
+            receiverIndex: The receiver's index as returned by :meth:`addReceiver`
+        """
+        return float(self._totalPowers[receiverIndex])
+
+    def _ensureCapacity(self, rows: int, columns: int):
+        """
+        Grows the received power arrays (by doubling their sizes) if they do not
+        provide space for `rows` receivers and `columns` transmissions.
+        """
+        currentRows, currentColumns = self._receivedPowers.shape
+        if rows <= currentRows and columns <= currentColumns:
+            return
+        newRows, newColumns = currentRows, currentColumns
+        while newRows < rows:
+            newRows *= 2
+        while newColumns < columns:
+            newColumns *= 2
+        receivedPowers = np.zeros((newRows, newColumns))
+        receivedPowers[:currentRows, :currentColumns] = self._receivedPowers
+        self._receivedPowers = receivedPowers
+        totalPowers = np.zeros(newRows)
+        totalPowers[:currentRows] = self._totalPowers
+        self._totalPowers = totalPowers
+        storeIndexes = np.zeros(newRows, dtype=int)
+        storeIndexes[:currentRows] = self._receiverStoreIndexes
+        self._receiverStoreIndexes = storeIndexes
+        senderStoreIndexes = np.zeros(newColumns, dtype=int)
+        senderStoreIndexes[:currentColumns] = self._slotSenderStoreIndexes
+        self._slotSenderStoreIndexes = senderStoreIndexes
+        transmissionPowers = np.zeros(newColumns)
+        transmissionPowers[:currentColumns] = self._slotTransmissionPowers
+        self._slotTransmissionPowers = transmissionPowers
+
+    def _observe(self, device: Device):
+        """
+        Subscribes to position changes of `device` if that has not been done yet
+        """
+        if device not in self._observedDevices:
+            self._observedDevices.add(device)
+            device.position.nChange.subscribeCallback(self._onPositionChange,
+                    priority=self.POSITION_CHANGE_PRIORITY, additionalArgs=[device])
+
+    def _getAttenuations(self, sender: Device, rows: np.ndarray) -> np.ndarray:
+        """
+        Returns the attenuation values in dB between `sender` and the devices of
+        the receivers specified by `rows`. For receivers operated by `sender`
+        itself, the attenuation is infinite.
+        """
+        band = self._frequencyBand
+        store = band.attenuationStore
+        if store is not None:
+            senderIndex = store.getIndex(sender)
+            storeIndexes = self._receiverStoreIndexes[rows]
+            attenuations = store.getAttenuationsByIndex(senderIndex, storeIndexes)
+            return np.where(storeIndexes == senderIndex, np.inf, attenuations)
+        devices = self._receiverDevices
+        return np.array([
+            np.inf if devices[r] is sender else band.getAttenuationModel(sender, devices[r]).attenuation
+            for r in rows
+        ], dtype=float)
+
+    def _calculateReceivedPowers(self, t: Transmission, rows: np.ndarray) -> np.ndarray:
+        """
+        Returns the power values in mW that the receivers specified by `rows`
+        receive from the transmission `t`.
+        """
+        return np.power(10.0, (t.power - self._getAttenuations(t.sender, rows)) / 10)
+
+    def _notifyListeners(self, deltas: np.ndarray):
+        """
+        Invokes the listeners of receivers with non-zero entries in `deltas`
+        """
+        if len(self._listeners) > 0:
+            for index, listener in list(self._listeners.items()):
+                delta = deltas[index]
+                if delta != 0:
+                    listener(float(delta))
+
+    # Callbacks
+
+    def _onNewTransmission(self, t: Transmission):
+        receiverCount = len(self._receiverDevices)
+        if len(self._freeSlots) > 0:
+            slot = self._freeSlots.pop()
+            self._slotTransmissions[slot] = t
+        else:
+            slot = len(self._slotTransmissions)
+            self._ensureCapacity(receiverCount, slot + 1)
+            self._slotTransmissions.append(t)
+        self._transmissionToSlot[t] = slot
+        self._slotTransmissionPowers[slot] = t.power
+        if self._frequencyBand.attenuationStore is not None:
+            self._slotSenderStoreIndexes[slot] = self._frequencyBand.attenuationStore.getIndex(t.sender)
+        self._observe(t.sender)
+
+        powers = self._calculateReceivedPowers(t, np.arange(receiverCount))
+        self._receivedPowers[:receiverCount, slot] = powers
+        self._totalPowers[:receiverCount] += powers
+        logger.debug("Added %s", t, sender=self)
+
+        t.eCompletes.callbacks.append(self._onCompletingTransmission)
+        self._notifyListeners(powers)
+
+    def _onCompletingTransmission(self, event: Event):
+        t: Transmission = event.value
+        slot = self._transmissionToSlot.pop(t)
+        receiverCount = len(self._receiverDevices)
+        powers = self._receivedPowers[:receiverCount, slot].copy()
+        self._receivedPowers[:receiverCount, slot] = 0
+        self._slotTransmissions[slot] = None
+        self._freeSlots.append(slot)
+
+        if len(self._transmissionToSlot) == 0:
+            # Prevent the accumulation of floating point errors
+            self._totalPowers[:] = 0
+        else:
+            self._totalPowers[:receiverCount] -= powers
+        logger.debug("Removed %s", t, sender=self)
+        self._notifyListeners(-powers)
+
+    def _onPositionChange(self, position: devices.Position, device: Device):
+        if len(self._transmissionToSlot) == 0:
+            return
+        receiverCount = len(self._receiverDevices)
+        allRows = np.arange(receiverCount)
+        deviceRows = np.array(self._deviceToReceiverIndexes.get(device, []), dtype=int)
+        deltas = np.zeros(receiverCount)
+        store = self._frequencyBand.attenuationStore
+        if store is None:
+            for t, slot in self._transmissionToSlot.items():
+                rows = allRows if t.sender is device else deviceRows
+                if len(rows) > 0:
+                    powers = self._calculateReceivedPowers(t, rows)
+                    deltas[rows] += powers - self._receivedPowers[rows, slot]
+                    self._receivedPowers[rows, slot] = powers
+        else:
+            # Update the device's rows for all transmissions at once
+            slots = np.fromiter(self._transmissionToSlot.values(), int, len(self._transmissionToSlot))
+            senderStoreIndexes = self._slotSenderStoreIndexes[slots]
+            for row in deviceRows:
+                storeIndex = self._receiverStoreIndexes[row]
+                attenuations = store.getAttenuationsByIndex(storeIndex, senderStoreIndexes)
+                powers = np.power(10.0, (self._slotTransmissionPowers[slots] - attenuations) / 10)
+                powers[senderStoreIndexes == storeIndex] = 0
+                deltas[row] += np.sum(powers - self._receivedPowers[row, slots])
+                self._receivedPowers[row, slots] = powers
+            # Update the columns of the device's transmissions
+            for t, slot in self._transmissionToSlot.items():
+                if t.sender is device:
+                    powers = self._calculateReceivedPowers(t, allRows)
+                    deltas += powers - self._receivedPowers[:receiverCount, slot]
+                    self._receivedPowers[:receiverCount, slot] = powers
+        self._totalPowers[:receiverCount] += deltas
+        self._notifyListeners(deltas)
+
 class FrequencyBand:
     """
     The :class:`FrequencyBand` class serves as a manager for transmission
     objects and represents a wireless frequency band. It also offers a
     :meth:`getAttenuationModel` method that returns a frequency-band-specific
     AttenuationModel for any pair of devices.
+
+    Devices that transmit and receivers passed to
+    :meth:`nNewTransmissionInReach` are kept in
+    :class:`~gymwipe.devices.core.SpatialIndex` instances, so that range
+    notifications and :meth:`getActiveTransmissionsInReach` queries only
+    consider devices located nearby.
     """
 
-    def __init__(self, modelClasses: List[AttenuationModelClass], frequency: float = 2.4e9, bandwidth: float = 22e6):
+    SPATIAL_INDEX_CELL_SIZE: float = 20.0
+    """
+    float: The cell size in metres of the spatial indexes used for
+    range-limited notifications and queries
+    """
+
+    def __init__(self, modelClasses: List[AttenuationModelClass], frequency: float = 2.4e9,
+                    bandwidth: float = 22e6, useInterferenceEngine: bool = False,
+                    attenuationMatrix: bool = False, attenuationCutoff: float = None):
         """
         Args:
             modelClasses: A non-empty list :class:`AttenuationModel` subclasses
@@ -544,7 +1548,33 @@ class FrequencyBand:
             frequency: The frequency band's frequency in Hz. Defaults to 2.4 GHz.
             bandwidth: The frequency band's bandwidth in Hz. Defaults to 22 MHz (as in
                 IEEE 802.11)
+            useInterferenceEngine: If set to ``True``, an
+                :class:`InterferenceEngine` will be created and made available
+                via :attr:`interferenceEngine`. Defaults to ``False``.
+            attenuationMatrix: If set to ``True``, a
+                :class:`DenseAttenuationStore` will be used for the attenuation
+                values that are used by the :attr:`interferenceEngine`. This
+                requires `useInterferenceEngine` to be ``True`` and every class
+                in `modelClasses` to implement
+                :meth:`~AttenuationModel.calculateAttenuations`. Defaults to
+                ``False``.
+            attenuationCutoff: If provided, a :class:`SparseAttenuationStore`
+                with the given cutoff distance (in metres) will be used instead
+                of a :class:`DenseAttenuationStore`. This requires
+                `useInterferenceEngine` to be ``True`` and `attenuationMatrix`
+                to be ``False``.
+
+        Raises:
+            ValueError: If `attenuationMatrix` is ``True`` or
+                `attenuationCutoff` is provided while `useInterferenceEngine` is
+                ``False``, or if both `attenuationMatrix` and
+                `attenuationCutoff` are provided
         """
+        if (attenuationMatrix or attenuationCutoff is not None) and not useInterferenceEngine:
+            raise ValueError("Attenuation stores can only be used in combination "
+                                "with an interference engine.")
+        if attenuationMatrix and attenuationCutoff is not None:
+            raise ValueError("attenuationMatrix and attenuationCutoff cannot be used together.")
 
         self.spec = FrequencyBandSpec(frequency, bandwidth)
         """
@@ -553,8 +1583,27 @@ class FrequencyBand:
 
         self._attenuationModelFactory = AttenuationModelFactory(self.spec, modelClasses)
 
+        self.attenuationStore: AttenuationStore = None
+        """
+        :class:`AttenuationStore`: The :class:`AttenuationStore` that provides
+        attenuation values to the :attr:`interferenceEngine`, ``None`` if the
+        attenuation values are provided by :class:`AttenuationModel` instances
+        """
+        if attenuationMatrix:
+            self.attenuationStore = DenseAttenuationStore(self.spec, modelClasses)
+        elif attenuationCutoff is not None:
+            self.attenuationStore = SparseAttenuationStore(self.spec, modelClasses, attenuationCutoff)
+
         self._transmissions: Deque[Transmission] = deque()
         self._transmissionInReachNotifiers: Dict[Tuple[Device, float], Notifier] = {}
+        # Receiver -> (radius -> Notifier) dict for looking up the notifiers of
+        # receivers found in the spatial index
+        self._receiverToReachNotifiers: Dict[Device, Dict[float, Notifier]] = {}
+        self._maxReachRadius = 0.0
+        # Spatial indexes of receivers with transmission-in-reach notifiers and
+        # of devices that have transmitted
+        self._receiverIndex = SpatialIndex(self.SPATIAL_INDEX_CELL_SIZE)
+        self._senderIndex = SpatialIndex(self.SPATIAL_INDEX_CELL_SIZE)
 
         self.nNewTransmission: Notifier = Notifier("New transmission", self)
         """
@@ -562,10 +1611,34 @@ class FrequencyBand:
         :meth:`transmit` is executed, providing the :class:`Transmission` object
         that represents the transmission.
         """
+
+        self.interferenceEngine: InterferenceEngine = None
+        """
+        :class:`InterferenceEngine`: The frequency band's interference engine
+        if `useInterferenceEngine` has been set to ``True``, ``None`` otherwise
+        """
+        if useInterferenceEngine:
+            self.interferenceEngine = InterferenceEngine(self)
     
     def __repr__(self):
         return "FrequencyBand(f={:.2E} Hz)".format(self.spec.frequency)
 
+    def reset(self):
+        """
+        Resets the frequency band to its initial state after a
+        :meth:`~gymwipe.simtools.SimulationManager.reset`: Transmissions are
+        discarded and the notifiers (see
+        :meth:`~gymwipe.simtools.Notifier.reset`) and the
+        :attr:`interferenceEngine` are reset. Attenuation models, attenuation
+        stores, and subscriptions are kept.
+        """
+        self._transmissions.clear()
+        self.nNewTransmission.reset()
+        for notifier in self._transmissionInReachNotifiers.values():
+            notifier.reset()
+        if self.interferenceEngine is not None:
+            self.interferenceEngine.reset()
+
     def getAttenuationModel(self, deviceA: Device, deviceB: Device) -> AttenuationModel:
         """
         Returns the AttenuationModel instance that provides attenuation values
@@ -573,6 +1646,17 @@ class FrequencyBand:
         """
         return self._attenuationModelFactory.getInstance(deviceA, deviceB)
 
+    def getAttenuation(self, deviceA: Device, deviceB: Device) -> float:
+        """
+        Returns the current attenuation in dB between `deviceA` and `deviceB`.
+        If the frequency band has an :attr:`attenuationStore`, the value is
+        read from it. Otherwise, it is provided by the corresponding
+        :class:`AttenuationModel` instance.
+        """
+        if self.attenuationStore is not None:
+            return self.attenuationStore.getAttenuation(deviceA, deviceB)
+        return self.getAttenuationModel(deviceA, deviceB).attenuation
+
     def transmit(self, sender: Device, power: float, packet: Packet, mcsHeader: Mcs, mcsPayload: Mcs) -> Transmission:
         """
         Simulates the transmission of `packet` with the given properties. This
@@ -596,14 +1680,22 @@ class FrequencyBand:
         self._removeFirstPastTransmission() # regular cleanup
         t = Transmission(sender, power, packet, mcsHeader, mcsPayload, SimMan.now)
         self._transmissions.append(t)
+        self._senderIndex.addDevice(sender)
         logger.info("%s added", t, sender=self)
+        recorder = SimMan.traceRecorder
+        if recorder is not None:
+            recorder.recordTransmission(t)
         # trigger notifiers after returning the transmission
         def callAfterReturn(value: Any):
             self.nNewTransmission.trigger(t)
             # check which transmissionInReachNotifiers have to be triggered
-            for (receiver, radius), notifier in self._transmissionInReachNotifiers.items():
-                if receiver.position.distanceTo(sender.position) <= radius:
-                    notifier.trigger(t)
+            if len(self._receiverToReachNotifiers) > 0:
+                senderPosition = sender.position
+                for receiver in self._receiverIndex.getDevicesInRadius(senderPosition, self._maxReachRadius):
+                    distance = receiver.position.distanceTo(senderPosition)
+                    for radius, notifier in self._receiverToReachNotifiers[receiver].items():
+                        if distance <= radius:
+                            notifier.trigger(t)
         SimMan.timeout(0).callbacks.append(callAfterReturn)
         return t
     
@@ -633,7 +1725,11 @@ class FrequencyBand:
                 considered
             radius: The radius around the receiver (in metres)
         """
-        return [t for t in self.getActiveTransmissions() if t.sender.position.distanceTo(receiver) <= radius]
+        activeTransmissions = self.getActiveTransmissions()
+        if len(activeTransmissions) == 0:
+            return []
+        sendersInReach = set(self._senderIndex.getDevicesInRadius(receiver.position, radius))
+        return [t for t in activeTransmissions if t.sender in sendersInReach]
     
     def nNewTransmissionInReach(self, receiver: Device, radius: float) -> Notifier:
         """
@@ -650,6 +1746,9 @@ class FrequencyBand:
         if (receiver, radius) in self._transmissionInReachNotifiers:
             return self._transmissionInReachNotifiers[receiver, radius]
         # creating a new notifier otherwise
-        n = Notifier("New Transmission within radius {:d} around {}".format(radius, receiver), self)
+        n = Notifier("New Transmission within radius {} around {}".format(radius, receiver), self)
         self._transmissionInReachNotifiers[receiver, radius] = n
+        self._receiverToReachNotifiers.setdefault(receiver, {})[radius] = n
+        self._maxReachRadius = max(self._maxReachRadius, radius)
+        self._receiverIndex.addDevice(receiver)
         return n
@@ -3,9 +3,10 @@ The simple_stack package contains basic network stack layer implementations.
 Layers are modelled by :class:`gymwipe.networking.construction.Module` objects.
 """
 import logging
+import random
 from collections import deque
 from functools import partial
-from typing import Any, Deque, Dict, List
+from typing import Any, Deque, Dict, List, Tuple
 
 import numpy as np
 from simpy.events import Event
@@ -37,7 +38,23 @@ class SimplePhy(Module):
     :attr:`TIME_SLOT_LENGTH`.
     
     During simulation the frequency band is sensed and every successfully
-    received packet is sent via the `macOut` gate.
+    received packet is sent via the `macOut` gate. If the frequency band
+    provides an :class:`~gymwipe.networking.physical.InterferenceEngine`,
+    received power levels are read from the engine instead of being tracked by
+    every :class:`SimplePhy` instance on its own.
+
+    By default, bit errors are counted whenever the received power changes
+    during a reception. If :attr:`integrateBitErrors` is ``True``, only the
+    piecewise-constant signal and interference power levels of a reception are
+    recorded, and the resulting bit errors are integrated at once when the
+    header or the payload of the transmission completes.
+
+    Optionally, a :attr:`sensitivity` and an :attr:`interferenceFloor` can be
+    configured: Transmissions received with less power than the sensitivity are
+    not sensed, and transmissions received with less power than the
+    interference floor are dropped from the received power bookkeeping
+    entirely. The interference that is ignored this way is bounded by
+    :attr:`interferenceErrorBound`.
 
     The `macIn` gate accepts :class:`~gymwipe.networking.messages.Message` objects
     with the following :class:`~gymwipe.networking.messages.StackMessageTypes`:
@@ -57,11 +74,66 @@ class SimplePhy(Module):
     NOISE_POWER_DENSITY = temperatureToNoisePowerDensity(20.0)
     """float: The receiver's noise power density in Watts/Hertz"""
 
+    integrateBitErrors: bool = False
+    """
+    bool: The default for the `integrateBitErrors` argument of
+    :class:`SimplePhy` instances
+    """
+
+    sensitivity: float = None
+    """
+    float: The default for the `sensitivity` argument of :class:`SimplePhy`
+    instances (``None`` disables it)
+    """
+
+    interferenceFloor: float = None
+    """
+    float: The default for the `interferenceFloor` argument of
+    :class:`SimplePhy` instances (``None`` disables it)
+    """
+
     @GateListener.setup
-    def __init__(self, name: str, device: Device, frequencyBand: FrequencyBand):
+    def __init__(self, name: str, device: Device, frequencyBand: FrequencyBand,
+                    integrateBitErrors: bool = None, sensitivity: float = None,
+                    interferenceFloor: float = None):
+        """
+        Args:
+            name: The layer's name
+            device: The device that operates the SimplePhy layer
+            frequencyBand: The frequency band to be used
+            integrateBitErrors: Whether bit errors are integrated over a recorded
+                power timeline when the header or payload of a received
+                transmission completes, instead of being counted on every
+                change of the received power. Defaults to the
+                :attr:`integrateBitErrors` class attribute.
+            sensitivity: The minimum received power in dBm for a transmission to
+                be sensed. Defaults to the :attr:`sensitivity` class attribute
+                or, if that is ``None``, to the interference floor.
+            interferenceFloor: The received power in dBm below which
+                transmissions are neither considered as interference nor
+                sensed. The decision is made when a transmission starts, based
+                on the attenuation at that time. It is only applied if the
+                frequency band does not provide an
+                :class:`~gymwipe.networking.physical.InterferenceEngine`.
+                Defaults to the :attr:`interferenceFloor` class attribute.
+
+        Raises:
+            ValueError: If the interference floor exceeds the sensitivity
+        """
         super(SimplePhy, self).__init__(name , owner=device)
         self.device = device
         self.frequencyBand = frequencyBand
+        if integrateBitErrors is not None:
+            self.integrateBitErrors = integrateBitErrors
+        if sensitivity is not None:
+            self.sensitivity = sensitivity
+        if interferenceFloor is not None:
+            self.interferenceFloor = interferenceFloor
+        if self.sensitivity is None:
+            self.sensitivity = self.interferenceFloor
+        elif self.interferenceFloor is not None and self.interferenceFloor > self.sensitivity:
+            raise ValueError("The interference floor ({} dBm) must not exceed the sensitivity "
+                                "({} dBm).".format(self.interferenceFloor, self.sensitivity))
         self._addPort("mac")
 
         # Attributes related to sending
@@ -73,22 +145,126 @@ class SimplePhy(Module):
         self._nReceivingFinished = Notifier("Finished receiving", self)
         self._currentReceiverMcs = None
         self._resetBitErrorCounter()
+        # Timeline of (time, signal power, total received power) tuples used
+        # if integrateBitErrors is set
+        self._powerTimeline: List[Tuple[float, float, float]] = []
         # thermal noise power in mW
         self._thermalNoisePower = self.NOISE_POWER_DENSITY * frequencyBand.spec.bandwidth * 1000
-        self._transmissionToReceivedPower: Dict[Transmission, float] = {}
-        self._transmissionToAttenuationChangedCallback = {}
-        self._receivedPower = self._thermalNoisePower
-        def updateReceivedPower(delta: float):
-            self._receivedPower += delta
-            logger.debug("%s: Received level changed by %s mW, updated to %s mW",
-                            self, delta, self._receivedPower)
         self._nReceivedPowerChanges = Notifier("Received power changes", self)
-        self._nReceivedPowerChanges.subscribeCallback(updateReceivedPower, priority=1)
+        # The received power callback of the current reception
+        self._receptionCallback = None
+
+        # Received powers in mW below which transmissions are not sensed or
+        # not tracked at all
+        self._sensitivityPower = None if self.sensitivity is None else dbmToMilliwatts(self.sensitivity)
+        self._interferenceFloorPower = None
+        self._culledTransmissionCount = 0
+
+        self._interferenceEngine = frequencyBand.interferenceEngine
+        if self._interferenceEngine is None:
+            if self.interferenceFloor is not None:
+                self._interferenceFloorPower = dbmToMilliwatts(self.interferenceFloor)
+            # Track received power levels on our own
+            self._transmissionToReceivedPower: Dict[Transmission, float] = {}
+            self._transmissionToAttenuationChangedCallback = {}
+            self._receivedPowerSum = self._thermalNoisePower
+            def updateReceivedPower(delta: float):
+                self._receivedPowerSum += delta
+                logger.debug("%s: Received level changed by %s mW, updated to %s mW",
+                                self, delta, self._receivedPowerSum)
+            self._nReceivedPowerChanges.subscribeCallback(updateReceivedPower, priority=1)
+            self.frequencyBand.nNewTransmission.subscribeCallback(self._onNewTransmission)
+        else:
+            # Received power levels are tracked by the interference engine
+            self._receiverIndex = self._interferenceEngine.addReceiver(device)
         
-        self.frequencyBand.nNewTransmission.subscribeCallback(self._onNewTransmission)
-        self.frequencyBand.nNewTransmission.subscribeProcess(self._receive)
+        self._nSensedTransmission = None
+        if self._sensitivityPower is None:
+            self.frequencyBand.nNewTransmission.subscribeProcess(self._receive)
+        else:
+            # Only start receiving transmissions above the sensitivity, so that
+            # imperceptible transmissions do not block the receiver
+            nSensedTransmission = self._nSensedTransmission = Notifier("Sensed transmission", self)
+            nSensedTransmission.subscribeProcess(self._receive)
+            def onNewTransmission(t: Transmission):
+                if self._isSensed(t):
+                    nSensedTransmission.trigger(t)
+            # Run after the received power bookkeeping (priority 0 or higher)
+            self.frequencyBand.nNewTransmission.subscribeCallback(onNewTransmission, priority=-1)
         logger.info("Initialized %s with noise power %s dBm", self, milliwattsToDbm(self._thermalNoisePower))
 
+    def reset(self):
+        """
+        Resets the physical layer to its initial state after a
+        :meth:`~gymwipe.simtools.SimulationManager.reset`: The transmitter and
+        the receiver are idle, bit error counters are cleared, and the
+        received power bookkeeping is emptied (the :class:`FrequencyBand` and
+        its interference engine have to be reset as well).
+        """
+        super(SimplePhy, self).reset()
+        self._transmitting = False
+        self._currentTransmission = None
+        self._receiving = False
+        self._currentReceiverMcs = None
+        self._resetBitErrorCounter()
+        self._powerTimeline = []
+        self._culledTransmissionCount = 0
+        if self._receptionCallback is not None:
+            self._nReceivedPowerChanges.unsubscribeCallback(self._receptionCallback)
+            self._receptionCallback = None
+        self._nReceivingFinished.reset()
+        self._nReceivedPowerChanges.reset()
+        if self._nSensedTransmission is not None:
+            self._nSensedTransmission.reset()
+        if self._interferenceEngine is None:
+            for t, callback in self._transmissionToAttenuationChangedCallback.items():
+                self._getAttenuationModelByTransmission(t).nAttenuationChanges.unsubscribeCallback(callback)
+            self._transmissionToAttenuationChangedCallback.clear()
+            self._transmissionToReceivedPower.clear()
+            self._receivedPowerSum = self._thermalNoisePower
+
+    @property
+    def _receivedPower(self) -> float:
+        """
+        float: The total power in mW that is currently received (including
+        thermal noise)
+        """
+        if self._interferenceEngine is None:
+            return self._receivedPowerSum
+        return self._thermalNoisePower + self._interferenceEngine.getTotalReceivedPower(self._receiverIndex)
+
+    @property
+    def interferenceErrorBound(self) -> float:
+        """
+        float: An upper bound for the power in mW that is currently received
+        from transmissions below the interference floor and therefore not
+        considered as interference (as long as the attenuation to their
+        senders does not decrease after they have started)
+        """
+        if self._interferenceFloorPower is None:
+            return 0.0
+        return self._culledTransmissionCount * self._interferenceFloorPower
+
+    def _isSensed(self, t: Transmission) -> bool:
+        """
+        Returns whether the transmission `t` is received with at least
+        :attr:`sensitivity` dBm.
+        """
+        if self._sensitivityPower is None:
+            return True
+        if self._interferenceEngine is None and t not in self._transmissionToReceivedPower:
+            return False
+        return self._getReceivedPowerByTransmission(t) >= self._sensitivityPower
+
+    def _getReceivedPowerByTransmission(self, t: Transmission) -> float:
+        """
+        Returns the power in mW that is currently received from the active
+        transmission `t`.
+        """
+        if self._interferenceEngine is None:
+            return self._transmissionToReceivedPower[t]
+        return self._interferenceEngine.getReceivedPower(self._receiverIndex, t)
+
     def _getAttenuationModelByTransmission(self, t: Transmission) -> AttenuationModel:
         """
         Returns the attenuation model for this device and the sender of the
@@ -133,6 +309,11 @@ class SimplePhy(Module):
         """
         if t is not self._currentTransmission:
             receivedPower = self._calculateReceivedPower(t)
+            if self._interferenceFloorPower is not None and receivedPower < self._interferenceFloorPower:
+                # Drop the transmission from the bookkeeping
+                self._culledTransmissionCount += 1
+                t.eCompletes.callbacks.append(self._onCompletingCulledTransmission)
+                return
             self._transmissionToReceivedPower[t] = receivedPower
             logger.debug("%s starts, received power from that "
                             "transmission: %s mW", t, receivedPower, sender=self)
@@ -156,6 +337,12 @@ class SimplePhy(Module):
         callback = self._transmissionToAttenuationChangedCallback.pop(t)
         self._getAttenuationModelByTransmission(t).nAttenuationChanges.unsubscribeCallback(callback)
     
+    def _onCompletingCulledTransmission(self, event: Event):
+        """
+        Is called when a transmission below the interference floor completes
+        """
+        self._culledTransmissionCount -= 1
+
     # Callbacks for bit error calculation
 
     def _updateBitErrorRate(self, t: Transmission):
@@ -163,14 +350,18 @@ class SimplePhy(Module):
         Sets :attr:`_receivedBitErrorRate` to the current bit error rate for the
         transmission `t`.
         """
-        signalPower = self._transmissionToReceivedPower[t]
+        signalPower = self._getReceivedPowerByTransmission(t)
         noisePower = self._receivedPower - signalPower
         assert signalPower >= 0
         assert noisePower >= 0
         signalPowerDbm = milliwattsToDbm(signalPower)
         noisePowerDbm = milliwattsToDbm(noisePower)
-        self._receivedBitErrorRate = self._currentReceiverMcs.calculateBitErrorRate(signalPowerDbm, noisePowerDbm)
-        logger.debug("Currently simulated bit error rate: " + str(self._receivedBitErrorRate), sender=self)
+        self._receivedBitErrorRate = self._currentReceiverMcs.getBitErrorRate(signalPowerDbm, noisePowerDbm)
+        logger.debug("Currently simulated bit error rate: %s", self._receivedBitErrorRate, sender=self)
+        recorder = SimMan.traceRecorder
+        if recorder is not None:
+            recorder.recordBitErrorRate(self.device, t, self._receivedBitErrorRate,
+                                        signalPowerDbm - noisePowerDbm)
 
     def _resetBitErrorCounter(self):
         self._receivedBitErrorSum = 0
@@ -186,6 +377,38 @@ class SimplePhy(Module):
         # rounding is done in the end)
         bitErrors = self._receivedBitErrorRate * duration * self._currentReceiverMcs.bitRate
         self._receivedBitErrorSum += bitErrors
+        self._lastReceivedErrorCountTime = now
+
+    def _recordPowerLevels(self, t: Transmission):
+        """
+        Appends the current signal power of the transmission `t` and the total
+        received power to the :attr:`_powerTimeline`.
+        """
+        self._powerTimeline.append((SimMan.now, self._getReceivedPowerByTransmission(t), self._receivedPower))
+
+    def _integrateBitErrors(self, mcs: Mcs) -> float:
+        """
+        Returns the number of bit errors (as a float) that results from the
+        power levels recorded in the :attr:`_powerTimeline` up to the current
+        simulation time when `mcs` is used. Afterwards, the timeline is reset to
+        the most recent power levels, starting at the current simulation time.
+        """
+        now = SimMan.now
+        timeline = self._powerTimeline
+        times, signalPowers, totalPowers = (np.array(column) for column in zip(*timeline))
+        durations = np.diff(np.append(times, now))
+        signalPowersDbm = 10 * np.log10(signalPowers)
+        # The received power sum is updated incrementally, so floating point
+        # cancellation may leave less than the thermal noise (or even a
+        # non-positive value) after subtracting the signal power
+        noisePowersDbm = 10 * np.log10(np.maximum(totalPowers - signalPowers, self._thermalNoisePower))
+        if mcs.useBitErrorRateTable:
+            bitErrorRates = mcs.getBitErrorRates(signalPowersDbm, noisePowersDbm)
+        else:
+            bitErrorRates = np.array([mcs.calculateBitErrorRate(s, n)
+                                        for s, n in zip(signalPowersDbm, noisePowersDbm)])
+        self._powerTimeline = [(now,) + timeline[-1][1:]]
+        return float(np.dot(bitErrorRates, durations)) * mcs.bitRate
     
     # SimPy processes
 
@@ -219,73 +442,274 @@ class SimplePhy(Module):
             self._currentReceiverMcs = t.mcsHeader
             self._resetBitErrorCounter()
 
-            # Callback for reacting to changes of the received power
-            def onReceivedPowerChange(delta: float):
-                if delta != 0:
-                    # Count bit errors for the duration in which the power has
-                    # not changed
-                    self._countBitErrors()
-
-                    if not t.completed:
-                        # Update the bit error rate accordingly
-                        self._updateBitErrorRate(t)
+            if self.integrateBitErrors:
+                # Callback for recording changes of the received power
+                def onReceivedPowerChange(delta: float):
+                    if delta != 0 and not t.completed:
+                        self._recordPowerLevels(t)
+            else:
+                # Callback for reacting to changes of the received power
+                def onReceivedPowerChange(delta: float):
+                    if delta != 0:
+                        # Count bit errors for the duration in which the power has
+                        # not changed
+                        self._countBitErrors()
+
+                        if not t.completed:
+                            # Update the bit error rate accordingly
+                            self._updateBitErrorRate(t)
             
             self._nReceivedPowerChanges.subscribeCallback(onReceivedPowerChange)
+            self._receptionCallback = onReceivedPowerChange
+            if self._interferenceEngine is not None:
+                self._interferenceEngine.setListener(self._receiverIndex, self._nReceivedPowerChanges.trigger)
 
-            self._updateBitErrorRate(t) # Calculate initial bitErrorRate
+            if self.integrateBitErrors:
+                self._powerTimeline = []
+                self._recordPowerLevels(t) # Record initial power levels
+            else:
+                self._updateBitErrorRate(t) # Calculate initial bitErrorRate
             
             # Wait for the header to be transmitted
             yield t.eHeaderCompletes
 
-            # Count errors since the last time that the received power has changed
-            self._countBitErrors() 
+            if self.integrateBitErrors:
+                self._receivedBitErrorSum = self._integrateBitErrors(t.mcsHeader)
+            else:
+                # Count errors since the last time that the received power has changed
+                self._countBitErrors() 
 
             # Decide whether the header could be received
-            if self._decide(self._receivedBitErrorSum, t.headerBits, t.mcsHeader, logSubject="Header"):
+            if self._decide(self._receivedBitErrorSum, t.headerBits, t.mcsHeader, logSubject="Header", t=t):
                 # Possibly switch MCS
                 self._currentReceiverMcs = t.mcsPayload
                 self._resetBitErrorCounter()
-                self._updateBitErrorRate(t)
+                if not self.integrateBitErrors:
+                    self._updateBitErrorRate(t)
 
                 # Wait for the payload to be transmitted
                 yield t.eCompletes
-                self._countBitErrors()
+                if self.integrateBitErrors:
+                    self._receivedBitErrorSum = self._integrateBitErrors(t.mcsPayload)
+                else:
+                    self._countBitErrors()
 
-                logger.debug("{:.3} of {:.3} payload bits were errors.".format(
-                                self._receivedBitErrorSum, t.payloadBits), sender=self)
+                logger.debug("%.3g of %.3g payload bits were errors.",
+                                self._receivedBitErrorSum, t.payloadBits, sender=self)
                 
                 # Decide whether the payload could be received
-                if self._decide(self._receivedBitErrorSum, t.payloadBits, t.mcsPayload, logSubject="Payload"):
+                if self._decide(self._receivedBitErrorSum, t.payloadBits, t.mcsPayload, logSubject="Payload", t=t):
                     # Send the packet via the mac gate
                     self.gates["macOut"].send(t.packet)
                 else:
                     logger.info("Receiving transmission payload failed for %s", t, sender=self)
             
             self._nReceivedPowerChanges.unsubscribeCallback(onReceivedPowerChange)
+            self._receptionCallback = None
+            if self._interferenceEngine is not None:
+                self._interferenceEngine.removeListener(self._receiverIndex)
             self._resetBitErrorCounter()
+            self._powerTimeline = []
             self._receiving = False
             self._nReceivingFinished.trigger()
                 
-    def _decide(self, bitErrorSum, totalBits, mcs, logSubject = "Data") -> bool:
+    def _decide(self, bitErrorSum, totalBits, mcs, logSubject = "Data", t: Transmission = None) -> bool:
         """
         Returns ``True`` if `bitErrorSum` errors can be corrected for
-        `totalBits` transmitted bits when applying `mcs`
+        `totalBits` transmitted bits when applying `mcs`. If `t` is provided,
+        the decision is recorded by the active trace recorder.
         """
         bitErrorSum = round(bitErrorSum)
         bitErrorRate = bitErrorSum / totalBits
         maxCorrectableBer = mcs.maxCorrectableBer()
-        if bitErrorRate <= maxCorrectableBer:
-            logger.info("Decider: {} successfully received "
-                            "(bit error rate: {:.3%})".format(logSubject, bitErrorRate), sender=self)
-            return True
+        success = bitErrorRate <= maxCorrectableBer
+        if success:
+            logger.info("Decider: %s successfully received (bit error rate: %.3f%%)",
+                            logSubject, 100 * bitErrorRate, sender=self)
         else:
-            logger.info("Decider: {} received with uncorectable errors "
-                            "(bit error rate: {:.3%}, max. correctable "
-                            "bit error rate: {:.3%})!".format(logSubject,
-                            bitErrorRate, maxCorrectableBer), sender=self)
-            return False
+            logger.info("Decider: %s received with uncorectable errors "
+                            "(bit error rate: %.3f%%, max. correctable "
+                            "bit error rate: %.3f%%)!", logSubject,
+                            100 * bitErrorRate, 100 * maxCorrectableBer, sender=self)
+        recorder = SimMan.traceRecorder
+        if recorder is not None and t is not None:
+            recorder.recordReception(self.device, t, logSubject, success, bitErrorRate, mcs)
+        return success
         
 
+class LinkLevelPhy(Module):
+    """
+    A physical layer implementation that can be used as a faster replacement
+    for :class:`SimplePhy`, providing the same `mac` port. Instead of
+    simulating the reception of header and payload bits, the reception of a
+    transmission is decided when the transmission starts: The SINR at that
+    point in time (considering all transmissions that are active by then,
+    including the ones starting simultaneously) is used to look up packet
+    error rates from the
+    :attr:`~gymwipe.networking.physical.Mcs.packetErrorRateTable` of the
+    transmission's header and payload MCS. Successfully received packets are
+    sent via the `macOut` gate when the transmission completes.
+
+    Transmissions that start during a reception are not considered for that
+    reception's decision. Unlike :class:`SimplePhy`, a LinkLevelPhy does not
+    lock onto a single reception: Each overlapping transmission is decided
+    on its own, so several packets may be sent via the `macOut` gate if
+    their transmissions overlap. The `macIn` gate accepts the same messages
+    as the `macIn` gate of :class:`SimplePhy`.
+
+    Reception decisions are drawn from the LinkLevelPhy's own
+    :class:`random.Random` instance (:attr:`rng`), which can be seeded via
+    :meth:`seed`.
+    """
+
+    NOISE_POWER_DENSITY = SimplePhy.NOISE_POWER_DENSITY
+    """float: The receiver's noise power density in Watts/Hertz"""
+
+    @GateListener.setup
+    def __init__(self, name: str, device: Device, frequencyBand: FrequencyBand,
+                 rng: random.Random = None):
+        """
+        Args:
+            name: The layer's name
+            device: The device that operates the LinkLevelPhy layer
+            frequencyBand: The frequency band to be used
+            rng: The random number generator to draw reception decisions
+                from. Defaults to a new :class:`random.Random` instance.
+        """
+        super(LinkLevelPhy, self).__init__(name, owner=device)
+        self.device = device
+        self.frequencyBand = frequencyBand
+        self._addPort("mac")
+
+        self.rng = rng if rng is not None else random.Random()
+        """random.Random: The random number generator that reception decisions are drawn from"""
+
+        # Attributes related to sending
+        self._transmitting = False
+        self._currentTransmission = None
+
+        # Attributes related to receiving
+        self._pendingReceptions = 0
+        self._nReceivingFinished = Notifier("Finished receiving", self)
+        # thermal noise power in mW
+        self._thermalNoisePower = self.NOISE_POWER_DENSITY * frequencyBand.spec.bandwidth * 1000
+
+        self._interferenceEngine = frequencyBand.interferenceEngine
+        if self._interferenceEngine is not None:
+            self._receiverIndex = self._interferenceEngine.addReceiver(device)
+
+        self.frequencyBand.nNewTransmission.subscribeCallback(self._onNewTransmission)
+        logger.info("Initialized %s with noise power %s dBm", self, milliwattsToDbm(self._thermalNoisePower))
+
+    @property
+    def _receiving(self) -> bool:
+        return self._pendingReceptions > 0
+
+    def seed(self, seed=None):
+        """
+        Seeds the random number generator that reception decisions are drawn
+        from.
+
+        Args:
+            seed: The seed to be passed to :meth:`random.Random.seed`
+        """
+        self.rng.seed(seed)
+
+    def reset(self):
+        """
+        Resets the physical layer to its initial state after a
+        :meth:`~gymwipe.simtools.SimulationManager.reset`, discarding pending
+        receptions.
+        """
+        super(LinkLevelPhy, self).reset()
+        self._transmitting = False
+        self._currentTransmission = None
+        self._pendingReceptions = 0
+        self._nReceivingFinished.reset()
+
+    def _getSinr(self, t: Transmission) -> float:
+        """
+        Returns the current SINR in dB for the transmission `t`.
+        """
+        if self._interferenceEngine is not None:
+            signalPower = self._interferenceEngine.getReceivedPower(self._receiverIndex, t)
+            totalPower = self._interferenceEngine.getTotalReceivedPower(self._receiverIndex)
+        else:
+            signalPower = 0.0
+            totalPower = 0.0
+            for other in self.frequencyBand.getActiveTransmissions():
+                power = dbmToMilliwatts(other.power - self.frequencyBand.getAttenuation(self.device, other.sender))
+                totalPower += power
+                if other is t:
+                    signalPower = power
+        noisePower = self._thermalNoisePower + totalPower - signalPower
+        return milliwattsToDbm(signalPower) - milliwattsToDbm(noisePower)
+
+    def _onNewTransmission(self, t: Transmission):
+        """
+        Is called whenever a transmission starts
+        """
+        if self._transmitting or t.sender is self.device:
+            return
+        self._pendingReceptions += 1
+        # Decide after all transmissions starting at the current simulation
+        # time have been announced, so that they are considered as interference
+        SimMan.timeout(0).callbacks.append(lambda event: self._decide(t))
+
+    def _decide(self, t: Transmission):
+        """
+        Decides whether the transmission `t` will be received and schedules
+        its delivery to the `macOut` gate
+        """
+        sinr = self._getSinr(t)
+        headerErrorRate = t.mcsHeader.getPacketErrorRate(sinr, t.packet.header.bitSize)
+        payloadErrorRate = t.mcsPayload.getPacketErrorRate(sinr, t.packet.payload.bitSize)
+        successProbability = (1 - headerErrorRate) * (1 - payloadErrorRate)
+        if successProbability >= 1:
+            success = True
+        elif successProbability <= 0:
+            success = False
+        else:
+            success = self.rng.random() < successProbability
+        logger.info("Sensed %s at %.2f dB SINR, success probability: %.3f",
+                        t, sinr, successProbability, sender=self)
+        recorder = SimMan.traceRecorder
+        if recorder is not None:
+            recorder.recordReception(self.device, t, "Packet", success, 1 - successProbability,
+                                     t.mcsPayload, sinr)
+
+        def onCompletion(event: Event):
+            if success:
+                self.gates["macOut"].send(t.packet)
+            else:
+                logger.info("Receiving %s failed", t, sender=self)
+            self._pendingReceptions -= 1
+            if self._pendingReceptions == 0:
+                self._nReceivingFinished.trigger()
+        t.eCompletes.callbacks.append(onCompletion)
+
+    @GateListener("macIn", Message, queued=True)
+    def macInHandler(self, cmd):
+        p = cmd.args
+
+        if cmd.type is StackMessageTypes.SEND:
+            logger.info("Received SEND command", sender=self)
+            # If the receiver is active, wait until it is inactive again
+            if self._receiving:
+                yield self._nReceivingFinished.event
+
+            self._transmitting = True
+            # Wait for the beginning of the next time slot
+            yield SimMan.nextTimeSlot(TIME_SLOT_LENGTH)
+            # Simulate transmitting
+            t = self.frequencyBand.transmit(self.device, p["power"],  p["packet"], p["mcs"], p["mcs"])
+            self._currentTransmission = t
+            # Wait for the transmission to finish
+            yield t.eCompletes
+            self._transmitting = False
+            # Indicate that the send command was processed
+            cmd.setProcessed()
+
 class SimpleMac(Module):
     """
     A MAC layer implementation of the contention-free protocol described as
@@ -359,7 +783,7 @@ class SimpleMac(Module):
         self._addPort("network")
         self.addr = addr
         self._packetQueue = deque(maxlen=100) # allow 100 packets to be queued
-        self._packetAddedEvent = Event(SimMan.env)
+        self._packetAddedEvent = SimMan.event()
         self._mcs = BpskMcs(frequencyBandSpec)
         self._transmissionPower = 0.0 # dBm
         self._receiving = False
@@ -382,6 +806,21 @@ class SimpleMac(Module):
         addr = bytearray(6)
         addr[5] = cls._macCounter
         return bytes(addr)
+
+    def reset(self):
+        """
+        Resets the MAC layer to its initial state after a
+        :meth:`~gymwipe.simtools.SimulationManager.reset`: The packet queue is
+        emptied and receive mode is left. The MAC address is kept.
+        """
+        super(SimpleMac, self).reset()
+        self._packetQueue.clear()
+        self._packetAddedEvent = SimMan.event()
+        if self._receiveTimeout is not None:
+            self._receiveTimeout.cancel()
+        self._receiving = False
+        self._receiveCmd = None
+        self._receiveTimeout = None
     
     @GateListener("phyIn", Packet)
     def phyInHandler(self, packet):
@@ -423,6 +862,7 @@ class SimpleMac(Module):
                                 # TODO This has to be done before adding the
                                 # packet to the queue!
                                 packet = self._packetQueue.popleft()
+                                self._recordQueueLength()
                                 message = Message(StackMessageTypes.SEND, {
                                     "packet": packet,
                                     "power": self._transmissionPower,
@@ -455,10 +895,11 @@ class SimpleMac(Module):
                 logger.debug("%s: Entering receive mode.", self)
                 # start receiving
                 self._receiveCmd = cmd
-                # set _receiving and a timeout event
+                # set _receiving and a cancellable timeout timer
                 self._receiving = True
-                self._receiveTimeout = SimMan.timeout(cmd.args["duration"])
-                self._receiveTimeout.callbacks.append(self._receiveTimeoutCallback)
+                if self._receiveTimeout is not None:
+                    self._receiveTimeout.cancel()
+                self._receiveTimeout = SimMan.setTimer(cmd.args["duration"], self._receiveTimeoutCallback)
 
         elif isinstance(cmd, Packet):
             payload = cmd
@@ -467,18 +908,25 @@ class SimpleMac(Module):
                 payload
             )
             self._packetQueue.append(packet)
+            self._recordQueueLength()
             self._packetAddedEvent.succeed()
-            self._packetAddedEvent = Event(SimMan.env)
+            self._packetAddedEvent = SimMan.event()
     
-    def _receiveTimeoutCallback(self, event: Event):
-        if event is self._receiveTimeout:
-            # the current receive message has timed out
-            logger.debug("%s: Receive timed out.", self)
-            self._receiveCmd.setProcessed()
-            self._stopReceiving()
+    def _recordQueueLength(self):
+        recorder = SimMan.traceRecorder
+        if recorder is not None:
+            recorder.recordQueueLength(self._owner, self.addr, len(self._packetQueue))
+
+    def _receiveTimeoutCallback(self, value: Any):
+        # the current receive message has timed out
+        logger.debug("%s: Receive timed out.", self)
+        self._receiveCmd.setProcessed()
+        self._stopReceiving()
     
     def _stopReceiving(self):
         logger.debug("%s: Stopping to receive.", self)
+        # Cancel the timeout timer (if it has not fired)
+        self._receiveTimeout.cancel()
         self._receiveCmd = None
         self._receiving = False
         self._receiveTimeout = None
@@ -523,6 +971,15 @@ class SimpleRrmMac(Module):
         self._nAnnouncementReceived.subscribeProcess(self._sendAnnouncement, queued=True)
         
         logger.debug("%s: Initialization completed, MAC address: %s", self, self.addr)
+
+    def reset(self):
+        """
+        Resets the MAC layer to its initial state after a
+        :meth:`~gymwipe.simtools.SimulationManager.reset`, discarding queued
+        assignments.
+        """
+        super(SimpleRrmMac, self).reset()
+        self._nAnnouncementReceived.reset()
     
     @GateListener("phyIn", Packet)
     def phyInHandler(self, packet: Packet):
@@ -553,6 +1010,9 @@ class SimpleRrmMac(Module):
             }
         )
         logger.debug("%s: Sending announcement: %s", self, announcement)
+        recorder = SimMan.traceRecorder
+        if recorder is not None:
+            recorder.recordAssignment(self._owner, destination, duration)
         self.gates["phyOut"].send(sendCmd)
         yield sendCmd.eProcessed
         yield SimMan.timeout((duration+1)*TIME_SLOT_LENGTH) # one extra time slot to prevent collisions
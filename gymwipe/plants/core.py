@@ -40,13 +40,16 @@ class OdePlant(Plant):
         Performs an ODE time step to update the plant's state according to the
         current simulation time.
         """
-        now = SimMan.now
-        # Rounding difference to nanoseconds to prevent strange ODE behavior
-        difference = round(now - self._lastUpdateSimTime, 9)
+        if SimMan.ticksPerSecond is not None:
+            # Tick differences are exact
+            difference = SimMan.ticksToSeconds(SimMan.nowTicks - SimMan.secondsToTicks(self._lastUpdateSimTime))
+        else:
+            # Rounding difference to nanoseconds to prevent strange ODE behavior
+            difference = round(SimMan.now - self._lastUpdateSimTime, 9)
         
         if difference > 0:
             self.world.step(difference)
-            self._lastUpdateSimTime = now
+            self._lastUpdateSimTime = SimMan.now
     
     def _stateUpdater(self):
         """
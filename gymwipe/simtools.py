@@ -1,17 +1,23 @@
 """
 Module for simulation tools
 """
-import itertools
 import logging
-from collections import defaultdict, deque
+import sys
+import threading
+import weakref
+from collections import deque, namedtuple
+from heapq import heapify, heappop, heappush
 from numbers import Number
-from typing import (Any, Callable, DefaultDict, Dict, Generator, List, Set,
+from time import perf_counter
+from typing import (Any, Callable, Deque, Dict, Generator, List, TextIO,
                     Tuple, Union)
 
 from simpy import Environment
-from simpy.events import Event, Process
+from simpy.core import NORMAL
+from simpy.events import Event, Process, Timeout
 from simpy.rt import RealtimeEnvironment
 
+from gymwipe.kernel import LightEnvironment
 from gymwipe.utility import ownerPrefix
 
 
@@ -20,26 +26,122 @@ class SimulationManager:
     The :class:`SimulationManager` offers methods and properties for managing
     and accessing a SimPy simulation.
 
-    Note:
-        Do not create instances on your own. Reference the existing instance by
-        :attr:`SimMan` instead.
+    By default, simulated time is represented by floats measuring seconds.
+    Alternatively, :meth:`init` can set up an integer-tick clock: The SimPy
+    environment then counts integer ticks of a fixed length, so that event
+    times, slot boundaries, and heap comparisons are exact integer operations
+    that do not suffer from floating point drift. The :class:`SimulationManager`
+    API keeps accepting and returning seconds in both modes; durations are
+    rounded to the nearest tick. :meth:`secondsToTicks` and
+    :meth:`ticksToSeconds` convert between both representations.
+
+    Every :class:`SimulationManager` holds an independent simulation, so
+    multiple simulations can exist in a single process. The manager that is
+    used by all simulation components (devices, frequency bands, modules,
+    messages, etc.) is the *current* one: Within a ``with manager:`` block, it
+    is `manager`, otherwise it is a default manager that exists for the whole
+    process. Simulation components are bound to the simulation they are
+    created in, so a simulation that is not run by the default manager has
+    to be constructed and run within ``with`` blocks of its manager:
+
+    .. code-block:: python
+
+        manager = SimulationManager()
+        with manager:
+            manager.init()
+            device = SimpleNetworkDevice("Device", 0, 0, FrequencyBand([FsplAttenuation]))
+        ...
+        with manager:
+            manager.runSimulation(1)
+
+    :attr:`SimMan` always refers to the current manager. The current manager is
+    thread-local, so every thread has its own current manager.
+    """
+
+    KERNELS = {"simpy": Environment, "light": LightEnvironment}
+    """
+    Dict[str, type]: The event kernels that :meth:`init` can create, by name
+    """
+
+    defaultKernel = "simpy"
+    """
+    str: The name of the event kernel (see :attr:`KERNELS`) that :meth:`init`
+    uses if no kernel is specified. It is not reset by :meth:`init`. Set it on
+    the :class:`SimulationManager` class to change it for all managers.
     """
     
     def __init__(self):
+        self._previousManagers = []
         self._env = None
+        self._timers = None
+        self._ticksPerSecond = None
+
+        self.traceRecorder = None
+        """
+        The :class:`~gymwipe.tracing.TraceRecorder` that simulation events are
+        recorded with, or ``None`` if no events are recorded. It is not reset
+        by :meth:`init`, but :meth:`init` and :meth:`reset` make it start a new
+        episode (see :meth:`~gymwipe.tracing.TraceRecorder.newEpisode`).
+        """
+
+        self.profiler = None
+        """
+        The :class:`ProcessProfiler` that measures the processes registered via
+        :meth:`process`, or ``None`` if processes are not profiled. It is not
+        reset by :meth:`init`.
+        """
+
+        self.kernelStatistics = None
+        """
+        The :class:`KernelStatistics` object that collects statistics on the
+        events of the SimPy environment, or ``None`` if no statistics are
+        collected. It is not reset by :meth:`init`.
+        """
+
+        self.coalesceTimeouts = False
+        """
+        bool: If set to ``True``, :meth:`nextTimeSlot` and :meth:`timeoutUntil`
+        calls for the same absolute simulated time (and without a value)
+        return the same shared timeout event instead of creating a timeout
+        event per call. With many processes waiting for the same time slot
+        boundary, this saves the corresponding heap operations. Note that all
+        waiters of a shared event are resumed when the first of them would have
+        been resumed, which may change the order of simultaneous events
+        compared to private timeouts. It is not reset by :meth:`init`.
+        """
+
+        self._sharedTimeouts: Dict[float, Event] = {}
     
     @property
     def env(self):
         """
         The SimPy :class:`~simpy.core.Environment` object belonging to the
-        current simulation
+        current simulation. When it is replaced, the :attr:`timers` are
+        recreated for the new environment and the :attr:`kernelStatistics` (if
+        set) are attached to it.
         """
         return self._env
 
     @env.setter
     def env(self, environment):
         logger.debug("SimulationManager: Setting environment")
-        self.env = environment
+        self._env = environment
+        # Timers and shared timeouts are bound to the environment
+        self._timers = TimerService(environment)
+        self._sharedTimeouts = {}
+        if self.kernelStatistics is not None:
+            self.kernelStatistics.attach(environment)
+
+    def __enter__(self):
+        self._previousManagers.append(_current.manager)
+        _current.manager = self
+        return self
+
+    def __exit__(self, *exc):
+        _current.manager = self._previousManagers.pop()
+
+    def __repr__(self):
+        return "SimulationManager(env={})".format(self._env)
     
     def nextTimeSlot(self, timeSlotLength: float) -> Event:
         """
@@ -50,21 +152,75 @@ class SimulationManager:
         Args:
             timeSlotLength: The time slot length in seconds
         """
-        return self.timeout(timeSlotLength - (self.now % timeSlotLength))
+        now = self.env.now
+        if self._ticksPerSecond is not None:
+            # Exact integer slot arithmetic
+            slotTicks = self.secondsToTicks(timeSlotLength)
+            delay = slotTicks - now % slotTicks
+            if self.coalesceTimeouts:
+                return self._sharedTimeout(now + delay, delay)
+            return self.env.timeout(delay)
+        if self.coalesceTimeouts:
+            # Computing the boundary via floor division yields the same value
+            # for all times within a slot
+            boundary = (now // timeSlotLength + 1) * timeSlotLength
+            return self._sharedTimeout(boundary, max(boundary - now, 0))
+        return self.timeout(timeSlotLength - (now % timeSlotLength))
+
+    @property
+    def now(self) -> float:
+        """float: The current simulated time in seconds"""
+        if self._ticksPerSecond is not None:
+            return self.env.now / self._ticksPerSecond
+        return self.env.now
 
     @property
-    def now(self):
-        """int: The current simulation time step"""
+    def nowTicks(self) -> Union[int, float]:
+        """
+        The current simulated time in ticks (which equals :attr:`now` if no
+        integer-tick clock is used)
+        """
         return self.env.now
 
-    def process(self, generator: Generator[Event, None, None]) -> Process:
+    @property
+    def ticksPerSecond(self) -> int:
+        """
+        int: The number of ticks per simulated second, ``None`` if no
+        integer-tick clock is used
+        """
+        return self._ticksPerSecond
+
+    def secondsToTicks(self, seconds: float) -> Union[int, float]:
+        """
+        Converts `seconds` to the nearest number of ticks. If no integer-tick
+        clock is used, `seconds` is returned unchanged.
+        """
+        if self._ticksPerSecond is None:
+            return seconds
+        return int(round(seconds * self._ticksPerSecond))
+
+    def ticksToSeconds(self, ticks: Union[int, float]) -> float:
+        """
+        Converts `ticks` to seconds. If no integer-tick clock is used, `ticks`
+        is returned unchanged.
+        """
+        if self._ticksPerSecond is None:
+            return ticks
+        return ticks / self._ticksPerSecond
+
+    def process(self, generator: Generator[Event, None, None], origin: Any = None) -> Process:
         """
         Registers a SimPy process generator (a generator yielding SimPy events)
         at the SimPy environment and returns it.
 
         Args:
             process: The generator to be registered as a process
+            origin: An optional object that caused the process to be started
+                (like a :class:`Notifier`), used to attribute the results of
+                the :attr:`profiler`
         """
+        if self.profiler is not None:
+            generator = self.profiler.wrap(generator, origin)
         return self.env.process(generator)
 
     def event(self):
@@ -84,20 +240,70 @@ class SimulationManager:
         logger.info("SimulationManager: Running simulation...")
         if not isinstance(until, Event):
             assert isinstance(until, Number)
-            until = self.now + until
+            until = self.env.now + self.secondsToTicks(until)
         self.env.run(until)
     
-    def init(self):
+    def init(self, ticksPerSecond: int = None, kernel: str = None):
         """
-        Creates a new :class:`~simpy.core.Environment`.
+        Creates a new :class:`~simpy.core.Environment` (and attaches the
+        :attr:`kernelStatistics` to it, if set).
+
+        Args:
+            ticksPerSecond: If provided, an integer-tick clock with
+                `ticksPerSecond` ticks per simulated second is used (e.g.
+                ``10**9`` for nanosecond ticks). Otherwise, simulated time is
+                measured in seconds.
+            kernel: The event kernel to be used: ``"simpy"`` for SimPy's
+                :class:`~simpy.core.Environment` or ``"light"`` for the
+                :class:`~gymwipe.kernel.LightEnvironment`. Defaults to
+                :attr:`defaultKernel`.
+
+        Raises:
+            ValueError: If `ticksPerSecond` is not a positive integer or
+                `kernel` is unknown
         """
         logger.debug("SimulationManager: Initializing environment")
-        self._env = Environment()
-    
+        if ticksPerSecond is not None and (not isinstance(ticksPerSecond, int) or ticksPerSecond < 1):
+            raise ValueError("ticksPerSecond has to be a positive integer, got {}".format(ticksPerSecond))
+        if kernel is None:
+            kernel = self.defaultKernel
+        if kernel not in self.KERNELS:
+            raise ValueError("Unknown kernel {!r}, has to be one of {}".format(kernel, list(self.KERNELS)))
+        self._ticksPerSecond = ticksPerSecond
+        self.env = self.KERNELS[kernel]()
+        if self.traceRecorder is not None:
+            self.traceRecorder.newEpisode()
+
+    def reset(self):
+        """
+        Rewinds the current simulation to its initial state: All scheduled
+        events, pending timers, and shared timeouts are discarded and the
+        simulation continues in a new environment of the same type, starting
+        at time 0. Unlike :meth:`init`, the clock mode is kept, and so are the
+        simulation components that have been created for the previous
+        environment. The :attr:`kernelStatistics` are attached to the new
+        environment, so that periodic snapshots are scheduled relative to the
+        rewound clock.
+
+        Note:
+            Processes that were running are discarded with their events. The
+            simulation components have to be reset themselves (see
+            :meth:`Notifier.reset`) and restart their processes.
+        """
+        logger.debug("SimulationManager: Resetting environment")
+        # Cancel the timers of the previous environment
+        self._timers.reset()
+        self.env = type(self._env)()
+        if self.traceRecorder is not None:
+            self.traceRecorder.newEpisode()
+
     def timeout(self, duration: float, value: Any = None) -> Event:
         """
-        Shorthand for env.timeout(duration, value)
+        Shorthand for env.timeout(duration, value), with `duration` being
+        converted to ticks if an integer-tick clock is used
         """
+        if self._ticksPerSecond is not None:
+            duration = int(round(duration * self._ticksPerSecond))
         return self.env.timeout(duration, value)
     
     def timeoutUntil(self, triggerTime: float, value: Any = None) -> Event:
@@ -109,30 +315,643 @@ class SimulationManager:
             triggerTime: When to trigger the :class:`~simpy.events.Event`
             value: The value to call :meth:`~simpy.events.Event.succeed` with
         """
-        now = self.now
+        now = self.env.now
+        triggerTime = self.secondsToTicks(triggerTime)
         if triggerTime > now:
-            return self.timeout(triggerTime-now, value)
+            delay = triggerTime - now
         else:
-            return self.timeout(0, value)
+            triggerTime, delay = now, 0
+        if self.coalesceTimeouts and value is None:
+            return self._sharedTimeout(triggerTime, delay)
+        return self.env.timeout(delay, value)
+
+    def _sharedTimeout(self, triggerTime: float, delay: float) -> Event:
+        """
+        Returns the shared timeout event for `triggerTime`, creating it with
+        `delay` if there is none yet (both in environment time units)
+        """
+        event = self._sharedTimeouts.get(triggerTime)
+        if event is None:
+            event = self.env.timeout(delay)
+            self._sharedTimeouts[triggerTime] = event
+            event.callbacks.append(lambda e: self._sharedTimeouts.pop(triggerTime, None))
+        return event
     
-    def triggerAfterTimeout(self, event: Event, timeout: float, value: Any = None):
+    def triggerAfterTimeout(self, event: Event, timeout: float, value: Any = None) -> "Timer":
         """
         Calls :meth:`~simpy.events.Event.succeed` on the `event` after the
-        simulated time specified in `timeout` has passed. If the event has
-        already been triggered by then, no action is taken.
+        simulated time specified in `timeout` has passed. If the event is
+        triggered earlier, the underlying timer is cancelled.
+
+        Returns:
+            The :class:`Timer` that triggers the event
         """
-        def callback(caller):
+        def callback(value):
             if not event.triggered:
                 event.succeed(value)
-        timeoutEvent = self.timeout(timeout)
-        timeoutEvent.callbacks.append(callback)
+        timer = self.setTimer(timeout, callback, value)
+        if event.callbacks is not None:
+            event.callbacks.append(lambda e: timer.cancel())
+        return timer
+
+    @property
+    def timers(self) -> "TimerService":
+        """
+        TimerService: The :class:`TimerService` of the current environment
+        """
+        return self._timers
+
+    def setTimer(self, delay: float, callback: Callable[[Any], None] = None, value: Any = None) -> "Timer":
+        """
+        Shorthand for :meth:`TimerService.setTimer` on :attr:`timers`: Returns a
+        cancellable :class:`Timer` that calls `callback` with `value` after
+        `delay` seconds of simulated time.
+        """
+        return self._timers.setTimer(self.secondsToTicks(delay), callback, value)
+
+_defaultManager = SimulationManager()
 
-SimMan = SimulationManager()
+class _CurrentManager(threading.local):
+    """
+    Holds the current :class:`SimulationManager` of every thread
+    """
+
+    def __init__(self):
+        self.manager = _defaultManager
+
+_current = _CurrentManager()
+
+def currentSimulationManager() -> SimulationManager:
+    """
+    Returns the current :class:`SimulationManager` (see
+    :class:`SimulationManager` for details)
+    """
+    return _current.manager
+
+class _SimulationManagerProxy:
+    """
+    Forwards all attribute accesses to the current :class:`SimulationManager`
+    """
+
+    __slots__ = ()
+
+    def __getattr__(self, name: str):
+        return getattr(_current.manager, name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(_current.manager, name, value)
+
+    def __repr__(self):
+        return "SimMan({})".format(_current.manager)
+
+def _forwardingProperty(name: str) -> property:
+    # A property forwarding attribute `name` to the current manager
+    def getter(proxy):
+        return getattr(_current.manager, name)
+    def setter(proxy, value):
+        setattr(_current.manager, name, value)
+    return property(getter, setter)
+
+# Forwarding public attributes via properties avoids the comparatively
+# expensive __getattr__ fallback for frequently used attributes
+for _name in set(vars(SimulationManager)) | set(vars(_defaultManager)):
+    if not _name.startswith("_"):
+        setattr(_SimulationManagerProxy, _name, _forwardingProperty(_name))
+
+SimMan: SimulationManager = _SimulationManagerProxy()
 """
-A globally accessible :class:`SimulationManager` instance to be used whenever the
-SimPy simulation is involved
+A globally accessible proxy for the current :class:`SimulationManager` to be
+used whenever the SimPy simulation is involved
 """
 
+class Timer:
+    """
+    A cancellable timer created by a :class:`TimerService`. Do not create
+    instances on your own, use :meth:`SimulationManager.setTimer` instead.
+    """
+
+    __slots__ = ("time", "callback", "value", "cancelled", "fired", "_event", "_service")
+
+    def __init__(self, service: "TimerService", time: float, callback: Callable[[Any], None], value: Any):
+        self.time = time
+        """float: The simulated time at which the timer fires (in environment time units)"""
+        self.callback = callback
+        self.value = value
+        self.cancelled = False
+        """bool: Whether the timer has been cancelled"""
+        self.fired = False
+        """bool: Whether the timer has fired"""
+        self._event = None
+        self._service = service
+
+    def __repr__(self):
+        return "Timer(time: {})".format(self.time)
+
+    @property
+    def pending(self) -> bool:
+        """bool: ``True`` if the timer has neither fired nor been cancelled"""
+        return not (self.fired or self.cancelled)
+
+    @property
+    def event(self) -> Event:
+        """
+        :class:`~simpy.events.Event`: An event that succeeds with the timer's
+        value when the timer fires (created on first access). Processes can
+        yield it like a timeout event; if the timer is cancelled, the event is
+        never triggered.
+        """
+        if self._event is None:
+            self._event = Event(self._service._env)
+            if self.fired:
+                self._event.succeed(self.value)
+        return self._event
+
+    def cancel(self):
+        """
+        Cancels the timer. Cancelling a timer that has already fired or been
+        cancelled has no effect.
+        """
+        if self.pending:
+            self.cancelled = True
+            self._service._onCancel()
+
+class TimerService:
+    """
+    Manages cancellable timers for a SimPy environment. SimPy timeouts cannot
+    be removed from the event heap once they have been created, so timeouts
+    that nobody waits for anymore (like the timeout of a receive call that has
+    already succeeded) occupy memory and cost heap operations until their
+    time has come. The timer service instead keeps its timers in a heap of its
+    own and only schedules a single SimPy timeout for the earliest pending
+    timer. Cancelled timers are deleted lazily: they are skipped when they
+    reach the top of the heap, and the heap is compacted whenever more than
+    half of its entries are cancelled timers.
+
+    Timers that are due at the same simulated time fire in the order of their
+    creation, at the moment the service's SimPy timeout for that time is
+    processed.
+    """
+
+    COMPACTION_MIN_SIZE = 64
+    """
+    int: The minimum heap size for compaction to happen
+    """
+
+    def __init__(self, env: Environment):
+        self._env = env
+        self._heap: List[Tuple[float, int, Timer]] = []
+        self._timerCounter = 0
+        self._cancelledCount = 0
+        self._wakeup: Event = None
+        self._wakeupTime = float("inf")
+
+    def __len__(self):
+        """Returns the number of pending timers"""
+        return len(self._heap) - self._cancelledCount
+
+    @property
+    def heapSize(self) -> int:
+        """int: The number of heap entries, including cancelled timers that have not been deleted yet"""
+        return len(self._heap)
+
+    def setTimer(self, delay: float, callback: Callable[[Any], None] = None, value: Any = None) -> Timer:
+        """
+        Creates and returns a :class:`Timer` that fires after `delay` time units
+        of the environment (seconds, or ticks if an integer-tick clock is used),
+        calling `callback` with `value` (if `callback` is provided) and
+        triggering the timer's :attr:`~Timer.event` (if it has been accessed).
+
+        Raises:
+            ValueError: If `delay` is negative
+        """
+        if delay < 0:
+            raise ValueError("Negative delay {}".format(delay))
+        time = self._env.now + delay
+        timer = Timer(self, time, callback, value)
+        heappush(self._heap, (time, self._timerCounter, timer))
+        self._timerCounter += 1
+        if time < self._wakeupTime:
+            self._scheduleWakeup(time)
+        return timer
+
+    def _scheduleWakeup(self, time: float):
+        # A previously scheduled wakeup timeout is ignored when processed
+        self._wakeupTime = time
+        self._wakeup = self._env.timeout(time - self._env.now)
+        self._wakeup.callbacks.append(self._onWakeup)
+
+    def _onWakeup(self, event: Event):
+        if event is not self._wakeup:
+            return
+        self._wakeup = None
+        self._wakeupTime = float("inf")
+        now = self._env.now
+        # Callbacks may cancel timers and thereby make compact() replace the
+        # heap, so self._heap is read again for every timer
+        while len(self._heap) > 0 and self._heap[0][0] <= now:
+            timer = heappop(self._heap)[2]
+            if timer.cancelled:
+                self._cancelledCount -= 1
+                continue
+            if timer.fired:
+                continue
+            timer.fired = True
+            if timer.callback is not None:
+                timer.callback(timer.value)
+            if timer._event is not None:
+                timer._event.succeed(timer.value)
+        # Callbacks may have scheduled a wakeup for a later timer already
+        heap = self._heap
+        if len(heap) > 0 and heap[0][0] < self._wakeupTime:
+            self._scheduleWakeup(heap[0][0])
+
+    def reset(self):
+        """
+        Discards all pending timers without firing them.
+        """
+        for _, _, timer in self._heap:
+            timer.cancelled = True
+        self._heap = []
+        self._cancelledCount = 0
+        self._wakeup = None
+        self._wakeupTime = float("inf")
+
+    def _onCancel(self):
+        self._cancelledCount += 1
+        if self._cancelledCount * 2 > len(self._heap) and len(self._heap) >= self.COMPACTION_MIN_SIZE:
+            self.compact()
+
+    def compact(self):
+        """
+        Removes all cancelled timers from the heap.
+        """
+        self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+        heapify(self._heap)
+        self._cancelledCount = 0
+
+class ProcessProfiler:
+    """
+    An opt-in profiler measuring the wall time that is spent in SimPy
+    processes. Every process registered via :meth:`SimulationManager.process`
+    (including those started by :meth:`Notifier.subscribeProcess`) while the
+    profiler is active is wrapped, so that the time taken by each resume step
+    of its generator is measured. Measurements are grouped by the owner of the
+    generator (the object its generator function is bound to, or the module
+    it is defined in), the object that started the process (e.g. a
+    :class:`Notifier`), and the generator function.
+
+    When the profiler is stopped (e.g. at the end of a ``with`` block), a
+    table of the generator functions and owners sorted by their total time is
+    written to `stream`, and, if `collapsedStackPath` is provided, the
+    measurements are written to that file in the collapsed stack format that
+    flame graph tools (like ``flamegraph.pl`` or speedscope) read.
+
+    Example:
+
+        .. code-block:: python
+
+            with ProcessProfiler("simulation.folded"):
+                SimMan.runSimulation(10)
+
+    Args:
+        collapsedStackPath: The path of the collapsed stack file to be written
+        stream: The stream to write the report table to, ``None`` for no table
+        limit: The maximum number of rows per report table
+    """
+
+    def __init__(self, collapsedStackPath: str = None, stream: TextIO = sys.stderr, limit: int = 20):
+        self.collapsedStackPath = collapsedStackPath
+        self.stream = stream
+        self.limit = limit
+        # maps (owner, origin, function) tuples to [steps, total time, max. step time] lists
+        self._stats: Dict[Tuple[str, str, str], List] = {}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        """
+        Makes the profiler the :attr:`~SimulationManager.profiler` of the
+        :attr:`SimMan`, so that processes registered from now on are profiled.
+        """
+        SimMan.profiler = self
+
+    def stop(self):
+        """
+        Stops profiling new processes and creates the :meth:`report` if the
+        profiler is the active one. Processes that have been wrapped before are
+        still measured.
+        """
+        if SimMan.profiler is self:
+            SimMan.profiler = None
+            self.report()
+
+    def wrap(self, generator: Generator[Event, Any, Any], origin: Any = None) -> Generator[Event, Any, Any]:
+        """
+        Returns a generator that behaves like `generator` and measures the time
+        taken by each of its resume steps.
+
+        Args:
+            generator: The generator to be wrapped
+            origin: The object that caused the process to be started
+        """
+        function = getattr(generator, "__qualname__", type(generator).__name__)
+        frame = getattr(generator, "gi_frame", None)
+        if frame is None:
+            owner = "<unknown>"
+        elif "self" in frame.f_locals:
+            owner = repr(frame.f_locals["self"])
+        else:
+            owner = frame.f_globals.get("__name__", "<unknown>")
+        key = (owner, "" if origin is None else repr(origin), function)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = [0, 0.0, 0.0]
+        return self._profiled(generator, stats)
+
+    @staticmethod
+    def _profiled(generator: Generator[Event, Any, Any], stats: List):
+        value = None
+        exception = None
+        while True:
+            startTime = perf_counter()
+            try:
+                if exception is None:
+                    event = generator.send(value)
+                else:
+                    event = generator.throw(exception)
+            except StopIteration as e:
+                duration = perf_counter() - startTime
+                stats[0] += 1
+                stats[1] += duration
+                stats[2] = max(stats[2], duration)
+                return e.value
+            duration = perf_counter() - startTime
+            stats[0] += 1
+            stats[1] += duration
+            stats[2] = max(stats[2], duration)
+            try:
+                value = yield event
+                exception = None
+            except BaseException as e:
+                # e.g. a SimPy Interrupt or a failed event
+                exception = e
+
+    def getStats(self, by: str = "function") -> List[Tuple[str, int, float, float]]:
+        """
+        Returns a list of (name, resume steps, total time, maximum step time)
+        tuples, sorted by the total time in descending order. Times are given
+        in seconds.
+
+        Args:
+            by: ``"function"`` for grouping the measurements by generator
+                function, ``"owner"`` for grouping them by generator owner
+
+        Raises:
+            ValueError: If `by` is invalid
+        """
+        if by not in ("function", "owner"):
+            raise ValueError("Invalid grouping: {}".format(by))
+        index = 2 if by == "function" else 0
+        groups: Dict[str, List] = {}
+        for key, (steps, total, maxStep) in self._stats.items():
+            group = groups.setdefault(key[index], [0, 0.0, 0.0])
+            group[0] += steps
+            group[1] += total
+            group[2] = max(group[2], maxStep)
+        return sorted(((name,) + tuple(group) for name, group in groups.items()),
+                        key=lambda row: row[2], reverse=True)
+
+    def table(self, by: str = "function") -> str:
+        """
+        Returns the result of :meth:`getStats` as a human-readable table
+        limited to :attr:`limit` rows.
+        """
+        rows = self.getStats(by)
+        totalTime = sum(row[2] for row in rows) or 1.0
+        lines = ["{:>10} {:>6} {:>10} {:>10} {:>10}  {}".format(
+                    "total [s]", "%", "steps", "mean [us]", "max [us]", by)]
+        for name, steps, total, maxStep in rows[:self.limit]:
+            lines.append("{:>10.4f} {:>6.1f} {:>10d} {:>10.2f} {:>10.2f}  {}".format(
+                total, 100 * total / totalTime, steps, 1e6 * total / max(steps, 1), 1e6 * maxStep, name))
+        return "\n".join(lines)
+
+    def writeCollapsedStacks(self, path: str):
+        """
+        Writes the measurements to `path` in the collapsed stack format, with
+        owner, origin (if any), and generator function as stack frames and
+        the total time in microseconds as the sample count.
+        """
+        with open(path, "w") as f:
+            for (owner, origin, function), (steps, total, maxStep) in sorted(self._stats.items()):
+                frames = [frame.replace(";", ",").replace(" ", "_") for frame in (owner, origin, function) if frame]
+                f.write("{} {}\n".format(";".join(frames), int(round(1e6 * total))))
+
+    def report(self):
+        """
+        Writes the report tables to :attr:`stream` and the collapsed stack file
+        to :attr:`collapsedStackPath` (if set).
+        """
+        if self.stream is not None:
+            self.stream.write("Process profile by generator function:\n{}\n\n"
+                              "Process profile by owner:\n{}\n".format(self.table("function"), self.table("owner")))
+        if self.collapsedStackPath is not None:
+            self.writeCollapsedStacks(self.collapsedStackPath)
+
+KernelSnapshot = namedtuple("KernelSnapshot", ["time", "scheduled", "processed", "heapSize",
+                                                "peakHeapSize", "staleTimeouts"])
+"""
+A snapshot of :class:`KernelStatistics` counters, taken at the simulated time
+`time` (in seconds). `scheduled` and `processed` are dictionaries mapping event type names
+to event counts.
+"""
+
+def _queueSize(env: Environment) -> int:
+    # The number of events that are scheduled in `env`
+    if isinstance(env, LightEnvironment):
+        return env.queueSize()
+    return len(env._queue)
+
+def _nextEvent(env: Environment) -> Event:
+    # The event that `env` will process next (None if there is none)
+    if isinstance(env, LightEnvironment):
+        return env.nextEvent()
+    return env._queue[0][3] if env._queue else None
+
+class KernelStatistics:
+    """
+    Collects statistics on the events of a SimPy environment: The number of
+    events scheduled and processed per event type, the current and peak size
+    of the event heap, and the number of stale timeouts. A
+    :class:`~simpy.events.Timeout` is considered stale if no callbacks are
+    left when it is processed, i.e. everything that has been waiting for it
+    (like a process or a condition event) has gone away in the meantime.
+    Stale timeouts occupy the heap without having any effect.
+
+    The statistics are collected by wrapping the `schedule` and `step`
+    methods of the environment they are attached to, so they do not add any
+    events themselves. Counters are cumulative across environments and can be
+    reset by calling :meth:`reset`.
+
+    If `snapshotInterval` is provided, a :class:`KernelSnapshot` is taken
+    whenever at least `snapshotInterval` simulated seconds have passed since
+    the previous one. Snapshots are appended to :attr:`snapshots` and
+    announced via :attr:`nSnapshots`, which allows to monitor long simulation
+    runs for heap bloat and event explosions.
+
+    Example:
+
+        .. code-block:: python
+
+            with KernelStatistics(snapshotInterval=60) as statistics:
+                statistics.nSnapshots.subscribeCallback(print)
+                SimMan.runSimulation(3600)
+
+    Args:
+        snapshotInterval: The simulated time in seconds between snapshots,
+            ``None`` for no periodic snapshots
+        historyLength: The maximum number of snapshots that are kept in
+            :attr:`snapshots`
+    """
+
+    def __init__(self, snapshotInterval: float = None, historyLength: int = 1000):
+        self.snapshotInterval = snapshotInterval
+
+        self.scheduled: Dict[str, int] = {}
+        """Dict[str, int]: A dictionary mapping event type names to the number of scheduled events"""
+
+        self.processed: Dict[str, int] = {}
+        """Dict[str, int]: A dictionary mapping event type names to the number of processed events"""
+
+        self.peakHeapSize = 0
+        """int: The maximum number of events that have been scheduled at once"""
+
+        self.staleTimeouts = 0
+        """int: The number of timeouts that have been processed without any callbacks"""
+
+        self.snapshots: Deque[KernelSnapshot] = deque(maxlen=historyLength)
+        """Deque[KernelSnapshot]: The most recent snapshots"""
+
+        self.nSnapshots: Notifier = Notifier("Snapshots", self)
+        """
+        :class:`Notifier`: A notifier that is triggered with each
+        :class:`KernelSnapshot` taken
+        """
+
+        self._env = None
+        self._nextSnapshotTime = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def __repr__(self):
+        return "KernelStatistics()"
+
+    @property
+    def heapSize(self) -> int:
+        """int: The number of events that are currently scheduled"""
+        if self._env is None:
+            return 0
+        return _queueSize(self._env)
+
+    def start(self):
+        """
+        Makes the statistics object the :attr:`~SimulationManager.kernelStatistics`
+        of the :attr:`SimMan` and attaches it to the current environment (if
+        any).
+        """
+        SimMan.kernelStatistics = self
+        if SimMan.env is not None:
+            self.attach(SimMan.env)
+
+    def stop(self):
+        """
+        Detaches the statistics object from its environment and unsets it as
+        the :attr:`~SimulationManager.kernelStatistics` (if it is the active
+        one).
+        """
+        self.detach()
+        if SimMan.kernelStatistics is self:
+            SimMan.kernelStatistics = None
+
+    def reset(self):
+        """
+        Resets all counters and removes all snapshots.
+        """
+        self.scheduled = {}
+        self.processed = {}
+        self.peakHeapSize = self.heapSize
+        self.staleTimeouts = 0
+        self.snapshots.clear()
+
+    def attach(self, env: Environment):
+        """
+        Starts collecting statistics for `env` (and stops collecting them for
+        a previously attached environment).
+        """
+        self.detach()
+        self._env = env
+        schedule = type(env).schedule.__get__(env)
+        step = type(env).step.__get__(env)
+
+        def countingSchedule(event: Event, priority=NORMAL, delay=0):
+            schedule(event, priority, delay)
+            name = type(event).__name__
+            self.scheduled[name] = self.scheduled.get(name, 0) + 1
+            size = _queueSize(env)
+            if size > self.peakHeapSize:
+                self.peakHeapSize = size
+
+        def countingStep():
+            event = _nextEvent(env)
+            if event is not None:
+                name = type(event).__name__
+                self.processed[name] = self.processed.get(name, 0) + 1
+                if isinstance(event, Timeout) and not event.callbacks:
+                    self.staleTimeouts += 1
+            step()
+            if self._nextSnapshotTime is not None and env.now >= self._nextSnapshotTime:
+                self.takeSnapshot()
+
+        env.schedule = countingSchedule
+        env.step = countingStep
+        if self.snapshotInterval is not None:
+            self._nextSnapshotTime = env.now + SimMan.secondsToTicks(self.snapshotInterval)
+
+    def detach(self):
+        """
+        Stops collecting statistics for the attached environment.
+        """
+        if self._env is not None:
+            del self._env.schedule
+            del self._env.step
+            self._env = None
+            self._nextSnapshotTime = None
+
+    def takeSnapshot(self) -> KernelSnapshot:
+        """
+        Creates a :class:`KernelSnapshot` of the current counters, appends it to
+        :attr:`snapshots`, triggers :attr:`nSnapshots` with it, and returns it.
+        """
+        now = self._env.now if self._env is not None else 0
+        snapshot = KernelSnapshot(SimMan.ticksToSeconds(now), dict(self.scheduled), dict(self.processed),
+                                    self.heapSize, self.peakHeapSize, self.staleTimeouts)
+        if self._nextSnapshotTime is not None:
+            interval = SimMan.secondsToTicks(self.snapshotInterval)
+            while self._nextSnapshotTime <= now:
+                self._nextSnapshotTime += interval
+        self.snapshots.append(snapshot)
+        self.nSnapshots.trigger(snapshot)
+        return snapshot
+
 class SourcePrepender(logging.LoggerAdapter):
     """
     A :class:`~logging.LoggerAdapter` that prepends the string representation of
@@ -163,16 +982,18 @@ class SourcePrepender(logging.LoggerAdapter):
                 SourcePrepender :class:`~logging.LoggerAdapter`
         """
         super(SourcePrepender, self).__init__(logger, {})
+        _prependers.add(self)
+        _applyProductionMode(self)
 
     def process(self, msg, kwargs):
         """
         If a `sender` keyword argument is provided, prepends "`obj`: " to `msg`,
         with `obj` being the string representation of the `sender` keyword
-        argument.
+        argument. The string representation is only created when the message
+        is rendered by a handler.
         """
         if "sender" in kwargs:
-            sender = kwargs.pop("sender")
-            msg = str(sender) + ": " + msg
+            msg = LazyLogMessage(msg, sender=kwargs.pop("sender"))
         return msg, kwargs
 
 class SimTimePrepender(SourcePrepender):
@@ -203,10 +1024,77 @@ class SimTimePrepender(SourcePrepender):
         """
         Prepends "[Time: `x`]" to `msg`, with `x` being the current
         simulation time. Additionally, if a `sender` argument is provided,
-        str(`sender`) is also prepended to the simulation time.
+        str(`sender`) is also prepended to the simulation time. Formatting is
+        deferred until the message is rendered by a handler.
         """
-        msg, kwargs = super(SimTimePrepender, self).process(msg, kwargs)
-        return "[Time: {:12f}] {}".format(SimMan.now, msg), kwargs
+        return LazyLogMessage(msg, kwargs.pop("sender", None), SimMan.now), kwargs
+
+class LazyLogMessage:
+    """
+    A log message with an optional sender and simulation time that are only
+    converted to strings when the message is rendered. :class:`SourcePrepender`
+    and :class:`SimTimePrepender` pass :class:`LazyLogMessage` objects to the
+    wrapped :class:`~logging.Logger`.
+    """
+
+    __slots__ = ("msg", "sender", "time")
+
+    def __init__(self, msg: str, sender: Any = None, time: float = None):
+        self.msg = msg
+        self.sender = sender
+        self.time = time
+
+    def __str__(self):
+        msg = self.msg
+        if self.sender is not None:
+            msg = "{}: {}".format(self.sender, msg)
+        if self.time is not None:
+            msg = "[Time: {:12f}] {}".format(self.time, msg)
+        return msg
+
+PRODUCTION_MODE_LOGGERS = ("gymwipe.simtools", "gymwipe.networking.construction",
+                            "gymwipe.networking.simple_stack")
+"""
+Tuple[str, ...]: The names of the loggers whose debug and info calls are
+discarded in production mode by default (see :func:`setProductionMode`)
+"""
+
+_productionModeLoggers = frozenset()
+_prependers: "weakref.WeakSet[SourcePrepender]" = weakref.WeakSet()
+
+def _discardLogCall(msg, *args, **kwargs):
+    pass
+
+def _applyProductionMode(prepender: SourcePrepender):
+    if prepender.logger.name in _productionModeLoggers:
+        prepender.debug = prepender.info = _discardLogCall
+    else:
+        prepender.__dict__.pop("debug", None)
+        prepender.__dict__.pop("info", None)
+
+def setProductionMode(enabled: bool = True, loggerNames: Tuple[str, ...] = PRODUCTION_MODE_LOGGERS):
+    """
+    Enables or disables the production mode. In production mode, the `debug`
+    and `info` methods of :class:`SourcePrepender` instances that wrap one of
+    the loggers in `loggerNames` are replaced by a function that discards its
+    arguments, regardless of logging levels. Hence, these calls cost little
+    more than a function call.
+
+    Args:
+        enabled: Whether to enable or disable the production mode
+        loggerNames: The names of the loggers to be muted
+    """
+    global _productionModeLoggers
+    _productionModeLoggers = frozenset(loggerNames) if enabled else frozenset()
+    for prepender in _prependers:
+        _applyProductionMode(prepender)
+
+def isProductionMode() -> bool:
+    """
+    Returns ``True`` if the production mode is enabled (see
+    :func:`setProductionMode`).
+    """
+    return len(_productionModeLoggers) > 0
 
 logger = SimTimePrepender(logging.getLogger(__name__))
 
@@ -251,15 +1139,20 @@ class Notifier:
         self._event = None
 
         # Callbacks
-        # A priority -> Set[Callable] defaultdict for callbacks:
-        self._priorityToCallbacks: DefaultDict[int, Set[Callable[[Any], None]]] = defaultdict(set)
+        # A priority -> (callback -> dispatched callable) dict. Dicts serve as
+        # insertion-ordered sets, the dispatched callables have the additional
+        # arguments of their callbacks bound to them.
+        self._priorityToCallbacks: Dict[int, Dict[Callable[[Any], None], Callable[[Any], None]]] = {}
+        self._sortedPriorities: List[int] = [] # in descending order
         self._callbackToPriority: Dict[Callable[[Any], None], int] = {}
-        self._callbackToAdditionalArgs: Dict[Callable[[Any], None], Any] = {}
-        self._sortedCallbacks = [] # List of callbacks sorted by their priority
 
         # SimPy generators
         self._processExecutors = {}
 
+        # A tuple of all callables to be invoked on trigger(): callbacks in
+        # the order of their priorities, followed by process executors
+        self._dispatch: Tuple[Callable[[Any], None], ...] = ()
+
     def subscribeCallback(self, callback: Callable[[Any], None], priority: int = 0, additionalArgs: List[Any] = None):
         """
         Adds the passed callable to the set of callback functions. Thus, when
@@ -274,21 +1167,35 @@ class Notifier:
             priority: If set, the callable is guaranteed to be invoked only
                 after every callback with a higher priority value has been executed.
                 Callbacks added without a priority value are assumed to have
-                priority `0`.
+                priority `0`. Callbacks with equal priorities are invoked in
+                the order of their subscription.
             additionalArgs: A list of arguments that are passed as further
                 arguments when the callback function is invoked
         """
         # Every callback is only allowed to be added once
         assert callback not in self._callbackToPriority
-        assert callback not in self._callbackToAdditionalArgs
 
         self._callbackToPriority[callback] = priority
-        if additionalArgs is not None:
-            self._callbackToAdditionalArgs[callback] = additionalArgs
+        bucket = self._priorityToCallbacks.get(priority)
+        if bucket is None:
+            bucket = self._priorityToCallbacks[priority] = {}
+            self._sortedPriorities.append(priority)
+            self._sortedPriorities.sort(reverse=True)
+        if additionalArgs:
+            args = tuple(additionalArgs)
+            dispatched = lambda value: callback(value, *args)
+        else:
+            dispatched = callback
+        bucket[callback] = dispatched
 
-        # Add the callback to the set belonging to its priority
-        self._priorityToCallbacks[priority].add(callback)
-        self._updateSortedCallbacks()
+        # Insert the callable behind the last one with an equal or higher priority
+        index = 0
+        for p in self._sortedPriorities:
+            if p < priority:
+                break
+            index += len(self._priorityToCallbacks[p])
+        index -= 1
+        self._dispatch = self._dispatch[:index] + (dispatched,) + self._dispatch[index:]
     
     def unsubscribeCallback(self, callback: Callable[[Any], None]):
         """
@@ -302,22 +1209,13 @@ class Notifier:
         assert callback in self._callbackToPriority
 
         priority = self._callbackToPriority.pop(callback)
-        self._priorityToCallbacks[priority].remove(callback)
-        self._updateSortedCallbacks()
-
-        if callback in self._callbackToAdditionalArgs:
-            self._callbackToAdditionalArgs.pop(callback)
-    
-    def _updateSortedCallbacks(self):
-        """
-        Rebuilds the :attr:`_sortedCallbacks` list
-        """
-        sortedPriorities = sorted(self._priorityToCallbacks.keys(), reverse=True)
-        self._sortedCallbacks = list(
-            itertools.chain(
-                *[self._priorityToCallbacks[p] for p in sortedPriorities]
-            )
-        )
+        bucket = self._priorityToCallbacks[priority]
+        dispatched = bucket.pop(callback)
+        if len(bucket) == 0:
+            del self._priorityToCallbacks[priority]
+            self._sortedPriorities.remove(priority)
+        index = self._dispatch.index(dispatched)
+        self._dispatch = self._dispatch[:index] + self._dispatch[index+1:]
 
     def subscribeProcess(self, process: Generator[Event, Any, None], blocking=True, queued=False):
         """
@@ -347,7 +1245,7 @@ class Notifier:
             def executor(value: Any):
                 if not blocking:
                     # start a new process
-                    SimMan.process(process(value))
+                    SimMan.process(process(value), self)
                 else:
                     if executor.running:
                         if not queued:
@@ -365,7 +1263,7 @@ class Notifier:
                                         "Queue length: %d", value, process, len(executor.queue), sender=self)
                     else:
                         executor.running = True
-                        processedEvent = SimMan.process(process(value))
+                        processedEvent = SimMan.process(process(value), self)
                         if queued:
                             def executeNext(prevProcessReturnValue: Any):
                                 # callback for running the next process from the queue
@@ -373,7 +1271,7 @@ class Notifier:
                                     nextObject = executor.queue.popleft()
                                     logger.debug("Processing generator %s "
                                                 "with queued object %s.", process, nextObject, sender=self)
-                                    event = SimMan.process(process(nextObject))
+                                    event = SimMan.process(process(nextObject), self)
                                     event.callbacks.append(executeNext)
                                 else:
                                     executor.running = False
@@ -390,6 +1288,7 @@ class Notifier:
             if blocking:
                 executor.queue = deque()
             self._processExecutors[process] = executor
+            self._dispatch += (executor,)
     
     def trigger(self, value: Any = None):
         """
@@ -398,19 +1297,25 @@ class Notifier:
         generators.
         """
         logger.debug("Triggered with value %s", value, sender=self)
-        for callback in self._sortedCallbacks:
-            if callback in self._callbackToAdditionalArgs:
-                args = self._callbackToAdditionalArgs[callback]
-                callback(value, *args)
-            else:
-                callback(value)
-            
-        for executor in self._processExecutors.values():
-            executor(value)
+        for callback in self._dispatch:
+            callback(value)
         if self._event is not None:
             self._event.succeed(value)
             self._event = None
     
+    def reset(self):
+        """
+        Resets the :class:`Notifier` to its initial state after a
+        :meth:`SimulationManager.reset`: The pending :attr:`event` is dropped,
+        and the executors of subscribed SimPy generators forget about running
+        processes and discard their queued values. Subscriptions are kept.
+        """
+        self._event = None
+        for executor in self._processExecutors.values():
+            executor.running = False
+            if hasattr(executor, "queue"):
+                executor.queue.clear()
+
     @property
     def event(self):
         """
@@ -0,0 +1,577 @@
+"""
+A binary event trace recorder for network simulations.
+
+Text logging is a poor fit for analysing long simulation runs: rendering log
+messages is slow and the resulting files have to be parsed again before they
+can be evaluated. A :class:`TraceRecorder` instead collects fixed-size records
+(see :data:`TRACE_DTYPE`) in a preallocated NumPy structured array and flushes
+that buffer in chunks to a memory-mapped binary file whenever it is full.
+
+The following events are recorded (see :class:`TraceKind`):
+
+    * Transmissions started via :meth:`~gymwipe.networking.physical.FrequencyBand.transmit`
+    * Reception decisions of physical layers
+    * Bit error rate changes simulated by the
+      :class:`~gymwipe.networking.simple_stack.SimplePhy`
+    * Frequency band assignments announced by the
+      :class:`~gymwipe.networking.simple_stack.SimpleRrmMac`
+    * Queue lengths of :class:`~gymwipe.networking.simple_stack.SimpleMac` layers
+
+Recording is activated by :meth:`TraceRecorder.start` (or by using the recorder
+as a context manager), which sets :attr:`SimulationManager.traceRecorder
+<gymwipe.simtools.SimulationManager.traceRecorder>`. Without an active
+recorder, the hooks in the network stack only cost an attribute lookup.
+
+Example:
+
+    .. code-block:: python
+
+        with TraceRecorder("run.trace"):
+            SimMan.runSimulation(10)
+
+        trace = Trace("run.trace")
+        trace.throughput()
+        trace.select(kinds=[TraceKind.ASSIGNMENT], start=5)
+
+Besides the binary record file, a recorder writes a small JSON metadata file
+(the trace path with a ``.json`` suffix appended) that maps device ids to
+device names and MCS ids to MCS descriptions.
+
+Recorded traces are analysed using a :class:`Trace` object, which filters
+records by time window, device, and kind and computes aggregates like
+per-device throughput, collision ratios, and SINR histograms. All of its
+queries iterate over the memory-mapped trace file in chunks.
+"""
+import json
+import logging
+import os
+from enum import IntEnum
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+
+import numpy as np
+
+from gymwipe.simtools import SimMan
+
+logger = logging.getLogger(__name__)
+
+TRACE_DTYPE = np.dtype([
+    ("time", "f8"),
+    ("episode", "u4"),
+    ("kind", "u1"),
+    ("success", "i1"),
+    ("device", "i4"),
+    ("peer", "i8"),
+    ("start", "f8"),
+    ("stop", "f8"),
+    ("power", "f8"),
+    ("sinr", "f8"),
+    ("bits", "i8"),
+    ("mcs", "i2"),
+    ("value", "f8")
+])
+"""
+:class:`numpy.dtype`: The record type of trace files. The meaning of the fields
+depends on the record's ``kind``:
+
+    :time: The simulated time at which the record was created
+    :episode: The number of the episode in which the record was created (see
+        :meth:`TraceRecorder.newEpisode`)
+    :kind: A :class:`TraceKind` value
+    :success: ``1`` for successful receptions, ``0`` for failed ones, ``-1`` if
+        not applicable
+    :device: The id of the device that created the record (see
+        :meth:`TraceRecorder.getDeviceId`)
+    :peer: For receptions and bit error rates: The id of the sending device;
+        for assignments: The MAC address (as an integer) of the device that
+        has been assigned the frequency band; for queue lengths: The MAC
+        address of the queue's MAC layer; ``-1`` otherwise
+    :start: Start time of the transmission concerned (``NaN`` if not applicable)
+    :stop: Stop time of the transmission concerned (``NaN`` if not applicable)
+    :power: Transmission power in dBm (``NaN`` if not applicable)
+    :sinr: Signal to interference and noise ratio in dB (``NaN`` if not
+        applicable)
+    :bits: Number of bits concerned (the size of the transmitted packet for
+        transmissions, the size of the decided packet part for receptions)
+    :mcs: The MCS id (see :meth:`TraceRecorder.getMcsId`), ``-1`` if not
+        applicable
+    :value: For receptions and bit error rates: The (packet or bit) error
+        rate; for assignments: The number of time slots assigned; for queue
+        lengths: The number of queued packets
+"""
+
+class TraceKind(IntEnum):
+    """
+    An enumeration of the kinds of trace records
+    """
+
+    TRANSMISSION = 0
+    """A transmission has been started."""
+
+    HEADER_RECEPTION = 1
+    """The header of a transmission has been decided on."""
+
+    PAYLOAD_RECEPTION = 2
+    """The payload of a transmission has been decided on."""
+
+    PACKET_RECEPTION = 3
+    """A whole packet has been decided on (e.g. by a link-level physical layer)."""
+
+    BIT_ERROR_RATE = 4
+    """The bit error rate of a transmission being received has changed."""
+
+    ASSIGNMENT = 5
+    """The RRM has announced a frequency band assignment."""
+
+    QUEUE_LENGTH = 6
+    """The length of a MAC layer's packet queue has changed."""
+
+_receptionKinds = {
+    "Header": TraceKind.HEADER_RECEPTION,
+    "Payload": TraceKind.PAYLOAD_RECEPTION,
+    "Packet": TraceKind.PACKET_RECEPTION
+}
+
+_nan = float("nan")
+
+class TraceRecorder:
+    """
+    Records simulation events into a binary trace file at `path`. Records are
+    collected in a buffer of `bufferSize` records, which is flushed to the
+    file whenever it is full, when :meth:`flush` is called and when the
+    recording is stopped.
+
+    A recorder may be used for several episodes of a simulation. Whenever the
+    simulated time is rewound (by :meth:`SimulationManager.init()
+    <gymwipe.simtools.SimulationManager.init>` or :meth:`SimulationManager.reset()
+    <gymwipe.simtools.SimulationManager.reset>`) while the recorder is active,
+    a new episode is started (see :meth:`newEpisode`). Records are in
+    chronological order within each episode.
+
+    Args:
+        path: The path of the trace file to be created (an existing file is
+            overwritten)
+        bufferSize: The number of records to be buffered before writing them
+            to the trace file
+
+    Raises:
+        ValueError: If `bufferSize` is not positive
+    """
+
+    def __init__(self, path: str, bufferSize: int = 65536):
+        if bufferSize < 1:
+            raise ValueError("bufferSize has to be positive, got {}".format(bufferSize))
+        self.path = path
+        self.metadataPath = path + ".json"
+        self._buffer = np.zeros(bufferSize, dtype=TRACE_DTYPE)
+        self._bufferSize = bufferSize
+        self._buffered = 0
+        self._flushed = 0
+        self._deviceIds: Dict[Any, int] = {}
+        self._deviceNames = []
+        self._mcsIds: Dict[Tuple, int] = {}
+        self._mcsNames = []
+        self.episode = 0
+        """int: The number of the current episode"""
+        self._episodeStart = 0
+        # Create an empty trace file
+        open(path, "wb").close()
+        self._writeMetadata()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def count(self) -> int:
+        """int: The total number of records (flushed and buffered)"""
+        return self._flushed + self._buffered
+
+    def start(self):
+        """
+        Makes the recorder the :attr:`~gymwipe.simtools.SimulationManager.traceRecorder`
+        of the :attr:`~gymwipe.simtools.SimMan`, so that events are recorded
+        from now on.
+        """
+        SimMan.traceRecorder = self
+
+    def stop(self):
+        """
+        Stops recording (if the recorder is the active one) and flushes the
+        buffered records.
+        """
+        if SimMan.traceRecorder is self:
+            SimMan.traceRecorder = None
+        self.flush()
+
+    def newEpisode(self):
+        """
+        Starts a new episode by incrementing :attr:`episode`, unless no records
+        have been created in the current episode.
+        """
+        if self.count > self._episodeStart:
+            self.episode += 1
+            self._episodeStart = self.count
+
+    def flush(self):
+        """
+        Writes the buffered records to the trace file by memory-mapping the
+        file's new tail, and updates the metadata file.
+        """
+        n = self._buffered
+        if n > 0:
+            offset = self._flushed * TRACE_DTYPE.itemsize
+            os.truncate(self.path, offset + n * TRACE_DTYPE.itemsize)
+            chunk = np.memmap(self.path, dtype=TRACE_DTYPE, mode="r+", offset=offset, shape=(n,))
+            chunk[:] = self._buffer[:n]
+            chunk.flush()
+            del chunk
+            self._flushed += n
+            self._buffered = 0
+            logger.debug("TraceRecorder: Flushed %d records to %s", n, self.path)
+        self._writeMetadata()
+
+    def _writeMetadata(self):
+        metadata = {
+            "count": self._flushed,
+            "episodes": self.episode + 1,
+            "fields": [name for name in TRACE_DTYPE.names],
+            "kinds": {kind.name: int(kind) for kind in TraceKind},
+            "devices": self._deviceNames,
+            "mcs": self._mcsNames
+        }
+        with open(self.metadataPath, "w") as f:
+            json.dump(metadata, f)
+
+    def getDeviceId(self, device) -> int:
+        """
+        Returns the integer id that is used for `device` in the trace.
+        """
+        deviceId = self._deviceIds.get(device)
+        if deviceId is None:
+            deviceId = len(self._deviceNames)
+            self._deviceIds[device] = deviceId
+            self._deviceNames.append(getattr(device, "name", str(device)))
+        return deviceId
+
+    def getMcsId(self, mcs) -> int:
+        """
+        Returns the integer id that is used for `mcs` in the trace. MCS objects
+        of the same type and code rate share an id.
+        """
+        key = (type(mcs).__name__, float(mcs.codeRate))
+        mcsId = self._mcsIds.get(key)
+        if mcsId is None:
+            mcsId = len(self._mcsNames)
+            self._mcsIds[key] = mcsId
+            self._mcsNames.append("{}({})".format(*key))
+        return mcsId
+
+    def _append(self, record: Tuple):
+        """
+        Stores `record` in the buffer, flushing the buffer if it is full.
+        """
+        self._buffer[self._buffered] = record
+        self._buffered += 1
+        if self._buffered == self._bufferSize:
+            self.flush()
+
+    def recordTransmission(self, t):
+        """
+        Records the start of the :class:`~gymwipe.networking.physical.Transmission` `t`.
+        """
+        self._append((SimMan.now, self.episode, TraceKind.TRANSMISSION, -1, self.getDeviceId(t.sender), -1,
+                      t.startTime, t.stopTime, t.power, _nan, t.packet.bitSize,
+                      self.getMcsId(t.mcsPayload), _nan))
+
+    def recordReception(self, receiver, t, part: str, success: bool, errorRate: float,
+                        mcs, sinr: float = _nan):
+        """
+        Records a reception decision of `receiver` for the transmission `t`.
+
+        Args:
+            receiver: The receiving device
+            t: The :class:`~gymwipe.networking.physical.Transmission` that has
+                been decided on
+            part: ``"Header"``, ``"Payload"``, or ``"Packet"``
+            success: Whether the reception was successful
+            errorRate: The bit error rate (or packet error rate for whole
+                packets) the decision was based on
+            mcs: The MCS that has been applied
+            sinr: The SINR in dB, if known
+        """
+        if part == "Header":
+            bits = t.packet.header.bitSize
+        elif part == "Payload":
+            bits = t.packet.payload.bitSize
+        else:
+            bits = t.packet.bitSize
+        self._append((SimMan.now, self.episode, _receptionKinds[part], int(success), self.getDeviceId(receiver),
+                      self.getDeviceId(t.sender), t.startTime, t.stopTime, t.power, sinr,
+                      bits, self.getMcsId(mcs), errorRate))
+
+    def recordBitErrorRate(self, receiver, t, bitErrorRate: float, sinr: float):
+        """
+        Records the current bit error rate and SINR for the reception of the
+        transmission `t` by `receiver`.
+        """
+        self._append((SimMan.now, self.episode, TraceKind.BIT_ERROR_RATE, -1, self.getDeviceId(receiver),
+                      self.getDeviceId(t.sender), t.startTime, t.stopTime, t.power, sinr,
+                      0, -1, bitErrorRate))
+
+    def recordAssignment(self, rrm, destination: bytes, timeSlots: int):
+        """
+        Records that `rrm` assigns the frequency band to the device with the
+        MAC address `destination` for `timeSlots` time slots.
+        """
+        self._append((SimMan.now, self.episode, TraceKind.ASSIGNMENT, -1, self.getDeviceId(rrm),
+                      int.from_bytes(destination, "big"), _nan, _nan, _nan, _nan,
+                      0, -1, timeSlots))
+
+    def recordQueueLength(self, device, addr: bytes, length: int):
+        """
+        Records that the packet queue of the MAC layer with the address `addr`
+        of `device` contains `length` packets.
+        """
+        self._append((SimMan.now, self.episode, TraceKind.QUEUE_LENGTH, -1, self.getDeviceId(device),
+                      int.from_bytes(addr, "big"), _nan, _nan, _nan, _nan,
+                      0, -1, length))
+
+def openTrace(path: str) -> Tuple[np.memmap, Dict[str, Any]]:
+    """
+    Memory-maps the trace file at `path` and returns a tuple containing the
+    read-only record array and the metadata dictionary. Only flushed records
+    are contained.
+    """
+    with open(path + ".json") as f:
+        metadata = json.load(f)
+    count = metadata["count"]
+    if count == 0:
+        records = np.zeros(0, dtype=TRACE_DTYPE)
+    else:
+        records = np.memmap(path, dtype=TRACE_DTYPE, mode="r", shape=(count,))
+    return records, metadata
+
+class Trace:
+    """
+    A query interface for a recorded trace. The trace file is memory-mapped
+    and queries are evaluated chunk by chunk on the record columns, so that
+    traces larger than the available memory can be analysed.
+
+    Devices can be specified either by their names or by their trace ids.
+    Time windows are half-open intervals [`start`, `stop`), with ``None``
+    meaning that the window is unbounded on the respective side.
+
+    A trace that contains several episodes (see
+    :meth:`TraceRecorder.newEpisode`) is only in chronological order within
+    each episode. Unless an `episode` is selected, time windows, throughput,
+    and collision queries raise a :class:`ValueError` for such a trace.
+
+    Args:
+        path: The path of the trace file
+        chunkSize: The number of records to be processed at once
+        episode: If provided, only the records of the given episode are
+            considered
+
+    Raises:
+        ValueError: If `episode` is not contained in the trace
+    """
+
+    def __init__(self, path: str, chunkSize: int = 1 << 20, episode: int = None):
+        records, metadata = openTrace(path)
+
+        self.episodes: int = metadata.get("episodes", 1)
+        """int: The number of episodes contained in the trace file"""
+
+        self.episode: int = episode
+        """int: The selected episode, ``None`` if all episodes are considered"""
+
+        if episode is not None:
+            if not 0 <= episode < self.episodes:
+                raise ValueError("Episode {} is not contained in the trace ({} episodes)".format(
+                                    episode, self.episodes))
+            episodes = records["episode"]
+            records = records[int(np.searchsorted(episodes, episode, side="left")):
+                                int(np.searchsorted(episodes, episode, side="right"))]
+
+        self.records: np.memmap = records
+        """numpy.memmap: The memory-mapped records of the trace"""
+
+        self.metadata: Dict[str, Any] = metadata
+        """Dict[str, Any]: The trace's metadata"""
+
+        self.chunkSize: int = chunkSize
+        """int: The number of records to be processed at once"""
+
+        self.devices: List[str] = self.metadata["devices"]
+        """List[str]: The device names, indexed by their trace ids"""
+
+    def __len__(self):
+        return len(self.records)
+
+    def deviceId(self, device: Union[str, int]) -> int:
+        """
+        Returns the trace id of `device`, which may be a device name or an id.
+
+        Raises:
+            ValueError: If there is no device with the name `device`
+        """
+        if isinstance(device, str):
+            return self.devices.index(device)
+        return device
+
+    def _checkChronological(self):
+        if self.episode is None and self.episodes > 1:
+            raise ValueError("The trace contains {} episodes, select one of them to query it "
+                                "by time".format(self.episodes))
+
+    def _indexRange(self, start: float, stop: float) -> Tuple[int, int]:
+        # Records are stored in chronological order (within each episode)
+        if start is None and stop is None:
+            return 0, len(self.records)
+        self._checkChronological()
+        times = self.records["time"]
+        first = 0 if start is None else int(np.searchsorted(times, start, side="left"))
+        last = len(times) if stop is None else int(np.searchsorted(times, stop, side="left"))
+        return first, last
+
+    def iterChunks(self, kinds: Iterable[TraceKind] = None, devices: Iterable[Union[str, int]] = None,
+                    start: float = None, stop: float = None) -> Iterator[np.ndarray]:
+        """
+        A generator yielding the records matching the given filters in
+        chronological order, as structured arrays of at most :attr:`chunkSize`
+        records each.
+
+        Args:
+            kinds: If provided, only records of the given kinds are yielded
+            devices: If provided, only records created by the given devices are
+                yielded
+            start: The start of the time window
+            stop: The end of the time window
+        """
+        first, last = self._indexRange(start, stop)
+        kinds = None if kinds is None else np.array([int(kind) for kind in kinds])
+        devices = None if devices is None else np.array([self.deviceId(d) for d in devices])
+        for offset in range(first, last, self.chunkSize):
+            chunk = self.records[offset:min(offset + self.chunkSize, last)]
+            mask = None
+            if kinds is not None:
+                mask = np.isin(chunk["kind"], kinds)
+            if devices is not None:
+                deviceMask = np.isin(chunk["device"], devices)
+                mask = deviceMask if mask is None else mask & deviceMask
+            if mask is None:
+                yield np.asarray(chunk)
+            elif mask.any():
+                yield chunk[mask]
+
+    def select(self, kinds: Iterable[TraceKind] = None, devices: Iterable[Union[str, int]] = None,
+                start: float = None, stop: float = None) -> np.ndarray:
+        """
+        Returns a structured array containing all the records that match the
+        given filters (see :meth:`iterChunks` for the arguments).
+        """
+        chunks = list(self.iterChunks(kinds, devices, start, stop))
+        if len(chunks) == 0:
+            return np.zeros(0, dtype=TRACE_DTYPE)
+        return np.concatenate(chunks)
+
+    def throughput(self, start: float = None, stop: float = None) -> Dict[str, float]:
+        """
+        Returns a dictionary mapping the name of each device to the number of
+        payload bits (or packet bits for link-level receptions) per second
+        that it has successfully received at the physical layer within the
+        given time window. Receptions are attributed to the window by the time
+        of their decision. Unbounded window sides are replaced by the times of
+        the first and the last record, respectively (receptions at the time of
+        the last record are included then).
+        """
+        self._checkChronological()
+        first, last = self._indexRange(start, stop)
+        if first == last:
+            return {name: 0.0 for name in self.devices}
+        windowStart = float(self.records["time"][first]) if start is None else start
+        windowStop = float(self.records["time"][last - 1]) if stop is None else stop
+        bits = np.zeros(len(self.devices))
+        for chunk in self.iterChunks((TraceKind.PAYLOAD_RECEPTION, TraceKind.PACKET_RECEPTION),
+                                        start=start, stop=stop):
+            received = chunk[chunk["success"] == 1]
+            bits += np.bincount(received["device"], weights=received["bits"], minlength=len(self.devices))
+        duration = windowStop - windowStart
+        if duration <= 0:
+            raise ValueError("Cannot calculate a throughput for a time window of length 0")
+        return {name: bits[i] / duration for i, name in enumerate(self.devices)}
+
+    def collisionFlags(self, start: float = None, stop: float = None) -> np.ndarray:
+        """
+        Returns a boolean array with one entry per transmission record within
+        the given time window, indicating whether the transmission overlapped
+        in time with any other transmission of that window.
+        """
+        self._checkChronological()
+        flags = []
+        maxStop = -np.inf
+        for chunk in self.iterChunks((TraceKind.TRANSMISSION,), start=start, stop=stop):
+            starts = chunk["start"]
+            stops = chunk["stop"]
+            # Overlaps with the last transmission of the previous chunk
+            if len(flags) > 0 and starts[0] < flags[-1][1]:
+                flags[-1][0][-1] = True
+            # Transmissions are ordered by their start times: A transmission
+            # overlaps with an earlier one if any earlier one stops after it
+            # has started, and with a later one if the next one starts before
+            # it stops.
+            previousMaxStops = np.maximum.accumulate(np.concatenate(([maxStop], stops[:-1])))
+            collided = starts < previousMaxStops
+            collided[:-1] |= starts[1:] < stops[:-1]
+            maxStop = max(maxStop, float(stops.max()))
+            flags.append((collided, float(stops[-1])))
+        if len(flags) == 0:
+            return np.zeros(0, dtype=bool)
+        return np.concatenate([collided for collided, _ in flags])
+
+    def collisionRatio(self, devices: Iterable[Union[str, int]] = None,
+                        start: float = None, stop: float = None) -> float:
+        """
+        Returns the fraction of transmissions within the given time window
+        that overlapped in time with another transmission. If `devices` is
+        provided, only transmissions by the given devices are considered (but
+        collisions with transmissions of any device are taken into account).
+        Returns ``NaN`` if there are no transmissions to consider.
+        """
+        collided = self.collisionFlags(start, stop)
+        if devices is not None:
+            senders = np.concatenate([chunk["device"] for chunk in
+                        self.iterChunks((TraceKind.TRANSMISSION,), start=start, stop=stop)]
+                        or [np.zeros(0, dtype=int)])
+            collided = collided[np.isin(senders, [self.deviceId(d) for d in devices])]
+        if len(collided) == 0:
+            return _nan
+        return float(np.count_nonzero(collided)) / len(collided)
+
+    def sinrHistogram(self, bins: Union[int, Iterable[float]] = 50, range: Tuple[float, float] = (-20.0, 80.0),
+                        devices: Iterable[Union[str, int]] = None, start: float = None,
+                        stop: float = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns a histogram of the SINR values (in dB) recorded for bit error
+        rate changes and link-level receptions, as a tuple of the counts and
+        the bin edges (like :func:`numpy.histogram`).
+
+        Args:
+            bins: The number of equal-width bins in `range` or a sequence of
+                bin edges
+            range: The lower and upper range of the bins if `bins` is an integer
+            devices: If provided, only SINR values of the given receiving
+                devices are considered
+            start: The start of the time window
+            stop: The end of the time window
+        """
+        edges = np.histogram_bin_edges(np.zeros(0), bins, range)
+        counts = np.zeros(len(edges) - 1, dtype=np.int64)
+        for chunk in self.iterChunks((TraceKind.BIT_ERROR_RATE, TraceKind.PACKET_RECEPTION),
+                                        devices, start, stop):
+            sinrs = chunk["sinr"]
+            counts += np.histogram(sinrs[~np.isnan(sinrs)], edges)[0]
+        return counts, edges
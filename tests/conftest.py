@@ -0,0 +1,9 @@
+from gymwipe.simtools import SimMan, SimulationManager
+
+
+def pytest_addoption(parser):
+    parser.addoption("--kernel", choices=list(SimMan.KERNELS), default="simpy",
+                     help="The event kernel to run the simulations with")
+
+def pytest_configure(config):
+    SimulationManager.defaultKernel = config.getoption("--kernel")
@@ -1,12 +1,22 @@
 import logging
+import os
+import random
+from fractions import Fraction
 
 import gym
 import numpy as np
+import pytest
 
 import gymwipe.envs
+from gymwipe.networking.calibration import (calibrate,
+                                            loadPacketErrorRateTables)
+from gymwipe.networking.physical import BpskMcs
+from gymwipe.networking.simple_stack import LinkLevelPhy, SimplePhy
+from gymwipe.tracing import TRACE_DTYPE, Trace, TraceRecorder
 
 
-def test_counter_traffic_env(caplog):
+@pytest.mark.parametrize("phyClass", [SimplePhy, LinkLevelPhy])
+def test_counter_traffic_env(caplog, phyClass):
     caplog.set_level(logging.INFO, logger='gymwipe.networking.construction')
     caplog.set_level(logging.INFO, logger='gymwipe.networking.core')
     caplog.set_level(logging.INFO, logger='gymwipe.networking.physical')
@@ -14,7 +24,7 @@ def test_counter_traffic_env(caplog):
     caplog.set_level(logging.INFO, logger='gymwipe.simtools')
 
     # Get the environment and extract the number of actions.
-    env = gym.make('CounterTraffic-v0')
+    env = gym.make('CounterTraffic-v0', phyClass=phyClass)
     np.random.seed(123)
     env.seed(123)
 
@@ -32,3 +42,107 @@ def test_counter_traffic_env(caplog):
     observation, reward, _, _ = env.step({"device": 1, "duration": 12})
     assert observation - observation_center == 0
     assert reward == 2
+
+def test_counter_traffic_env_independence():
+    # Environments do not interfere with each other
+    envs = [gym.make('CounterTraffic-v0') for _ in range(2)]
+    feedback = [[], []]
+    for action in [(0, 3), (1, 12), (0, 5)]:
+        for i, env in enumerate(envs):
+            feedback[i].append(env.step({"device": action[0], "duration": action[1]})[:3])
+    assert feedback[0] == feedback[1]
+    assert envs[0].simMan.now == envs[1].simMan.now > 0
+
+def test_counter_traffic_env_seeding():
+    envs = [gym.make('CounterTraffic-v0', phyClass=LinkLevelPhy).unwrapped for _ in range(3)]
+    envs[0].seed(42)
+    random.random() # the global random number generator is not used
+    envs[1].seed(42)
+    envs[2].seed(43)
+
+    def draws(env):
+        return [device._phy.rng.random() for device in env.senders + [env.rrm]]
+
+    assert draws(envs[0]) == draws(envs[1]) != draws(envs[2])
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork()")
+def test_counter_traffic_env_lookahead():
+    env = gym.make('CounterTraffic-v0').unwrapped
+    env.step({"device": 0, "duration": 3})
+    now = env.simMan.now
+
+    candidates = [{"device": 0, "duration": 5}, {"device": 1, "duration": 12}, {"device": 1, "duration": 2}]
+    results = env.lookahead(candidates)
+    assert len(results) == 3
+
+    assert results[0] != results[1]
+
+    # The environment's state has not been changed
+    assert env.simMan.now == now
+    assert env.lookahead(candidates) == results
+
+    # Lookahead results match the results of actually performing the action
+    assert env.step(candidates[1]) == results[1]
+
+    with pytest.raises(RuntimeError):
+        env.lookahead([{"device": 5, "duration": 1}])
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork()")
+def test_counter_traffic_env_lookahead_instrumentation(tmp_path):
+    env = gym.make('CounterTraffic-v0').unwrapped
+    path = str(tmp_path / "run.trace")
+    with env.simMan:
+        # Flush every record, so that writes from child processes would show up
+        recorder = TraceRecorder(path, bufferSize=1)
+        recorder.start()
+    env.step({"device": 0, "duration": 3})
+    count = recorder.count
+    assert count > 0
+
+    env.lookahead([{"device": 0, "duration": 5}, {"device": 1, "duration": 12}])
+    assert recorder.count == count
+    assert os.path.getsize(path) == count * TRACE_DTYPE.itemsize
+    assert len(Trace(path)) == count
+
+@pytest.fixture(params=["analyticPer", "calibratedPer"])
+def per_table(request, tmp_path):
+    """
+    Runs tests with the packet error rate tables derived from bit error rates
+    (packet error rates of 0 or 1) and with a registered calibrated table
+    that interpolates packet error rates between 0 and 100 dB SINR
+    """
+    if request.param == "calibratedPer":
+        path = str(tmp_path / "per.npz")
+        calibrate(path, [0, 100], [8, 2**14], processes=1)
+        loadPacketErrorRateTables(path, register=True)
+        yield request.param
+        BpskMcs.registerPacketErrorRateTable(Fraction(3,4), None)
+    else:
+        yield request.param
+
+@pytest.mark.parametrize("phyClass", [SimplePhy, LinkLevelPhy])
+def test_counter_traffic_env_reset(phyClass, per_table):
+    actions = [(0, 3), (1, 12), (0, 5), (1, 7)]
+
+    def play(env):
+        return [env.step({"device": d, "duration": t})[:3] for d, t in actions]
+
+    freshEnv = gym.make('CounterTraffic-v0', phyClass=phyClass).unwrapped
+    freshEnv.seed(42)
+    expected = play(freshEnv)
+
+    env = gym.make('CounterTraffic-v0', phyClass=phyClass).unwrapped
+    env.seed(42)
+    env.step({"device": 1, "duration": 9})
+    # Interrupt an assignment with transmissions in flight
+    with env.simMan:
+        env.rrm.assignFrequencyBand(0, 20)
+        env.simMan.runSimulation(0.0123)
+    phy = env.senders[0]._phy
+
+    assert env.reset() == env.COUNTER_BOUND
+    assert env.simMan.now == 0
+    assert env.frequencyBand.getActiveTransmissions() == []
+    assert play(env) == expected
+    # The object graph has been kept
+    assert env.senders[0]._phy is phy
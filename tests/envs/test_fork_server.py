@@ -0,0 +1,42 @@
+import os
+
+import pytest
+
+from gymwipe.envs import CounterTrafficEnv, ForkServerEnv
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork()")
+
+ACTIONS = [{"device": 0, "duration": 3}, {"device": 1, "duration": 12}, {"device": 0, "duration": 5}]
+
+@pytest.mark.parametrize("prefork", [True, False])
+def test_fork_server_env(prefork):
+    env = ForkServerEnv(CounterTrafficEnv, prefork=prefork)
+    try:
+        with pytest.raises(RuntimeError):
+            env.step(ACTIONS[0])
+
+        referenceEnv = CounterTrafficEnv()
+        expected = [referenceEnv.step(action) for action in ACTIONS]
+
+        # Every episode starts from the exact initial state, so the same
+        # actions yield the same feedback in every episode
+        for episode in range(3):
+            assert env.reset() == CounterTrafficEnv.COUNTER_BOUND
+            assert [env.step(action) for action in ACTIONS] == expected
+        assert env.episode == 3
+
+        # Changing the seed discards a preforked episode process
+        assert env.seed(42) == [42]
+        assert env.reset() == CounterTrafficEnv.COUNTER_BOUND
+
+        # Errors in the episode process are reported
+        with pytest.raises(RuntimeError):
+            env.step({"device": 5, "duration": 1})
+    finally:
+        env.close()
+    assert not env.server.running
+    assert not os.path.exists(env.server.address)
+
+def test_fork_server_construction_error():
+    with pytest.raises(RuntimeError):
+        ForkServerEnv(CounterTrafficEnv, {"unknownArgument": 1})
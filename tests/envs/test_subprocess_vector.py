@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("gym.vector")
+pytest.importorskip("multiprocessing.shared_memory")
+
+from gymwipe.envs import CounterTrafficEnv
+from gymwipe.envs.subprocess_vector import SubprocessVectorEnv
+from gymwipe.envs.vector import CounterTrafficVectorEnv
+
+
+def test_subprocess_vector_env():
+    with pytest.raises(ValueError):
+        SubprocessVectorEnv(2, numWorkers=3)
+
+    vectorEnv = SubprocessVectorEnv(3, numWorkers=2)
+    referenceEnv = CounterTrafficVectorEnv(3)
+    try:
+        assert vectorEnv.numWorkers == 2
+        assert len(vectorEnv.workerCpus) == 2
+        assert vectorEnv.observation_space == referenceEnv.observation_space
+        assert vectorEnv.seed(123) == [123, 124, 125]
+        assert vectorEnv.statistics.steps == 0
+
+        observations = vectorEnv.reset()
+        assert observations is vectorEnv.observations
+        assert list(observations) == list(referenceEnv.reset())
+
+        # Results match the ones of in-process environments
+        actions = {"device": np.array([0, 1, 0]), "duration": np.array([3, 3, 12])}
+        for _ in range(2):
+            results = vectorEnv.step(actions)
+            expected = referenceEnv.step(actions)
+            for result, expectedResult in zip(results, expected):
+                assert list(result) == list(expectedResult)
+
+        with pytest.raises(ValueError):
+            vectorEnv.step({"device": [0, 2, 0], "duration": [1, 1, 1]})
+
+        statistics = vectorEnv.statistics
+        assert statistics.steps == 2
+        assert statistics.meanStepLatency > statistics.meanIpcTime >= 0
+        assert np.all((statistics.workerUtilization > 0) & (statistics.workerUtilization <= 1))
+        vectorEnv.resetStatistics()
+        assert vectorEnv.statistics.steps == 0
+    finally:
+        vectorEnv.close()
+    assert vectorEnv.closed
+
+def test_subprocess_vector_env_failure(monkeypatch):
+    step = CounterTrafficEnv.step
+    def failingStep(env, action):
+        if action["duration"] == 0:
+            raise ValueError("Duration 0")
+        return step(env, action)
+    # Forked workers inherit the patched class
+    monkeypatch.setattr(CounterTrafficEnv, "step", failingStep)
+
+    vectorEnv = SubprocessVectorEnv(2, numWorkers=2, startMethod="fork")
+    vectorEnv.reset()
+    with pytest.raises(RuntimeError) as info:
+        vectorEnv.step({"device": [0, 0], "duration": [0, 1]})
+    # Only the failed worker is reported, the other one's reply is consumed
+    assert "Worker 0 failed" in str(info.value) and "Worker 1" not in str(info.value)
+    assert vectorEnv.closed
+    with pytest.raises(RuntimeError):
+        vectorEnv.reset()
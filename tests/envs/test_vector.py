@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("gym.vector")
+
+from gymwipe.envs import CounterTrafficEnv
+from gymwipe.envs.vector import CounterTrafficVectorEnv
+
+
+def test_counter_traffic_vector_env():
+    with pytest.raises(ValueError):
+        CounterTrafficVectorEnv(0)
+
+    vectorEnv = CounterTrafficVectorEnv(3)
+    assert vectorEnv.observation_space.shape == (3,)
+    assert len(vectorEnv.seed(123)) == 3
+
+    observations = vectorEnv.reset()
+    assert observations is vectorEnv.observations
+    assert np.all(observations == CounterTrafficEnv.COUNTER_BOUND)
+
+    # The sub-environments behave like individual environments
+    singleEnvs = [CounterTrafficEnv() for _ in range(3)]
+    actionBatches = [
+        [{"device": 0, "duration": 3}, {"device": 1, "duration": 3}, {"device": 0, "duration": 6}],
+        {"device": np.array([1, 0, 1]), "duration": np.array([12, 2, 12])},
+    ]
+    for actions in actionBatches:
+        observations, rewards, dones, infos = vectorEnv.step(actions)
+        assert observations is vectorEnv.observations and rewards is vectorEnv.rewards
+        assert dones.dtype == np.bool_ and not dones.any()
+        for i, env in enumerate(singleEnvs):
+            device = actions[i]["device"] if isinstance(actions, list) else actions["device"][i]
+            duration = actions[i]["duration"] if isinstance(actions, list) else actions["duration"][i]
+            observation, reward, done, info = env.step({"device": int(device), "duration": int(duration)})
+            assert observations[i] == observation
+            assert rewards[i] == reward
+            assert infos[i] == info
+
+    # Invalid actions
+    with pytest.raises(ValueError):
+        vectorEnv.step([{"device": 0, "duration": 1}])
+    with pytest.raises(ValueError):
+        vectorEnv.step({"device": [0, 5, 0], "duration": [1, 1, 1]})
@@ -0,0 +1,77 @@
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+import gymwipe.networking.calibration as calibration
+from gymwipe.networking.calibration import (calibrate,
+                                            fitPacketErrorRateCurve,
+                                            loadPacketErrorRateTables,
+                                            simulateReceptions)
+from gymwipe.networking.physical import BpskMcs, FrequencyBandSpec
+from gymwipe.simtools import SimMan
+
+from ..fixtures import simman
+
+
+def test_calibration(tmp_path, mocker):
+    path = str(tmp_path / "per.npz")
+    sinrs = np.arange(40, 52, 1.0)
+    simulateSpy = mocker.spy(calibration, "simulateReceptions")
+
+    calibrate(path, sinrs, [64, 256], [Fraction(1,2), Fraction(3,4)], processes=1)
+    assert simulateSpy.call_count == 2 * 12 * 2
+
+    tables = loadPacketErrorRateTables(path)
+    assert set(tables.keys()) == {Fraction(1,2), Fraction(3,4)}
+    table = tables[Fraction(3,4)]
+    assert table.packetErrorRates.shape == (12, 2)
+
+    # The calibrated table has to match the one derived from bit error rates
+    analyticTable = BpskMcs(FrequencyBandSpec()).buildPacketErrorRateTable([64, 256], resolution=1)
+    for sinr in sinrs:
+        for blockSize in [64, 256]:
+            assert table.lookup(sinr, blockSize) == analyticTable.lookup(sinr, blockSize)
+
+    # Only new grid points are simulated when re-running the calibration
+    simulateSpy.reset_mock()
+    calibrate(path, np.arange(40, 53, 1.0), [64, 256], [Fraction(1,2), Fraction(3,4)], processes=1)
+    assert simulateSpy.call_count == 2 * 2
+
+    with pytest.raises(ValueError):
+        calibrate(path, sinrs, [12], processes=1)
+
+def test_simulate_receptions_isolation(simman):
+    # Simulating receptions does not affect the caller's simulation
+    env = SimMan.env
+    timeout = SimMan.timeout(1)
+    assert simulateReceptions(60, 64, Fraction(3,4), runs=2) == 2
+    assert SimMan.env is env and SimMan.now == 0
+    SimMan.runSimulation(2)
+    assert timeout.processed
+
+def test_calibration_registration(tmp_path):
+    path = str(tmp_path / "per.npz")
+    calibrate(path, [30, 60], [64], processes=1)
+    tables = loadPacketErrorRateTables(path, register=True)
+    try:
+        mcs = BpskMcs(FrequencyBandSpec())
+        assert mcs.getPacketErrorRate(45, 64) == 0.5
+        assert mcs.packetErrorRateTable is tables[Fraction(3,4)]
+    finally:
+        BpskMcs.registerPacketErrorRateTable(Fraction(3,4), None)
+
+def test_fit_packet_error_rate_curve():
+    sinrs = np.linspace(0, 20, 41)
+    measured = 1 / (1 + np.exp((sinrs - 10) / 2)) + np.random.normal(0, 0.02, len(sinrs))
+    fitted = fitPacketErrorRateCurve(sinrs, measured)
+    assert np.all(np.diff(fitted) <= 0)
+    assert np.allclose(fitted, 1 / (1 + np.exp((sinrs - 10) / 2)), atol=0.05)
+
+def test_parallel_calibration(tmp_path):
+    sequentialPath = str(tmp_path / "sequential.npz")
+    parallelPath = str(tmp_path / "parallel.npz")
+    calibrate(sequentialPath, [40, 45, 50], [64], runs=3, shadowingStd=2, processes=1)
+    calibrate(parallelPath, [40, 45, 50], [64], runs=3, shadowingStd=2, processes=2)
+    with np.load(sequentialPath) as sequential, np.load(parallelPath) as parallel:
+        assert np.array_equal(sequential["packetErrorRates"], parallel["packetErrorRates"])
@@ -0,0 +1,212 @@
+import random
+
+import numpy as np
+import pytest
+
+from gymwipe.devices import Device, SpatialIndex
+from gymwipe.networking.attenuation_models import FsplAttenuation
+from gymwipe.networking.messages import FakeTransmittable, Packet
+from gymwipe.networking.physical import (BpskMcs, DenseAttenuationStore,
+                                         FrequencyBand, FrequencyBandSpec,
+                                         PacketErrorRateTable,
+                                         SparseAttenuationStore)
+from gymwipe.simtools import SimMan
+
+from ..fixtures import simman
+
+
+def test_dense_attenuation_store(simman):
+    frequencyBand = FrequencyBand([FsplAttenuation])
+    store = DenseAttenuationStore(frequencyBand.spec, [FsplAttenuation])
+    devices = [Device(str(i), random.uniform(-50, 50), random.uniform(-50, 50)) for i in range(20)]
+    for device in devices:
+        store.addDevice(device)
+
+    def assertMatchesModels():
+        for a in devices:
+            for b in devices:
+                if a is not b:
+                    expected = frequencyBand.getAttenuationModel(a, b).attenuation
+                    assert store.getAttenuation(a, b) == pytest.approx(expected)
+    
+    assertMatchesModels()
+
+    # move some devices
+    for device in devices[::3]:
+        device.position.set(random.uniform(-50, 50), random.uniform(-50, 50))
+    assertMatchesModels()
+
+    # vectorized lookups
+    indexes = np.arange(1, store.deviceCount)
+    attenuations = store.getAttenuationsByIndex(0, indexes)
+    assert list(attenuations) == [store.getAttenuation(devices[0], d) for d in devices[1:]]
+
+def test_sparse_attenuation_store(simman):
+    CUTOFF = 30
+    frequencyBand = FrequencyBand([FsplAttenuation])
+    dense = DenseAttenuationStore(frequencyBand.spec, [FsplAttenuation])
+    sparse = SparseAttenuationStore(frequencyBand.spec, [FsplAttenuation], CUTOFF)
+    devices = [Device(str(i), random.uniform(-100, 100), random.uniform(-100, 100)) for i in range(40)]
+    for device in devices:
+        dense.addDevice(device)
+        sparse.addDevice(device)
+
+    def assertMatchesDenseStore():
+        for a in devices:
+            for b in devices:
+                if a is not b:
+                    if a.position.distanceTo(b.position) <= CUTOFF:
+                        assert sparse.getAttenuation(a, b) == pytest.approx(dense.getAttenuation(a, b))
+                    else:
+                        assert sparse.getAttenuation(a, b) == np.inf
+        allIndexes = np.arange(len(devices))
+        for i in range(len(devices)):
+            assert sparse.getAttenuationsByIndex(i, allIndexes)[i] == np.inf
+    
+    assertMatchesDenseStore()
+    for _ in range(3):
+        for device in devices[::2]:
+            device.position.set(random.uniform(-100, 100), random.uniform(-100, 100))
+        assertMatchesDenseStore()
+
+def test_spatial_index():
+    index = SpatialIndex(cellSize=5)
+    devices = [Device(str(i), random.uniform(-20, 20), random.uniform(-20, 20)) for i in range(50)]
+    for device in devices:
+        index.addDevice(device)
+    assert len(index) == 50
+
+    center = Device("center", 0, 0)
+    def assertQueryCorrect(radius):
+        expected = {d for d in devices if d.position.distanceTo(center.position) <= radius}
+        assert set(index.getDevicesInRadius(center.position, radius)) == expected
+
+    for radius in [0, 3, 7.5, 100]:
+        assertQueryCorrect(radius)
+    
+    for device in devices:
+        device.position.set(random.uniform(-20, 20), random.uniform(-20, 20))
+    assertQueryCorrect(7.5)
+
+    index.removeDevice(devices[0])
+    assert devices[0] not in index
+    assert devices[0] not in index.getDevicesInRadius(devices[0].position, 1)
+
+def test_attenuation_matrix_requires_interference_engine(simman):
+    with pytest.raises(ValueError):
+        FrequencyBand([FsplAttenuation], attenuationMatrix=True)
+
+def test_transmissions_in_reach(simman):
+    frequencyBand = FrequencyBand([FsplAttenuation])
+    mcs = BpskMcs(frequencyBand.spec)
+    receiver = Device("receiver", 0, 0)
+    near = Device("near", 3, 4)
+    far = Device("far", 30, 40)
+    packet = Packet(FakeTransmittable(8), FakeTransmittable(128))
+
+    notified = []
+    def onTransmission(t):
+        notified.append(t)
+    frequencyBand.nNewTransmissionInReach(receiver, 10).subscribeCallback(onTransmission)
+
+    wideNotified = []
+    def onWideTransmission(t):
+        wideNotified.append(t)
+    frequencyBand.nNewTransmissionInReach(receiver, 50.5).subscribeCallback(onWideTransmission)
+
+    def sender():
+        tNear = frequencyBand.transmit(near, 0.0, packet, mcs, mcs)
+        tFar = frequencyBand.transmit(far, 0.0, packet, mcs, mcs)
+        yield SimMan.timeout(1e-6)
+        assert notified == [tNear]
+        assert wideNotified == [tNear, tFar]
+        assert frequencyBand.getActiveTransmissionsInReach(receiver, 10) == [tNear]
+        assert set(frequencyBand.getActiveTransmissionsInReach(receiver, 50)) == {tNear, tFar}
+
+        # the query has to reflect position changes
+        far.position.set(6, 8)
+        assert set(frequencyBand.getActiveTransmissionsInReach(receiver, 10)) == {tNear, tFar}
+
+    SimMan.process(sender())
+    SimMan.runSimulation(1e-3)
+
+def test_bit_error_rate_table():
+    mcs = BpskMcs(FrequencyBandSpec())
+    # bit error rates are calculated exactly unless tables are enabled
+    assert not mcs.useBitErrorRateTable
+    assert mcs.getBitErrorRate(-80, -90) == mcs.calculateBitErrorRate(-80, -90)
+    assert mcs.bitErrorRateTable is None
+
+    mcs.useBitErrorRateTable = True
+    table = mcs.buildBitErrorRateTable(minSinr=0, maxSinr=70, resolution=0.01)
+    assert mcs.bitErrorRateTable is table
+    # tables are shared between equal MCS objects
+    assert BpskMcs(FrequencyBandSpec()).buildBitErrorRateTable(0, 70, 0.01) is table
+
+    sinrs = np.random.uniform(0.1, 70, 200)
+    for sinr in sinrs:
+        expected = mcs.calculateBitErrorRate(sinr, 0.0)
+        assert mcs.getBitErrorRate(sinr - 90, -90) == pytest.approx(expected, rel=1e-2, abs=1e-12)
+    
+    # clamping
+    assert table.lookup(-10) == 0.5
+    assert table.lookup(100) == table.bitErrorRates[-1]
+
+    # vectorized lookups
+    assert np.allclose(mcs.getBitErrorRates(sinrs, 0.0), [table.lookup(sinr) for sinr in sinrs])
+
+    # configurable resolution
+    coarse = mcs.buildBitErrorRateTable(minSinr=0, maxSinr=70, resolution=1)
+    assert len(coarse.sinrs) == 71
+    assert coarse.lookup(50) == pytest.approx(mcs.calculateBitErrorRate(50, 0))
+    with pytest.raises(ValueError):
+        mcs.buildBitErrorRateTable(resolution=0)
+
+def test_packet_error_rate_table():
+    table = PacketErrorRateTable([0, 10, 20], [8, 16], [[1, 1], [0.5, 1], [0, 0.5]])
+    assert table.lookup(10, 8) == 0.5
+    assert table.lookup(15, 8) == pytest.approx(0.25)
+    assert table.lookup(15, 12) == pytest.approx(0.5)
+    # clamping
+    assert table.lookup(-5, 4) == 1
+    assert table.lookup(30, 100) == 0.5
+
+    sinrs = np.random.uniform(-5, 25, 100)
+    sizes = np.random.uniform(4, 20, 100)
+    assert np.allclose(table.lookupArray(sinrs, sizes), [table.lookup(s, b) for s, b in zip(sinrs, sizes)])
+
+    with pytest.raises(ValueError):
+        PacketErrorRateTable([0, 10], [8], [[1, 1]])
+
+def test_mcs_packet_error_rate_table():
+    mcs = BpskMcs(FrequencyBandSpec())
+    table = mcs.buildPacketErrorRateTable(blockSizes=[8, 128], resolution=0.5)
+    assert set(np.unique(table.packetErrorRates)) == {0.0, 1.0}
+    # packet error rates decrease with increasing SINR
+    assert np.all(np.diff(table.packetErrorRates, axis=0) <= 0)
+    assert mcs.getPacketErrorRate(table.sinrs[0], 128) == 1
+    assert mcs.getPacketErrorRate(table.sinrs[-1], 128) == 0
+
+def test_transmission_ticks():
+    SimMan.init(ticksPerSecond=10**9)
+    frequencyBand = FrequencyBand([FsplAttenuation])
+    mcs = BpskMcs(frequencyBand.spec)
+    sender = Device("Sender", 0, 0)
+    completionTicks = []
+
+    def sending():
+        yield SimMan.timeout(1.5e-6)
+        t = frequencyBand.transmit(sender, 0.0, Packet(FakeTransmittable(8), FakeTransmittable(100)), mcs, mcs)
+        assert t.startTick == 1500
+        assert isinstance(t.stopTick, int)
+        assert t.stopTick - t.startTick == SimMan.secondsToTicks(t.duration)
+        assert t.stopTime == SimMan.ticksToSeconds(t.stopTick)
+        yield t.eCompletes
+        completionTicks.append(SimMan.nowTicks)
+        assert t.completed
+        return t
+
+    process = SimMan.process(sending())
+    SimMan.runSimulation(1)
+    assert completionTicks == [process.value.stopTick]
+    SimMan.init()
@@ -12,8 +12,8 @@ from gymwipe.networking.messages import (FakeTransmittable, Message, Packet,
                                          SimpleMacHeader, SimpleNetworkHeader,
                                          StackMessageTypes, Transmittable)
 from gymwipe.networking.physical import BpskMcs, FrequencyBand
-from gymwipe.networking.simple_stack import (TIME_SLOT_LENGTH, SimpleMac, SimplePhy,
-                                      SimpleRrmMac)
+from gymwipe.networking.simple_stack import (TIME_SLOT_LENGTH, LinkLevelPhy,
+                                             SimpleMac, SimplePhy, SimpleRrmMac)
 from gymwipe.simtools import SimMan
 
 
@@ -38,13 +38,21 @@ class CollectorPort(Port):
     def outputSaver(self, obj):
         self.outputHistory.append(obj)
 
-@pytest.fixture
-def simple_phy():
+frequencyBandOptions = [
+    {},
+    {"useInterferenceEngine": True},
+    {"useInterferenceEngine": True, "attenuationMatrix": True},
+    {"useInterferenceEngine": True, "attenuationCutoff": 100}
+]
+
+@pytest.fixture(params=frequencyBandOptions,
+                ids=["default", "interferenceEngine", "attenuationMatrix", "attenuationCutoff"])
+def simple_phy(request):
     # initialize SimPy environment
     SimMan.init()
 
     # create a wireless frequency band with FSPL attenuation
-    frequencyBand = FrequencyBand([FsplAttenuation])
+    frequencyBand = FrequencyBand([FsplAttenuation], **request.param)
 
     # create two network devices
     device1 = Device("1", 0, 0)
@@ -233,3 +241,146 @@ def test_simple_mac(caplog, simple_mac):
     # Both devices should have received 10 packets
     assert len(receivedPackets1) == 10
     assert len(receivedPackets2) == 10
+
+@pytest.mark.parametrize("frequencyBandKwargs", frequencyBandOptions,
+                         ids=["default", "interferenceEngine", "attenuationMatrix", "attenuationCutoff"])
+def test_simple_phy_bit_error_integration(mocker, frequencyBandKwargs):
+    """
+    Bit error integration at the end of a reception has to result in the same
+    decisions as counting bit errors on every received power change.
+    """
+    def runScenario(integrateBitErrors: bool):
+        SimMan.init()
+        frequencyBand = FrequencyBand([FsplAttenuation], **frequencyBandKwargs)
+        devices = [Device(str(i), 2*i, i % 3) for i in range(6)]
+        phys = [SimplePhy("Phy", d, frequencyBand, integrateBitErrors) for d in devices]
+        decisions = []
+        for phy in phys:
+            def decide(*args, phy=phy, original=phy._decide, **kwargs):
+                result = original(*args, **kwargs)
+                decisions.append((SimMan.now, phy.device.name, round(args[0]), result))
+                return result
+            phy._decide = decide
+        mcs = BpskMcs(frequencyBand.spec)
+
+        def sender(phy: SimplePhy, offset: float, power: float):
+            yield SimMan.timeout(offset)
+            for _ in range(5):
+                packet = Packet(FakeTransmittable(8), FakeTransmittable(64))
+                cmd = Message(StackMessageTypes.SEND, {"packet": packet, "power": power, "mcs": mcs})
+                phy.gates["macIn"].send(cmd)
+                yield cmd.eProcessed
+                yield SimMan.timeout(1e-4)
+
+        def mover():
+            for step in range(50):
+                yield SimMan.timeout(1e-4)
+                devices[3].position.set(6 + step % 5, 0)
+
+        for i, phy in enumerate(phys[::2]):
+            SimMan.process(sender(phy, 1.5e-3 * i, 10.0 * i))
+        SimMan.process(mover())
+        SimMan.runSimulation(0.1)
+        return decisions
+
+    countingDecisions = runScenario(False)
+    assert {decision[3] for decision in countingDecisions} == {True, False}
+    assert runScenario(True) == countingDecisions
+
+@pytest.mark.parametrize("frequencyBandKwargs", frequencyBandOptions,
+                         ids=["default", "interferenceEngine", "attenuationMatrix", "attenuationCutoff"])
+def test_link_level_phy(mocker, frequencyBandKwargs):
+    SimMan.init()
+    frequencyBand = FrequencyBand([FsplAttenuation], **frequencyBandKwargs)
+    sender, receiver, interferer = Device("1", 0, 0), Device("2", 1, 1), Device("3", 2, 1)
+    senderPhy = LinkLevelPhy("Phy", sender, frequencyBand)
+    receiverPhy = LinkLevelPhy("Phy", receiver, frequencyBand)
+    interfererPhy = LinkLevelPhy("Phy", interferer, frequencyBand)
+
+    receiverCallbackMock = mocker.Mock()
+    receiverPort = Port("Receiver Stack")
+    receiverPort.input.nReceives.subscribeCallback(receiverCallbackMock)
+    receiverPhy.gates["macOut"].connectTo(receiverPort.input)
+
+    mcs = BpskMcs(frequencyBand.spec)
+
+    def send(phy: LinkLevelPhy, power: float) -> Message:
+        packet = Packet(FakeTransmittable(8), FakeTransmittable(128))
+        cmd = Message(StackMessageTypes.SEND, {"packet": packet, "power": power, "mcs": mcs})
+        phy.gates["macIn"].send(cmd)
+        return cmd
+
+    def scenario():
+        # undisturbed transmission
+        cmd = send(senderPhy, 0.0)
+        yield cmd.eProcessed
+        receiverCallbackMock.assert_called_once_with(cmd.args["packet"])
+
+        # simultaneous transmissions interfere with each other
+        receiverCallbackMock.reset_mock()
+        cmd = send(senderPhy, 0.0)
+        send(interfererPhy, 0.0)
+        yield cmd.eProcessed
+        yield SimMan.timeout(TIME_SLOT_LENGTH)
+        receiverCallbackMock.assert_not_called()
+    
+    SimMan.process(scenario())
+    SimMan.runSimulation(1)
+    assert receiverCallbackMock.call_count == 0
+
+def test_simple_phy_bit_error_noise_clamping():
+    SimMan.init()
+    frequencyBand = FrequencyBand([FsplAttenuation])
+    phy = SimplePhy("Phy", Device("1", 0, 0), frequencyBand)
+    mcs = BpskMcs(frequencyBand.spec)
+    signalPower = 1e-6
+
+    def integrate(totalPower: float) -> float:
+        phy._powerTimeline = [(SimMan.now - 1000, signalPower, totalPower)]
+        return phy._integrateBitErrors(mcs)
+
+    expected = integrate(signalPower + phy._thermalNoisePower)
+    # Cancellation in the received power sum must not result in -inf/NaN
+    # noise levels
+    for totalPower in [signalPower, signalPower * (1 - 1e-16)]:
+        assert integrate(totalPower) == pytest.approx(expected)
+
+def test_simple_phy_interference_floor(mocker):
+    SimMan.init()
+    frequencyBand = FrequencyBand([FsplAttenuation])
+    sender, receiver, farSender = Device("1", 0, 0), Device("2", 1, 1), Device("3", 1000, 0)
+    senderPhy = SimplePhy("Phy", sender, frequencyBand)
+    farSenderPhy = SimplePhy("Phy", farSender, frequencyBand)
+    receiverPhy = SimplePhy("Phy", receiver, frequencyBand, interferenceFloor=-80.0)
+    assert receiverPhy.sensitivity == -80.0
+
+    receiverCallbackMock = mocker.Mock()
+    receiverPort = Port("Receiver Stack")
+    receiverPort.input.nReceives.subscribeCallback(receiverCallbackMock)
+    receiverPhy.gates["macOut"].connectTo(receiverPort.input)
+
+    mcs = BpskMcs(frequencyBand.spec)
+
+    def send(phy: SimplePhy) -> Message:
+        packet = Packet(FakeTransmittable(8), FakeTransmittable(128))
+        cmd = Message(StackMessageTypes.SEND, {"packet": packet, "power": 0.0, "mcs": mcs})
+        phy.gates["macIn"].send(cmd)
+        return cmd
+
+    def scenario():
+        farCmd = send(farSenderPhy)
+        cmd = send(senderPhy)
+        yield SimMan.timeout(1e-4)
+        # the far transmission (-100 dBm) is dropped from the bookkeeping
+        assert len(receiverPhy._transmissionToReceivedPower) == 1
+        assert receiverPhy.interferenceErrorBound == pytest.approx(1e-8)
+        yield cmd.eProcessed & farCmd.eProcessed
+        assert receiverPhy.interferenceErrorBound == 0
+        receiverCallbackMock.assert_called_once_with(cmd.args["packet"])
+
+    SimMan.process(scenario())
+    SimMan.runSimulation(1)
+    assert receiverCallbackMock.call_count == 1
+
+    with pytest.raises(ValueError):
+        SimplePhy("Phy", receiver, frequencyBand, sensitivity=-90.0, interferenceFloor=-80.0)
@@ -1,6 +1,7 @@
 """
 Performance benchmark tests using the `pytest-benchmark` package.
 """
+import logging
 import random
 from math import sqrt
 
@@ -11,8 +12,11 @@ from gymwipe.networking.devices import NetworkDevice
 from gymwipe.networking.messages import (Message, Packet, SimpleMacHeader,
                                          StackMessageTypes, Transmittable)
 from gymwipe.networking.physical import BpskMcs, FrequencyBand
-from gymwipe.networking.simple_stack import SimplePhy
-from gymwipe.simtools import SimMan
+from gymwipe.networking.simple_stack import TIME_SLOT_LENGTH, SimplePhy
+from gymwipe.simtools import (KernelStatistics, Notifier, SimMan,
+                              currentSimulationManager, setProductionMode)
+
+from .fixtures import simman
 
 SEND_INTERVAL = 1e-2 # seconds
 MOVE_INTERVAL = 1e-3 # seconds
@@ -22,11 +26,11 @@ class SendingDevice(NetworkDevice):
     A device that sends packets to a non-used mac address
     """
 
-    def __init__(self, id, xPos, yPos, frequencyBand, sendInterval, initialDelay):
+    def __init__(self, id, xPos, yPos, frequencyBand, sendInterval, initialDelay, **phyKwargs):
         super(SendingDevice, self).__init__("Device" + str(id), xPos, yPos, frequencyBand)
         
         # initialize a physical layer only
-        self._phy = SimplePhy("phy", self, frequencyBand)
+        self._phy = SimplePhy("phy", self, frequencyBand, **phyKwargs)
 
         mcs = BpskMcs(frequencyBand)
         
@@ -51,27 +55,50 @@ class SendingDevice(NetworkDevice):
 
 deviceCounts = range(0, 21, 2)
 
-@pytest.fixture(params=deviceCounts)
-def device_grid(request):
+def createDeviceGrid(n: int, spacing: float = 1.0, phyKwargs: dict = {}, synchronized: bool = False,
+                        **frequencyBandKwargs):
     """
-    A parametrized device fixture that sets up SendingDevices in a grid
-    arrangement with 1 m distance between adjacent devices.
-    Tests using this fixture will be run with every specified parameter.
+    Sets up `n` SendingDevices in a grid arrangement with `spacing` m distance
+    between adjacent devices and returns them. `phyKwargs` are passed to the
+    :class:`SimplePhy` constructor, `frequencyBandKwargs` to the
+    :class:`FrequencyBand` constructor. If `synchronized` is ``True``, the
+    devices' initial delays are spread across the first time slot only, so
+    that they all wait for the same slot boundaries.
     """
-    n = request.param # Number of devices to be created
     SimMan.init()
-    frequencyBand = FrequencyBand([FsplAttenuation])
+    frequencyBand = FrequencyBand([FsplAttenuation], **frequencyBandKwargs)
 
     devices = []
     cols = int(sqrt(n))
     for i in range(n):
-        initialDelay = random.uniform(0, SEND_INTERVAL)
-        devices.append(SendingDevice(i, i / cols, i % cols, frequencyBand, SEND_INTERVAL, initialDelay))
+        initialDelay = random.uniform(0, TIME_SLOT_LENGTH if synchronized else SEND_INTERVAL)
+        devices.append(SendingDevice(i, spacing * i / cols, spacing * (i % cols), frequencyBand,
+                                        SEND_INTERVAL, initialDelay, **phyKwargs))
     
     return devices
 
-@pytest.fixture
-def mobile_device_grid(device_grid):
+@pytest.fixture(params=deviceCounts)
+def device_grid(request):
+    """
+    A parametrized device fixture that sets up SendingDevices in a grid
+    arrangement with 1 m distance between adjacent devices.
+    Tests using this fixture will be run with every specified parameter.
+    """
+    return createDeviceGrid(request.param)
+
+@pytest.fixture(params=[20, 50, 100])
+def engine_device_grid(request):
+    """
+    Like :func:`device_grid`, but using a frequency band with an interference
+    engine and larger device counts
+    """
+    return createDeviceGrid(request.param, useInterferenceEngine=True)
+
+def makeMobile(devices):
+    """
+    Starts a SimPy process for each of the provided devices that moves it
+    every MOVE_INTERVAL seconds
+    """
     def mover(d: NetworkDevice):
         yield SimMan.timeout(random.uniform(0, MOVE_INTERVAL))
         initialPos = d.position
@@ -81,15 +108,161 @@ def mobile_device_grid(device_grid):
             d.position.set(initialPos.x + xOffset, initialPos.y + yOffset)
             yield SimMan.timeout(MOVE_INTERVAL)
     
-    for device in device_grid:
+    for device in devices:
         SimMan.process(mover(device))
 
+@pytest.fixture
+def mobile_device_grid(device_grid):
+    makeMobile(device_grid)
+
+@pytest.fixture(params=[20, 50])
+def matrix_mobile_device_grid(request):
+    """
+    A mobile device grid using a frequency band with an interference engine and
+    an attenuation matrix
+    """
+    makeMobile(createDeviceGrid(request.param, useInterferenceEngine=True, attenuationMatrix=True))
+
+@pytest.fixture(params=[None, -45.0], ids=["noFloor", "floor"])
+def sparse_device_grid(request):
+    """
+    100 devices with 100 m distance between adjacent devices, with and without
+    an interference floor
+    """
+    return createDeviceGrid(100, spacing=100.0, phyKwargs={"interferenceFloor": request.param})
+
+@pytest.fixture(params=[False, True], ids=["defaultLogging", "productionMode"])
+def logging_mode(request):
+    """
+    Runs tests with and without the logging production mode, with gymwipe's
+    loggers being enabled at INFO level (handled by a NullHandler)
+    """
+    gymwipeLogger = logging.getLogger("gymwipe")
+    level, propagate = gymwipeLogger.level, gymwipeLogger.propagate
+    handler = logging.NullHandler()
+    gymwipeLogger.setLevel(logging.INFO)
+    gymwipeLogger.propagate = False
+    gymwipeLogger.addHandler(handler)
+    setProductionMode(request.param)
+    yield request.param
+    setProductionMode(False)
+    gymwipeLogger.removeHandler(handler)
+    gymwipeLogger.setLevel(level)
+    gymwipeLogger.propagate = propagate
+
+@pytest.fixture(params=[False, True], ids=["privateTimeouts", "coalescedTimeouts"])
+def synchronized_device_grid(request):
+    """
+    50 SendingDevices that all wait for the same slot boundaries, with and
+    without timeout coalescing. Kernel statistics are collected to report the
+    number of heap operations.
+    """
+    SimMan.coalesceTimeouts = request.param
+    statistics = KernelStatistics()
+    statistics.start()
+    createDeviceGrid(50, synchronized=True)
+    yield statistics
+    statistics.stop()
+    SimMan.coalesceTimeouts = False
+
+@pytest.fixture(params=list(SimMan.KERNELS))
+def kernel_device_grid(request):
+    """
+    20 SendingDevices, simulated with each of the available event kernels
+    """
+    defaultKernel = SimMan.defaultKernel
+    SimMan.defaultKernel = request.param
+    yield createDeviceGrid(20)
+    SimMan.defaultKernel = defaultKernel
+
 def benchmark_simulation_grid(benchmark, device_grid):
     benchmark(SimMan.runSimulation, 1)
 
 def benchmark_simulation_mobile_grid(benchmark, mobile_device_grid):
     benchmark(SimMan.runSimulation, 1)
 
+def benchmark_simulation_engine_grid(benchmark, engine_device_grid):
+    benchmark(SimMan.runSimulation, 1)
+
+def benchmark_simulation_matrix_mobile_grid(benchmark, matrix_mobile_device_grid):
+    benchmark(SimMan.runSimulation, 1)
+
+def benchmark_simulation_sparse_grid(benchmark, sparse_device_grid):
+    benchmark(SimMan.runSimulation, 1)
+
+def benchmark_simulation_synchronized_grid(benchmark, synchronized_device_grid):
+    statistics = synchronized_device_grid
+    benchmark(SimMan.runSimulation, 0.1)
+    # Heap operations: every scheduled event is pushed and popped once
+    benchmark.extra_info["scheduledEvents"] = sum(statistics.scheduled.values())
+    benchmark.extra_info["peakHeapSize"] = statistics.peakHeapSize
+
+def benchmark_simulation_kernel_grid(benchmark, kernel_device_grid):
+    benchmark(SimMan.runSimulation, 1)
+
+def benchmark_simulation_grid_logging(benchmark, logging_mode):
+    createDeviceGrid(20)
+    benchmark(SimMan.runSimulation, 1)
+
+@pytest.fixture(params=["proxy", "manager"])
+def simulation_manager(request, simman):
+    """
+    The SimMan proxy and, as the baseline without forwarding overhead, the
+    current SimulationManager itself
+    """
+    if request.param == "proxy":
+        return SimMan
+    return currentSimulationManager()
+
+def benchmark_simulation_manager_access(benchmark, simulation_manager):
+    """
+    Accesses the simulation manager attributes that are used on hot paths
+    (`now`, `timeout`, and `event`)
+    """
+    def accessRepeatedly():
+        for _ in range(1000):
+            simulation_manager.now
+            simulation_manager.timeout(1)
+            simulation_manager.event()
+    # A new environment per round keeps the heap size constant
+    benchmark.pedantic(accessRepeatedly, setup=simulation_manager.init, rounds=200)
+
+NOTIFIER_CALLBACK_COUNT = 50
+
+@pytest.fixture
+def notifier_with_callbacks(simman):
+    """
+    A Notifier with NOTIFIER_CALLBACK_COUNT callbacks spread across three
+    priorities, some of them with additional arguments
+    """
+    n = Notifier("benchmark")
+    for i in range(NOTIFIER_CALLBACK_COUNT):
+        def callback(value, *args):
+            pass
+        n.subscribeCallback(callback, priority=i % 3, additionalArgs=[i] if i % 2 else None)
+    return n
+
+def benchmark_notifier_trigger(benchmark, notifier_with_callbacks):
+    def triggerRepeatedly():
+        for i in range(1000):
+            notifier_with_callbacks.trigger(i)
+    benchmark(triggerRepeatedly)
+
+def benchmark_notifier_subscription(benchmark, notifier_with_callbacks):
+    """
+    Subscribes and unsubscribes a callback around every trigger() call, like
+    SimplePhy does per transmission
+    """
+    def callback(value, *args):
+        pass
+
+    def subscribeAndTrigger():
+        for i in range(1000):
+            notifier_with_callbacks.subscribeCallback(callback, additionalArgs=[i])
+            notifier_with_callbacks.trigger(i)
+            notifier_with_callbacks.unsubscribeCallback(callback)
+    benchmark(subscribeAndTrigger)
+
 # Code snippets for memory leak finding
 
 # from pympler import tracker
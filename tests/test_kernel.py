@@ -0,0 +1,97 @@
+import random
+
+import pytest
+from simpy import Environment, Interrupt
+
+from gymwipe.kernel import LightEnvironment
+from gymwipe.simtools import SimMan
+
+
+def runScenario(env: Environment, seed: int):
+    """
+    Runs a random scenario of processes with timeouts (including zero-delay
+    ones), manually triggered events, conditions, and interrupts in `env` and
+    returns the resulting log of (time, process, step) tuples
+    """
+    rng = random.Random(seed)
+    log = []
+    events = [env.event() for _ in range(5)]
+    processes = []
+
+    def worker(i):
+        for step in range(20):
+            choice = rng.random()
+            try:
+                if choice < 0.4:
+                    yield env.timeout(rng.choice([0, 0, 1, 2.5]))
+                elif choice < 0.6:
+                    event = rng.choice(events)
+                    if not event.triggered:
+                        event.succeed(i)
+                    yield env.timeout(0)
+                elif choice < 0.8:
+                    yield env.timeout(rng.choice([0, 1])) | rng.choice(events)
+                else:
+                    target = rng.choice(processes)
+                    if target.is_alive and target is not env.active_process:
+                        target.interrupt(i)
+                    yield env.timeout(1) & env.timeout(0)
+            except Interrupt as interrupt:
+                log.append((env.now, i, step, "interrupted", interrupt.cause))
+            log.append((env.now, i, step))
+            for j, event in enumerate(events):
+                if event.processed:
+                    events[j] = env.event()
+
+    for i in range(10):
+        processes.append(env.process(worker(i)))
+    env.run(until=5)
+    log.append(("until", env.now))
+    env.run(until=processes[0])
+    log.append(("until", env.now))
+    env.run()
+    log.append(("end", env.now))
+    return log
+
+@pytest.mark.parametrize("seed", range(20))
+def test_light_environment_order(seed):
+    assert runScenario(LightEnvironment(), seed) == runScenario(Environment(), seed)
+
+def test_light_environment():
+    env = LightEnvironment()
+    assert env.queueSize() == 0
+    assert env.nextEvent() is None
+    assert env.peek() == float("inf")
+
+    later = env.timeout(1)
+    now = env.timeout(0)
+    assert env.queueSize() == 2
+    assert env.peek() == 0
+    assert env.nextEvent() is now
+
+    env.step()
+    assert env.nextEvent() is later and env.peek() == 1
+    with pytest.raises(ValueError):
+        env.run(0)
+
+    # Failed events crash the environment
+    def failing():
+        yield env.timeout(0)
+        raise RuntimeError("failure")
+    env.process(failing())
+    with pytest.raises(RuntimeError):
+        env.run()
+
+    # Running until an event that cannot be triggered
+    with pytest.raises(RuntimeError):
+        env.run(env.event())
+
+def test_kernel_selection():
+    SimMan.init(kernel="light")
+    assert isinstance(SimMan.env, LightEnvironment)
+    SimMan.init(kernel="simpy")
+    assert type(SimMan.env) is Environment
+    with pytest.raises(ValueError):
+        SimMan.init(kernel="unknown")
+    SimMan.init()
+    assert type(SimMan.env) is SimMan.KERNELS[SimMan.defaultKernel]
@@ -1,10 +1,16 @@
+import io
 import logging
+import threading
 from typing import Any
 
 import pytest
 from pytest_mock import mocker
+from simpy import Environment, Interrupt
 
-from gymwipe.simtools import Notifier, SimMan
+from gymwipe.simtools import (KernelStatistics, Notifier, ProcessProfiler,
+                              SimMan, SimTimePrepender, SimulationManager,
+                              TimerService, currentSimulationManager,
+                              isProductionMode, setProductionMode)
 
 from .fixtures import simman
 
@@ -42,6 +48,40 @@ def test_notifier_callback(caplog, mocker, simman):
     
     assert callHistory == []
     
+def test_notifier_callback_dispatch(simman):
+    n = Notifier('myNotifier')
+    callHistory = []
+
+    def makeCallback(name):
+        def callback(value, *args):
+            callHistory.append((name, value) + args)
+        return callback
+
+    a, b, c, d = [makeCallback(name) for name in "abcd"]
+    n.subscribeCallback(b)
+    n.subscribeCallback(a, priority=1, additionalArgs=[1, 2])
+    n.subscribeCallback(c)
+    n.subscribeCallback(d, priority=-1)
+
+    # equal priorities are invoked in the order of subscription
+    n.trigger(0)
+    assert callHistory == [("a", 0, 1, 2), ("b", 0), ("c", 0), ("d", 0)]
+
+    # unsubscribing during a trigger() call does not affect that call
+    callHistory = []
+    def unsubscriber(value):
+        n.unsubscribeCallback(c)
+        n.unsubscribeCallback(a)
+    n.subscribeCallback(unsubscriber, priority=2)
+    n.trigger(1)
+    assert callHistory == [("a", 1, 1, 2), ("b", 1), ("c", 1), ("d", 1)]
+
+    callHistory = []
+    n.unsubscribeCallback(unsubscriber)
+    n.subscribeCallback(a, priority=-1)
+    n.trigger(2)
+    assert callHistory == [("b", 2), ("d", 2), ("a", 2)]
+
 def makeLoggingProcess(timeoutLength: int):
     """
     Returns a generator function that logs the value it is
@@ -119,3 +159,440 @@ def test_notifier_simpy(caplog, simman):
     assert p1.value == "msg3"
     assert p2.value == "msg3"
     assert p3.value == "msg3"
+
+def test_sim_time_prepender(caplog, simman):
+    caplog.set_level(logging.DEBUG, logger='gymwipe.test')
+    testLogger = SimTimePrepender(logging.getLogger('gymwipe.test'))
+
+    class Sender:
+        strCalls = 0
+        def __str__(self):
+            Sender.strCalls += 1
+            return "sender"
+
+    testLogger.debug("Value: %d", 42, sender=Sender())
+    assert caplog.records[-1].getMessage() == "[Time:     0.000000] sender: Value: 42"
+
+    # no formatting for disabled levels
+    caplog.set_level(logging.INFO, logger='gymwipe.test')
+    Sender.strCalls = 0
+    testLogger.debug("Value: %d", 42, sender=Sender())
+    assert Sender.strCalls == 0
+
+    # production mode
+    setProductionMode(True, loggerNames=['gymwipe.test'])
+    try:
+        assert isProductionMode()
+        recordCount = len(caplog.records)
+        testLogger.info("Muted")
+        assert len(caplog.records) == recordCount
+        testLogger.warning("Not muted")
+        assert len(caplog.records) == recordCount + 1
+    finally:
+        setProductionMode(False)
+    assert not isProductionMode()
+    testLogger.info("Not muted anymore")
+    assert caplog.records[-1].getMessage().endswith("Not muted anymore")
+
+class ProfiledModule:
+    def __init__(self):
+        self.notifier = Notifier("trigger", self)
+        self.notifier.subscribeProcess(self.handler, blocking=False)
+        self.interrupted = False
+
+    def __repr__(self):
+        return "ProfiledModule()"
+
+    def handler(self, value):
+        yield SimMan.timeout(value)
+        return value
+
+    def sleeper(self):
+        try:
+            yield SimMan.timeout(10)
+        except Interrupt:
+            self.interrupted = True
+        yield SimMan.timeout(1)
+
+def test_process_profiler(simman, tmpdir):
+    stream = io.StringIO()
+    path = str(tmpdir.join("profile.folded"))
+    module = ProfiledModule()
+
+    # Processes registered before starting the profiler are not profiled
+    SimMan.process(module.sleeper())
+
+    with ProcessProfiler(path, stream) as profiler:
+        assert SimMan.profiler is profiler
+        handler = SimMan.process(module.handler(2))
+        sleeper = SimMan.process(module.sleeper())
+        for value in range(3):
+            module.notifier.trigger(value)
+        def interrupter():
+            yield SimMan.timeout(1)
+            sleeper.interrupt()
+        SimMan.process(interrupter())
+        SimMan.runSimulation(2)
+        SimMan.runSimulation(3)
+        # Running the simulation does not create reports
+        assert stream.getvalue() == ""
+    assert SimMan.profiler is None
+
+    # Return values and interrupts are passed through
+    assert handler.value == 2
+    assert module.interrupted
+
+    byFunction = {row[0]: row[1:] for row in profiler.getStats("function")}
+    # handler: (1 direct + 3 triggered processes) * 2 resume steps
+    assert byFunction["ProfiledModule.handler"][0] == 8
+    assert byFunction["ProfiledModule.sleeper"][0] == 3
+    assert byFunction["test_process_profiler.<locals>.interrupter"][0] == 2
+    for steps, total, maxStep in byFunction.values():
+        assert 0 <= maxStep <= total
+
+    byOwner = {row[0]: row[1:] for row in profiler.getStats("owner")}
+    assert byOwner["ProfiledModule()"][0] == 11
+    assert byOwner["tests.test_simtools"][0] == 2
+    with pytest.raises(ValueError):
+        profiler.getStats("module")
+
+    # The report has been written once when the profiler was stopped
+    report = stream.getvalue()
+    assert "ProfiledModule.handler" in report and "ProfiledModule()" in report
+    assert report.count("Process profile by generator function") == 1
+    profiler.stop()
+    assert stream.getvalue() == report
+    with open(path) as f:
+        stacks = dict(line.rsplit(" ", 1) for line in f.read().splitlines())
+    assert set(stacks) == {
+        "ProfiledModule();ProfiledModule.handler",
+        "ProfiledModule();ProfiledModule.sleeper",
+        "ProfiledModule();ProfiledModule().Notifier('trigger');ProfiledModule.handler",
+        "tests.test_simtools;test_process_profiler.<locals>.interrupter"
+    }
+    assert all(int(count) >= 0 for count in stacks.values())
+
+def test_kernel_statistics(simman):
+    snapshots = []
+
+    def waiter():
+        for _ in range(4):
+            # The long timeout is abandoned once the short one has succeeded
+            yield SimMan.timeout(1) | SimMan.timeout(100)
+
+    with KernelStatistics(snapshotInterval=2, historyLength=3) as statistics:
+        assert SimMan.kernelStatistics is statistics
+        def onSnapshot(snapshot):
+            snapshots.append(snapshot)
+        statistics.nSnapshots.subscribeCallback(onSnapshot)
+
+        # SimPy versions differ in the events they schedule for ending a run,
+        # so the counters are checked in a snapshot taken during the run
+        def checker():
+            yield SimMan.timeout(5)
+            statistics.takeSnapshot()
+
+        SimMan.process(waiter())
+        SimMan.process(checker())
+        SimMan.runSimulation(SimMan.timeout(103.5))
+
+        # Snapshots are taken at the first event after each interval
+        assert [snapshot.time for snapshot in snapshots] == [2, 4, 5, 100, 102]
+        assert list(statistics.snapshots) == snapshots[-3:]
+        snapshot = snapshots[2]
+        assert snapshot.scheduled == {"Initialize": 2, "Timeout": 10, "Condition": 4, "Process": 1}
+        assert snapshot.processed == {"Initialize": 2, "Timeout": 5, "Condition": 4, "Process": 1}
+        # The abandoned timeouts and the timeout ending the run are left
+        assert snapshot.heapSize == 5
+        assert snapshot.peakHeapSize == 7
+        assert snapshot.staleTimeouts == 0
+
+        # Only the abandoned timeouts are stale
+        assert statistics.staleTimeouts == 4
+
+        # Statistics are attached to new environments
+        SimMan.init()
+        statistics.reset()
+        SimMan.timeout(1)
+        assert statistics.scheduled == {"Timeout": 1}
+        assert statistics.snapshots.maxlen == 3 and len(statistics.snapshots) == 0
+
+    assert SimMan.kernelStatistics is None
+    SimMan.timeout(1)
+    assert statistics.scheduled == {"Timeout": 1}
+    assert "step" not in vars(SimMan.env)
+
+def test_timer_service(simman):
+    fired = []
+    def callback(value):
+        fired.append((SimMan.now, value))
+
+    timers = [SimMan.setTimer(delay, callback, delay) for delay in [3, 1, 2, 1]]
+    timers[2].cancel()
+    assert len(SimMan.timers) == 3
+    with pytest.raises(ValueError):
+        SimMan.setTimer(-1)
+
+    def process():
+        # Timers can be waited for via their event
+        timer = SimMan.setTimer(1.5, value="event")
+        value = yield timer.event
+        fired.append((SimMan.now, value))
+        # Cancelled timers never trigger their event
+        timer = SimMan.setTimer(0.5)
+        timer.cancel()
+        result = yield timer.event | SimMan.timeout(5)
+        assert timer.event not in result
+
+    SimMan.process(process())
+    SimMan.runSimulation(10)
+    assert fired == [(1, 1), (1, 1), (1.5, "event"), (3, 3)]
+    assert all(not timer.pending for timer in timers)
+    assert [timer.fired for timer in timers] == [True, True, False, True]
+    assert len(SimMan.timers) == 0
+
+def test_timer_service_rescheduling(simman):
+    fired = []
+    # A callback scheduling a later timer must not delay earlier ones
+    SimMan.setTimer(1, lambda value: SimMan.setTimer(5, fired.append, "late"))
+    SimMan.setTimer(2, fired.append, "early")
+    SimMan.runSimulation(3)
+    assert fired == ["early"]
+    SimMan.runSimulation(4)
+    assert fired == ["early", "late"]
+
+def test_timer_service_compaction(simman):
+    n = 2 * TimerService.COMPACTION_MIN_SIZE
+    timers = [SimMan.setTimer(100 + i) for i in range(n)]
+    for timer in timers[:n//2]:
+        timer.cancel()
+    # Cancelled timers are deleted lazily
+    assert SimMan.timers.heapSize == n
+    assert len(SimMan.timers) == n//2
+    timers[n//2].cancel()
+    # More than half of the heap entries are cancelled
+    assert SimMan.timers.heapSize == n//2 - 1
+    assert len(SimMan.timers) == n//2 - 1
+
+def test_timer_service_compaction_while_firing(simman):
+    fired = []
+    n = TimerService.COMPACTION_MIN_SIZE + 36
+    lateTimers = []
+    def cancelLateTimers(value):
+        fired.append(value)
+        # Makes the heap be compacted while timers are being fired
+        for timer in lateTimers:
+            timer.cancel()
+    SimMan.setTimer(1, cancelLateTimers, 0)
+    SimMan.setTimer(1, fired.append, 1)
+    lateTimers.extend(SimMan.setTimer(5) for _ in range(n))
+    SimMan.runSimulation(10)
+    assert fired == [0, 1]
+    assert len(SimMan.timers) == 0
+    assert SimMan.timers.heapSize == 0
+
+def test_trigger_after_timeout(simman):
+    event = SimMan.event()
+    timer = SimMan.triggerAfterTimeout(event, 2, "value")
+    SimMan.runSimulation(3)
+    assert event.value == "value" and timer.fired
+
+    # Triggering the event earlier cancels the timer
+    event = SimMan.event()
+    timer = SimMan.triggerAfterTimeout(event, 2)
+    event.succeed("early")
+    SimMan.runSimulation(1)
+    assert timer.cancelled
+    assert len(SimMan.timers) == 0
+
+@pytest.fixture
+def coalescing_simman(simman):
+    SimMan.coalesceTimeouts = True
+    yield SimMan
+    SimMan.coalesceTimeouts = False
+
+def test_coalesced_timeouts(coalescing_simman):
+    slotEvents = []
+    resumed = []
+
+    def waiter(i, delay):
+        yield SimMan.timeout(delay)
+        event = SimMan.nextTimeSlot(1e-6)
+        slotEvents.append(event)
+        yield event
+        resumed.append((i, SimMan.now))
+
+    for i, delay in enumerate([0.1e-6, 0.35e-6, 0.9e-6, 1.2e-6]):
+        SimMan.process(waiter(i, delay))
+    SimMan.runSimulation(1e-5)
+
+    # The first three waiters share the event for the boundary at 1 us
+    assert slotEvents[0] is slotEvents[1] is slotEvents[2]
+    assert slotEvents[3] is not slotEvents[0]
+    assert [i for i, _ in resumed] == [0, 1, 2, 3]
+    assert resumed[0][1] == pytest.approx(1e-6) and resumed[3][1] == pytest.approx(2e-6)
+
+    now = SimMan.now
+    event = SimMan.timeoutUntil(now + 1)
+    assert SimMan.timeoutUntil(now + 1) is event
+    # Timeouts with values and past trigger times
+    assert SimMan.timeoutUntil(now + 1, "value") is not event
+    assert SimMan.timeoutUntil(now - 1) is SimMan.timeoutUntil(now)
+    SimMan.runSimulation(2)
+    # Processed events are not shared anymore
+    assert SimMan.timeoutUntil(now + 1) is not event
+
+def test_integer_tick_clock():
+    with pytest.raises(ValueError):
+        SimMan.init(ticksPerSecond=0.5)
+
+    SimMan.init(ticksPerSecond=10**6)
+    assert SimMan.ticksPerSecond == 10**6
+    assert SimMan.secondsToTicks(1.5e-6) == 2
+    assert SimMan.ticksToSeconds(3) == 3e-6
+
+    slotTimes = []
+    def slotWaiter():
+        for delay in [0.3e-6, 1e-6, 0.7e-6]:
+            yield SimMan.timeout(delay)
+            yield SimMan.nextTimeSlot(2e-6)
+            slotTimes.append(SimMan.nowTicks)
+
+    SimMan.process(slotWaiter())
+    SimMan.runSimulation(1e-5)
+    # Times are exact integers
+    assert slotTimes == [2, 4, 6]
+    assert all(isinstance(t, int) for t in slotTimes)
+    assert SimMan.nowTicks == 10 and SimMan.now == 1e-5
+
+    # Summing up microseconds does not drift
+    def summer():
+        for _ in range(10**5):
+            yield SimMan.timeout(1e-6)
+        return SimMan.nowTicks
+    process = SimMan.process(summer())
+    SimMan.runSimulation(1)
+    assert process.value == 100010
+
+    # Timers use ticks, too
+    timer = SimMan.setTimer(0.5)
+    assert timer.time == 1000010 + 500000
+
+    SimMan.init()
+    assert SimMan.ticksPerSecond is None
+    assert SimMan.secondsToTicks(1.5e-6) == 1.5e-6
+
+def test_simulation_contexts(simman):
+    defaultManager = currentSimulationManager()
+    managers = [SimulationManager(), SimulationManager()]
+    log = []
+
+    def ticker(name, interval):
+        n = Notifier(name)
+        n.subscribeCallback(lambda value: log.append((name, SimMan.now, value)))
+        for i in range(3):
+            yield SimMan.timeout(interval)
+            n.trigger(i)
+
+    for manager, interval in zip(managers, [1, 2]):
+        with manager as m:
+            assert m is manager
+            assert currentSimulationManager() is manager
+            SimMan.init()
+            SimMan.process(ticker(str(interval), interval))
+    assert currentSimulationManager() is defaultManager
+    assert managers[0].env is not managers[1].env
+
+    # Running one simulation does not affect the other one
+    with managers[1]:
+        SimMan.runSimulation(10)
+    with managers[0]:
+        # Contexts can be nested
+        with managers[1]:
+            assert SimMan.now == 10
+        SimMan.runSimulation(2.5)
+    assert log == [("2", 2, 0), ("2", 4, 1), ("2", 6, 2), ("1", 1, 0), ("1", 2, 1)]
+    assert managers[0].now == 2.5 and managers[1].now == 10
+    assert SimMan.now == 0
+
+    # Attributes are set on the current manager
+    with managers[0]:
+        SimMan.coalesceTimeouts = True
+    assert managers[0].coalesceTimeouts and not SimMan.coalesceTimeouts
+
+def test_simulation_reset(simman):
+    env = SimMan.env
+    log = []
+    n = Notifier("Test")
+    n.subscribeCallback(lambda value: log.append(("callback", value)))
+
+    def process(value):
+        log.append(("process", value))
+        yield SimMan.timeout(10)
+
+    n.subscribeProcess(process, queued=True)
+
+    def triggering():
+        for i in range(3):
+            n.trigger(i)
+            yield SimMan.timeout(1)
+
+    SimMan.process(triggering())
+    timer = SimMan.setTimer(5, lambda value: log.append(("timer", value)))
+    notifierEvent = n.event
+    SimMan.runSimulation(2.5)
+    assert log == [("callback", 0), ("process", 0), ("callback", 1), ("callback", 2)]
+
+    SimMan.reset()
+    n.reset()
+    assert type(SimMan.env) is type(env) and SimMan.env is not env
+    assert SimMan.now == 0
+    assert len(SimMan.timers) == 0 and not timer.pending
+    assert n.event is not notifierEvent
+
+    # Discarded processes, timers, and queued values do not run anymore, while
+    # subscriptions are kept
+    log.clear()
+    n.trigger(3)
+    SimMan.runSimulation(20)
+    assert log == [("callback", 3), ("process", 3)]
+
+def test_simulation_reset_kernel_statistics(simman):
+    def ticking():
+        while True:
+            yield SimMan.timeout(0.5)
+
+    with KernelStatistics(snapshotInterval=1) as statistics:
+        SimMan.process(ticking())
+        SimMan.runSimulation(5.5)
+        assert len(statistics.snapshots) == 5
+
+        SimMan.reset()
+        statistics.reset()
+        SimMan.process(ticking())
+        SimMan.runSimulation(3.5)
+        assert [snapshot.time for snapshot in statistics.snapshots] == pytest.approx([1, 2, 3])
+
+def test_environment_replacement(simman):
+    fired = []
+    SimMan.kernelStatistics = KernelStatistics()
+    env = Environment()
+    SimMan.env = env
+    assert SimMan.env is env and SimMan.kernelStatistics._env is env
+    # Timers are scheduled on the new environment
+    SimMan.setTimer(1, fired.append, "timer")
+    SimMan.runSimulation(2)
+    assert fired == ["timer"]
+    SimMan.kernelStatistics.detach()
+    SimMan.kernelStatistics = None
+
+def test_thread_local_simulation_manager(simman):
+    manager = SimulationManager()
+    managers = []
+    with manager:
+        thread = threading.Thread(target=lambda: managers.append(currentSimulationManager()))
+        thread.start()
+        thread.join()
+        assert currentSimulationManager() is manager
+    # Other threads start with the default manager
+    assert managers == [currentSimulationManager()]
@@ -0,0 +1,223 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from gymwipe.devices import Device
+from gymwipe.networking.attenuation_models import FsplAttenuation
+from gymwipe.networking.devices import SimpleNetworkDevice, SimpleRrmDevice
+from gymwipe.networking.messages import FakeTransmittable
+from gymwipe.networking.physical import FrequencyBand
+from gymwipe.simtools import SimMan
+from gymwipe.tracing import (TRACE_DTYPE, Trace, TraceKind, TraceRecorder,
+                             openTrace)
+
+from .fixtures import simman
+
+
+def test_trace_recorder_buffer(simman, tmpdir):
+    path = str(tmpdir.join("buffer.trace"))
+    recorder = TraceRecorder(path, bufferSize=3)
+
+    with pytest.raises(ValueError):
+        TraceRecorder(path, bufferSize=0)
+
+    device = MagicMock()
+    device.name = "Device"
+    for length in range(7):
+        recorder.recordQueueLength(device, bytes(6), length)
+
+    # Two full buffers have been flushed, one record is buffered
+    records, metadata = openTrace(path)
+    assert len(records) == 6
+    assert recorder.count == 7
+
+    recorder.stop()
+    records, metadata = openTrace(path)
+    assert records.dtype == TRACE_DTYPE
+    assert list(records["value"]) == list(range(7))
+    assert np.all(records["kind"] == TraceKind.QUEUE_LENGTH)
+    assert metadata["devices"] == ["Device"]
+    assert metadata["count"] == 7
+
+def test_trace_recorder_simulation(simman, tmpdir):
+    path = str(tmpdir.join("simulation.trace"))
+    band = FrequencyBand([FsplAttenuation])
+    sender = SimpleNetworkDevice("Sender", 0, 0, band)
+    receiver = SimpleNetworkDevice("Receiver", 1, 0, band)
+    rrm = SimpleRrmDevice("RRM", 0, 1, band, {0: sender.macAddr, 1: receiver.macAddr}, MagicMock())
+
+    # No recorder active
+    assert SimMan.traceRecorder is None
+
+    with TraceRecorder(path, bufferSize=16) as recorder:
+        assert SimMan.traceRecorder is recorder
+        receiver.receiving = True
+        sender.send(FakeTransmittable(100), receiver.macAddr)
+        rrm.assignFrequencyBand(0, 20000)
+        SimMan.runSimulation(0.1)
+
+    assert SimMan.traceRecorder is None
+    records, metadata = openTrace(path)
+    assert len(records) == recorder.count
+    devices = metadata["devices"]
+    kinds = records["kind"]
+
+    # Announcement and data packet transmissions
+    transmissions = records[kinds == TraceKind.TRANSMISSION]
+    assert [devices[i] for i in transmissions["device"]] == ["RRM", "Sender"]
+    assert np.all(transmissions["stop"] > transmissions["start"])
+
+    assignment, = records[kinds == TraceKind.ASSIGNMENT]
+    assert devices[assignment["device"]] == "RRM"
+    assert assignment["peer"] == int.from_bytes(sender.macAddr, "big")
+    assert assignment["value"] == 20000
+
+    # The packet has been queued and dequeued again
+    queueLengths = records[kinds == TraceKind.QUEUE_LENGTH]
+    assert list(queueLengths["value"]) == [1, 0]
+
+    # The receiver has received the data packet
+    payloads = records[(kinds == TraceKind.PAYLOAD_RECEPTION) & (records["peer"] == devices.index("Sender"))]
+    assert devices.index("Receiver") in payloads["device"]
+    assert np.all(payloads["success"] == 1)
+    assert np.all(records[kinds == TraceKind.BIT_ERROR_RATE]["sinr"] > 0)
+
+    # Records are ordered by time
+    assert np.all(np.diff(records["time"]) >= 0)
+
+@pytest.fixture
+def recorded_trace(simman, tmpdir):
+    path = str(tmpdir.join("query.trace"))
+    recorder = TraceRecorder(path, bufferSize=4)
+    devices = {name: Device(name, 0, 0) for name in ["A", "B", "C"]}
+    mcs = SimpleNamespace(codeRate=0.75)
+
+    def transmission(sender, duration, payloadBits):
+        packet = SimpleNamespace(header=SimpleNamespace(bitSize=8), payload=SimpleNamespace(bitSize=payloadBits),
+                                    bitSize=8 + payloadBits)
+        return SimpleNamespace(sender=devices[sender], startTime=SimMan.now, stopTime=SimMan.now + duration,
+                                power=0.0, packet=packet, mcsPayload=mcs)
+
+    def scenario():
+        # (start time, sender, duration)
+        schedule = [(0, "A", 1), (0.5, "B", 1), (2, "C", 1), (3.5, "A", 0.5), (3.9, "B", 0.5)]
+        for startTime, sender, duration in schedule:
+            yield SimMan.timeoutUntil(startTime)
+            t = transmission(sender, duration, 100 * (len(sender) + ord(sender) - ord("A")))
+            recorder.recordTransmission(t)
+            if sender == "C":
+                recorder.recordBitErrorRate(devices["A"], t, 1e-3, 5.0)
+                recorder.recordBitErrorRate(devices["B"], t, 1e-3, 15.0)
+                recorder.recordReception(devices["A"], t, "Payload", True, 0.0, mcs)
+                recorder.recordReception(devices["B"], t, "Payload", False, 0.3, mcs)
+                recorder.recordReception(devices["B"], t, "Packet", True, 0.1, mcs, sinr=25.0)
+        recorder.recordBitErrorRate(devices["C"], t, 1e-3, 15.0)
+
+    SimMan.process(scenario())
+    SimMan.runSimulation(10)
+    recorder.stop()
+    return path
+
+def test_trace_select(recorded_trace):
+    trace = Trace(recorded_trace, chunkSize=3)
+    assert len(trace) == 11
+    assert trace.deviceId("C") == 2
+    with pytest.raises(ValueError):
+        trace.deviceId("D")
+
+    transmissions = trace.select(kinds=[TraceKind.TRANSMISSION])
+    assert list(transmissions["start"]) == [0, 0.5, 2, 3.5, 3.9]
+
+    window = trace.select(start=0.5, stop=3.5)
+    assert window["time"].min() == 0.5 and window["time"].max() == 2
+
+    byDevice = trace.select(kinds=[TraceKind.BIT_ERROR_RATE], devices=["B", 2])
+    assert list(byDevice["sinr"]) == [15.0, 15.0]
+
+    assert len(trace.select(devices=["A"], start=4)) == 0
+
+    # Chunks do not exceed the chunk size
+    assert all(len(chunk) <= 3 for chunk in trace.iterChunks())
+    assert sum(len(chunk) for chunk in trace.iterChunks()) == len(trace)
+
+@pytest.mark.parametrize("chunkSize", [1, 2, 3, 100])
+def test_trace_collisions(recorded_trace, chunkSize):
+    trace = Trace(recorded_trace, chunkSize=chunkSize)
+    assert list(trace.collisionFlags()) == [True, True, False, True, True]
+    assert trace.collisionRatio() == 0.8
+    assert trace.collisionRatio(devices=["A"]) == 1.0
+    assert trace.collisionRatio(devices=["C"]) == 0.0
+    assert trace.collisionRatio(start=2, stop=3.9) == 0.0
+    assert np.isnan(trace.collisionRatio(start=5))
+
+def test_trace_aggregates(recorded_trace):
+    trace = Trace(recorded_trace, chunkSize=2)
+
+    # The payload of C's transmission (300 bits) has been received by A, the
+    # whole packet (308 bits) by B
+    assert trace.throughput(0, 4) == {"A": 75.0, "B": 77.0, "C": 0.0}
+    assert trace.throughput(3, 4) == {"A": 0.0, "B": 0.0, "C": 0.0}
+
+    counts, edges = trace.sinrHistogram(bins=3, range=(0, 30))
+    assert list(counts) == [1, 2, 1]
+    assert list(edges) == [0, 10, 20, 30]
+    counts, _ = trace.sinrHistogram(bins=[0, 20, 30], devices=["B"])
+    assert list(counts) == [1, 1]
+
+def test_trace_throughput_final_reception(simman, tmpdir):
+    path = str(tmpdir.join("final.trace"))
+    recorder = TraceRecorder(path)
+    sender, receiver = Device("Sender", 0, 0), Device("Receiver", 1, 0)
+    mcs = SimpleNamespace(codeRate=0.75)
+    packet = SimpleNamespace(header=SimpleNamespace(bitSize=8), payload=SimpleNamespace(bitSize=100),
+                                bitSize=108)
+    t = SimpleNamespace(sender=sender, startTime=0, stopTime=2, power=0.0, packet=packet, mcsPayload=mcs)
+
+    def scenario():
+        recorder.recordTransmission(t)
+        yield SimMan.timeout(2)
+        recorder.recordReception(receiver, t, "Payload", True, 0.0, mcs)
+
+    SimMan.process(scenario())
+    SimMan.runSimulation(5)
+    recorder.stop()
+
+    # The reception at the time of the last record is part of the window
+    assert Trace(path).throughput() == {"Sender": 0.0, "Receiver": 50.0}
+
+def test_trace_episodes(simman, tmpdir):
+    path = str(tmpdir.join("episodes.trace"))
+    device = Device("Device", 0, 0)
+
+    def scenario(lengths):
+        for length in lengths:
+            yield SimMan.timeout(1)
+            recorder.recordQueueLength(device, bytes(6), length)
+
+    with TraceRecorder(path) as recorder:
+        SimMan.reset()
+        # No records have been created in the first episode
+        assert recorder.episode == 0
+        for episode, lengths in enumerate([[1, 2], [3, 4, 5]]):
+            if episode > 0:
+                SimMan.reset()
+            SimMan.process(scenario(lengths))
+            SimMan.runSimulation(10)
+        assert recorder.episode == 1
+
+    trace = Trace(path)
+    assert trace.episodes == 2 and len(trace) == 5
+    assert list(trace.records["episode"]) == [0, 0, 1, 1, 1]
+    # Time-based queries require an episode to be selected
+    with pytest.raises(ValueError):
+        trace.select(start=1)
+    with pytest.raises(ValueError):
+        trace.throughput()
+
+    second = Trace(path, episode=1)
+    assert list(second.records["value"]) == [3, 4, 5]
+    assert list(second.select(start=2)["value"]) == [4, 5]
+    with pytest.raises(ValueError):
+        Trace(path, episode=2)